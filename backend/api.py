@@ -1,20 +1,38 @@
 import os
-import io
 import json
-import re
-import math
+import hashlib
+import asyncio
 import logging
-from collections import Counter
-from typing import Optional
-
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable, Optional
+
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from pypdf import PdfReader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from google import genai
+import numpy as np
+
+from caching import LRUCache, ResultCache
+from chunking import chunk_resume, split_sections
+from deadlines import (DeadlineExceeded, bind_deadline, deadline_guard, llm_http_options,
+                       request_deadline, within_deadline)
+from diagnostics import LoopLagMonitor, sample_profile
+from embedding_store import EmbeddingStore
+from keyword_index import KeywordIndex
+from lexical import select_chunks
+from phrase_matcher import PhraseMatcher
+from prompts import PromptRegistry
+from routing import ModelRouter
+from scoring import (RESUME_MAX_CHARS, SKILL_ALIASES, STOPWORDS, ats_keyword_score, canonical_skill,
+                     extract_keywords, extract_text_from_pdf, keyword_matcher, strip_contact_info)
+from sharding import ShardedIndex
+from store import DATA_DIR, JsonStore
+from vector_index import VectorIndex, prepare
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -29,10 +47,95 @@ def _load_key(env_var: str) -> str:
 GEMINI_MODEL = "gemini-2.5-flash"
 EMBED_MODEL  = "gemini-embedding-001"
 
-chat_client      = genai.Client(api_key=_load_key("CHATBOT_API_KEY"))
-market_client    = genai.Client(api_key=_load_key("MARKET_API_KEY"))
-ats_client       = genai.Client(api_key=_load_key("RESUME_API_KEY"))
-interview_client = genai.Client(api_key=_load_key("INTERVIEW_API_KEY"))
+# Each LLM call site is a route with a model tier and a latency SLO in seconds.
+# Tiers go from most capable to fastest; a route whose recent p90 latency misses
+# its SLO drops to the next faster tier for ROUTE_COOLDOWN seconds, then retries
+# its own. MODEL_TIERS / MODEL_ROUTES (JSON) override or extend the defaults, e.g.
+# MODEL_ROUTES='{"ats_recruiter_analysis": ["pro", 30]}'. Latencies: /debug/routes.
+MODEL_TIERS = {
+    "pro":      "gemini-2.5-pro",
+    "standard": GEMINI_MODEL,
+    "fast":     "gemini-2.5-flash-lite",
+} | json.loads(os.getenv("MODEL_TIERS", "{}"))
+MODEL_ROUTES = {
+    "chat_message":             ("standard", 15.0),
+    "market_analyze":           ("standard", 30.0),
+    "ats_extract_skills":       ("fast",     5.0),
+    "ats_extract_skill_pair":   ("fast",     8.0),
+    "ats_extract_skills_batch": ("fast",     30.0),
+    "ats_learning_roadmap":     ("fast",     10.0),
+    "ats_roadmap_skill":        ("standard", 20.0),
+    "ats_recruiter_analysis":   ("standard", 20.0),
+    "interview_questions":      ("standard", 15.0),
+    "interview_chat":           ("fast",     5.0),
+    "interview_feedback":       ("standard", 25.0),
+} | {route: (tier, float(slo)) for route, (tier, slo) in json.loads(os.getenv("MODEL_ROUTES", "{}")).items()}
+for _route, (_tier, _) in MODEL_ROUTES.items():
+    if _tier not in MODEL_TIERS:
+        raise RuntimeError(f"MODEL_ROUTES: {_route} uses unknown tier {_tier!r} (tiers: {', '.join(MODEL_TIERS)}).")
+model_router = ModelRouter(
+    MODEL_TIERS, MODEL_ROUTES,
+    window=int(os.getenv("ROUTE_WINDOW", "20")),
+    cooldown=float(os.getenv("ROUTE_COOLDOWN", "300")),
+)
+# Part of every stored-result key, so changing the table doesn't serve old models' output.
+MODEL_TABLE = hashlib.sha256(json.dumps([MODEL_TIERS, MODEL_ROUTES], sort_keys=True).encode()).hexdigest()[:12]
+
+# Set GEMINI_BASE_URL to point every client at a stand-in (see bench/fake_gemini.py).
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+# Long static prompt prefixes (schemas, rules) go first and are cached: implicitly
+# always, explicitly via client.caches once they reach PROMPT_CACHE_MIN_TOKENS.
+prompt_registry = PromptRegistry(
+    mode=os.getenv("PROMPT_CACHE", "auto"),
+    min_tokens=int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024")),
+    ttl=int(os.getenv("PROMPT_CACHE_TTL", "3600")),
+)
+
+# Keys are checked at import so a misconfigured worker still fails fast, but the
+# google-genai SDK and its clients are only loaded on first use (see get_client).
+_API_KEYS = {
+    "chat":      _load_key("CHATBOT_API_KEY"),
+    "market":    _load_key("MARKET_API_KEY"),
+    "ats":       _load_key("RESUME_API_KEY"),
+    "interview": _load_key("INTERVIEW_API_KEY"),
+}
+_clients: dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+def get_client(module: str):
+    """Return the Gemini client for a module, building it on first use."""
+    client = _clients.get(module)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(module)
+            if client is None:
+                from google import genai
+                http_options = {"base_url": GEMINI_BASE_URL} if GEMINI_BASE_URL else None
+                client = _clients[module] = genai.Client(api_key=_API_KEYS[module], http_options=http_options)
+    return client
+
+# Diagnostics are off by default: the lag monitor needs LOOP_LAG_MONITOR=1 and
+# the /debug endpoints need ADMIN_TOKEN to be set.
+ADMIN_TOKEN       = os.getenv("ADMIN_TOKEN", "")
+loop_lag_monitor  = (
+    LoopLagMonitor(threshold_ms=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")))
+    if os.getenv("LOOP_LAG_MONITOR", "").lower() in ("1", "true", "yes") else None
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if loop_lag_monitor:
+        loop_lag_monitor.start()
+    await asyncio.to_thread(load_resume_index)
+    await asyncio.to_thread(load_keyword_index)
+    yield
+    await asyncio.to_thread(resume_index.save, _INDEX_PATH)
+    await asyncio.to_thread(keyword_index.save, _KEYWORD_INDEX_PATH)
+    if isinstance(resume_index, ShardedIndex):
+        resume_index.close()
+    if loop_lag_monitor:
+        await loop_lag_monitor.stop()
 
 app = FastAPI(
     title="🚀 Unified AI Career Platform",
@@ -61,6 +164,7 @@ Generate interview questions for any role → simulate a live mock interview →
     version="4.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -70,22 +174,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-_STOPWORDS = {
-    "a","an","the","and","or","but","in","on","at","to","for","of","with",
-    "is","are","was","were","be","been","have","has","had","do","does","did",
-    "will","would","could","should","may","might","must","shall","can","need",
-    "that","this","these","those","it","its","we","you","your","our","their",
-    "from","by","as","if","so","not","no","nor","yet","both","either","about",
-    "above","after","before","between","into","through","during","including",
-    "without","within","along","following","across","behind","beyond","plus",
-    "except","up","out","around","down","off","over","under","again","further",
-    "then","once","more","also","just","than","other","such","any","all","each",
-    "how","what","when","where","who","which","while","per","etc","ie","eg",
-}
+@contextmanager
+def llm_call(route: str):
+    """
+    `with llm_call(route) as model:` — the route's model, latency recorded, within the request deadline.
+    The guard is inside the route, so a timeout caused by the request's budget reaches the
+    router as DeadlineExceeded and is counted as a cutoff, not as a slow model.
+    """
+    with model_router.route(route) as model, deadline_guard():
+        yield model
 
-def gemini_text(prompt: str, client) -> str:
-    """Call Gemini with a specific module client and return the text response."""
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
+def gemini_text(prompt: str, client, route: str) -> str:
+    """Call Gemini with a specific module client on the route's model and return the text response."""
+    with llm_call(route) as model:
+        response = client.models.generate_content(model=model, contents=prompt, config={"http_options": llm_http_options()})
     return response.text.strip()
 
 def parse_json(raw: str) -> dict | list:
@@ -93,10 +195,300 @@ def parse_json(raw: str) -> dict | list:
     cleaned = raw.replace("```json", "").replace("```", "").strip()
     return json.loads(cleaned)
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract all text from a PDF file."""
-    reader = PdfReader(io.BytesIO(file_bytes))
-    return "".join(page.extract_text() or "" for page in reader.pages).strip()
+# ═════════════════════════════════════════════════════════════════════════════
+#  RESUME PROFILE — parsed once per PDF, shared by every module
+# ═════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class ResumeProfile:
+    """
+    Everything derived from one resume PDF. Text, sections and chunks are built
+    eagerly (cheap, local); skills and chunk embeddings are LLM-backed, so they are
+    filled on first use and then reused by every module. Chunk vectors are cached
+    per chunk index, so an analysis only embeds the chunks it actually needs.
+    """
+    content_hash: str
+    text:         str
+    sections:     dict[str, str]
+    chunks:       list[str]
+    _skills:      set[str] | None          = field(default=None, repr=False)
+    _chunk_vecs:  dict[int, np.ndarray]    = field(default_factory=dict, repr=False)
+    _lock:        threading.Lock           = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def skills(self) -> set[str]:
+        """Extracted on first use; if extraction fails it raises and `_skills` stays unset."""
+        with self._lock:
+            if self._skills is None:
+                self._skills = ats_extract_skills(self.text)
+            return self._skills
+
+    @property
+    def has_skills(self) -> bool:
+        return self._skills is not None
+
+    def set_skills(self, skills: set[str]) -> None:
+        """Skills extracted elsewhere (e.g. together with a JD's); ignored if already known."""
+        with self._lock:
+            if self._skills is None:
+                self._skills = skills
+
+    def vectors_for(self, indices: list[int]) -> np.ndarray:
+        """Embeddings of the given chunks, embedding only those not seen before."""
+        with self._lock:
+            missing = [i for i in indices if i not in self._chunk_vecs]
+            for i, vec in zip(missing, embed_texts([self.chunks[i] for i in missing])):
+                self._chunk_vecs[i] = vec
+            vecs = [self._chunk_vecs[i] for i in indices]
+        if not vecs:
+            return np.empty((0, 0), np.float32)
+        dim = min(len(v) for v in vecs)   # stored vectors may be truncated (EMBED_STORE_DIM)
+        return np.stack([v[:dim] for v in vecs])
+
+    def inherit(self, previous: "ResumeProfile") -> dict:
+        """
+        Reuse an earlier version's work for whatever did not change: vectors of chunks
+        whose text is identical, and skills from unchanged sections (previous skills
+        still mentioned there). Only changed sections go back to the skill extractor.
+        """
+        by_text = {previous.chunks[i]: vec for i, vec in previous._chunk_vecs.items() if i < len(previous.chunks)}
+        changed = [name for name, text in self.sections.items() if previous.sections.get(name) != text]
+        removed = [name for name in previous.sections if name not in self.sections]
+        reused  = 0
+        with self._lock:
+            for i, chunk in enumerate(self.chunks):
+                if i not in self._chunk_vecs and chunk in by_text:
+                    self._chunk_vecs[i] = by_text[chunk]
+                    reused += 1
+            if self._skills is None and previous._skills is not None:
+                kept  = "\n".join(text for name, text in self.sections.items() if name not in changed)
+                fresh = "\n".join(self.sections[name] for name in changed)
+                self._skills = (set(keyword_matcher(previous._skills).count(kept)) if kept else set()) | (
+                    ats_extract_skills(fresh) if fresh.strip() else set())
+        return {
+            "changed_sections": changed,
+            "removed_sections": removed,
+            "changed_chunks":   len(set(self.chunks) - set(previous.chunks)),
+            "reused_vectors":   reused,
+        }
+
+    @property
+    def chunk_embeddings(self) -> np.ndarray:
+        """Every chunk's embedding (registration and the search index)."""
+        return self.vectors_for(list(range(len(self.chunks))))
+
+    @property
+    def resume_id(self) -> str:
+        return self.content_hash[:16]
+
+    def to_doc(self) -> dict:
+        """Serialise for the resume registry (vectors go to the embedding store), computing skills if needed."""
+        return {
+            "content_hash": self.content_hash, "text": self.text,
+            "sections": self.sections, "chunks": self.chunks,
+            "skills": sorted(self.skills),
+        }
+
+    @classmethod
+    def from_doc(cls, doc: dict, chunk_vecs: np.ndarray | None = None) -> "ResumeProfile":
+        """`chunk_vecs` rows are the embeddings of the first len(chunk_vecs) chunks."""
+        if chunk_vecs is None and doc.get("chunk_embeddings"):   # registered before the embedding store
+            chunk_vecs = np.asarray(doc["chunk_embeddings"], np.float32)
+        return cls(
+            content_hash=doc["content_hash"], text=doc["text"],
+            sections=doc["sections"], chunks=doc["chunks"],
+            _skills=set(doc["skills"]),
+            _chunk_vecs=dict(enumerate(chunk_vecs)) if chunk_vecs is not None else {},
+        )
+
+
+# Embeddings are stored packed (float16 by default, optionally truncated) in
+# memory-mapped .emb files next to the JSON registries, not as JSON float lists.
+EMBED_STORE_DTYPE = os.getenv("EMBED_STORE_DTYPE", "float16")
+EMBED_STORE_DIM   = int(os.getenv("EMBED_STORE_DIM", "0")) or None
+
+_profiles       = LRUCache(maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "256")))
+_resume_store   = JsonStore("resumes")
+_resume_vectors = EmbeddingStore("resume_vectors", EMBED_STORE_DTYPE, EMBED_STORE_DIM)
+_unlisted       = JsonStore("unlisted_resumes")   # registered with searchable=false: kept out of /ats/search
+
+# Semantic search over registered resumes. Chunk vectors are truncated to INDEX_DIM
+# (Matryoshka prefix). INDEX_SHARDS splits the index across worker processes: a
+# count spawns local shards, a host:port list connects to `python -m sharding` servers.
+INDEX_DIM     = int(os.getenv("INDEX_DIM", "256"))
+INDEX_SHARDS  = os.getenv("INDEX_SHARDS", "")
+_INDEX_PATH   = os.path.join(DATA_DIR, "resume_index")
+resume_index: VectorIndex | ShardedIndex = VectorIndex(INDEX_DIM)
+_index_synced = None
+_index_lock   = threading.Lock()
+_MTIME_SLACK_NS = 2_000_000_000   # file mtimes can be coarse or lag the clock slightly
+
+
+def load_resume_index() -> None:
+    """Startup: restore the saved index, then add/drop whatever changed since it was saved."""
+    global resume_index
+    with _index_lock:
+        if INDEX_SHARDS:
+            resume_index = ShardedIndex.open(
+                INDEX_SHARDS, os.path.join(DATA_DIR, "index_shards"), INDEX_DIM,
+                authkey=os.getenv("INDEX_SHARD_AUTHKEY", "").encode(),
+                max_docs=int(os.getenv("INDEX_SHARD_MAX_DOCS", "0")),
+            )
+        else:
+            resume_index = VectorIndex.load(_INDEX_PATH, INDEX_DIM)
+    sync_resume_index()
+
+
+def sync_resume_index() -> None:
+    """
+    Reconcile the in-memory index with the resume registry (minus unlisted resumes).
+    Other workers write to the same registry, so this runs before each search; it is
+    two stat() calls unless a registry directory changed since the last sync. Besides
+    new and deleted ids, every document written since the index was last synced
+    (`as_of`, saved with it) is re-read, so metadata re-registered by another worker
+    doesn't stay stale here.
+    """
+    global _index_synced
+    with _index_lock:
+        version = (_resume_store.version(), _unlisted.version())
+        if version == _index_synced:
+            return
+        started = time.time_ns()
+        stored  = set(_resume_store.ids()) - set(_unlisted.ids())
+        indexed = resume_index.ids()
+        changed = stored.intersection(_resume_store.changed_since(resume_index.as_of - _MTIME_SLACK_NS))
+        for resume_id in indexed - stored:
+            resume_index.delete(resume_id)
+        for resume_id in (stored - indexed) | changed:
+            doc = _resume_store.get(resume_id, fresh=True)
+            if doc is None:
+                continue
+            vecs = ResumeProfile.from_doc(doc, _resume_vectors.get(resume_id))._chunk_vecs
+            if vecs:
+                resume_index.add(resume_id, np.stack([vecs[i] for i in sorted(vecs)]), doc.get("metadata", {}))
+        resume_index.as_of = started
+        _index_synced      = version
+
+
+# Corpus keyword statistics: every registered resume and JD as a sparse term-count
+# row, so BM25 IDF reflects the whole registry. KEYWORD_SCORER picks the default
+# ATS keyword score: "overlap" (share of JD keywords present) or "bm25".
+KEYWORD_SCORERS     = ("overlap", "bm25")
+KEYWORD_SCORER      = os.getenv("KEYWORD_SCORER", "overlap")
+_KEYWORD_INDEX_PATH = os.path.join(DATA_DIR, "keyword_index")
+keyword_index       = KeywordIndex(STOPWORDS)
+_keyword_synced     = None
+_keyword_lock       = threading.Lock()
+
+
+def load_keyword_index() -> None:
+    """Startup: restore the saved keyword statistics, then catch up with the registries."""
+    global keyword_index
+    with _keyword_lock:
+        keyword_index = KeywordIndex.load(_KEYWORD_INDEX_PATH, STOPWORDS)
+    sync_keyword_index()
+
+
+def sync_keyword_index() -> None:
+    """Same reconciliation as sync_resume_index, over both the resume and JD registries."""
+    global _keyword_synced
+    with _keyword_lock:
+        version = (_resume_store.version(), _job_store.version())
+        if version == _keyword_synced:
+            return
+        stored = {f"resume:{i}" for i in _resume_store.ids()} | {f"job:{i}" for i in _job_store.ids()}
+        for key in keyword_index.ids() - stored:
+            keyword_index.delete(key)
+        for key in stored - keyword_index.ids():
+            kind, doc_id = key.split(":", 1)
+            doc = (_resume_store if kind == "resume" else _job_store).get(doc_id)
+            if doc is not None:
+                keyword_index.add(key, doc["text"])
+        _keyword_synced = version
+
+
+def resume_profile(file_bytes: bytes) -> ResumeProfile:
+    """Return the cached profile for a PDF (keyed by content hash), building it once."""
+    content_hash = hashlib.sha256(file_bytes).hexdigest()
+    profile      = get_resume(content_hash[:16])
+    if profile is None:
+        raw_text = extract_text_from_pdf(file_bytes)
+        if not raw_text:
+            raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
+        text    = strip_contact_info(raw_text)[:RESUME_MAX_CHARS]
+        profile = ResumeProfile(
+            content_hash=content_hash, text=text,
+            sections=split_sections(text), chunks=chunk_resume(text),
+        )
+        _profiles.set(profile.resume_id, profile)
+    return profile
+
+
+def get_resume(resume_id: str) -> ResumeProfile | None:
+    """Look a profile up in memory, then in the resume registry."""
+    profile = _profiles.get(resume_id)
+    if profile is None:
+        doc = _resume_store.get(resume_id)
+        if doc is not None:
+            profile = ResumeProfile.from_doc(doc, _resume_vectors.get(resume_id))
+            _profiles.set(resume_id, profile)
+    return profile
+
+
+def register_resume(file_bytes: bytes, metadata: dict | None = None,
+                    previous: ResumeProfile | None = None, searchable: bool = True) -> ResumeProfile:
+    """
+    Parse, extract skills and embed a resume once, persist it under its resume_id
+    and add it to the search index (unless `searchable` is False). Re-registering
+    only updates its metadata and searchability. With `previous` (an earlier
+    version), only what changed is re-embedded / re-extracted.
+    """
+    profile   = resume_profile(file_bytes)
+    resume_id = profile.resume_id
+    if previous is not None and previous.resume_id != resume_id:
+        profile.inherit(previous)
+    doc      = _resume_store.get(resume_id)
+    metadata = metadata if metadata is not None else (doc or {}).get("metadata", {})
+    listed   = doc is not None and _unlisted.get(resume_id) is None
+    if doc is None or doc.get("metadata", {}) != metadata or listed != searchable:
+        new_doc = {**profile.to_doc(), "metadata": metadata}   # skills first: a failed extraction persists nothing
+        if not searchable:   # before the document, so no other worker's sync indexes it meanwhile
+            _unlisted.put(resume_id, {})
+            resume_index.delete(resume_id)
+        if doc is None:
+            _resume_vectors.put(resume_id, profile.chunk_embeddings)
+            keyword_index.add(f"resume:{resume_id}", profile.text)
+        _resume_store.put(resume_id, new_doc)
+        if searchable:
+            _unlisted.delete(resume_id)
+            if len(profile.chunk_embeddings):
+                resume_index.add(resume_id, profile.chunk_embeddings, metadata)
+    return profile
+
+
+async def resolve_resume(resume: UploadFile | None, resume_id: str) -> ResumeProfile:
+    """Turn the `resume` upload / `resume_id` form fields into a ResumeProfile (loaded or parsed in a worker thread)."""
+    if resume_id:
+        profile = await asyncio.to_thread(get_resume, resume_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail=f"Unknown resume_id '{resume_id}'. Register it via POST /resumes.")
+        return profile
+    if resume is None:
+        raise HTTPException(status_code=400, detail="Upload a resume PDF or pass a resume_id.")
+    if resume.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+    return await asyncio.to_thread(resume_profile, await resume.read())
+
+
+def resolve_previous(previous_resume_id: str) -> ResumeProfile | None:
+    """The `previous_resume_id` form field: an earlier version of the resume being analysed."""
+    if not previous_resume_id:
+        return None
+    previous = get_resume(previous_resume_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail=f"Unknown previous_resume_id '{previous_resume_id}'.")
+    return previous
+
 
 class ChatMessage(BaseModel):
     role: str = Field(..., description="'user' or 'assistant'", examples=["user"])
@@ -142,67 +534,56 @@ The AI maintains context across turns through the `history` array.
 async def chat_message(req: ChatRequest):
     try:
         conversation = build_chat_conversation(req.message, req.history)
-        response     = chat_client.models.generate_content(model=GEMINI_MODEL, contents=conversation)
+        with llm_call("chat_message") as model:
+            response = get_client("chat").models.generate_content(model=model, contents=conversation)
         reply        = response.text if response.text else "No response generated."
         return ChatResponse(reply=reply)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def market_extract_skills(resume_text: str) -> list[str]:
-    """Extract technical skills from resume text."""
-    prompt = (
-        "Extract all specific technical skills, tools, programming languages, "
-        "frameworks and technologies from this resume.\n"
-        "Be specific — return 'python' not 'programming'.\n"
-        "Return ONLY valid JSON: {\"skills\": [\"python\", \"sql\", \"react\"]}\n"
-        "No broad categories, no markdown fences.\n\n"
-        f"Resume:\n{resume_text[:8000]}"
-    )
-    try:
-        return parse_json(gemini_text(prompt, market_client)).get("skills", [])
-    except Exception:
-        return []
-
-
-def market_analyze(resume_skills: list[str]) -> dict:
-    """Run full market analysis for given skills via a single Gemini call."""
-    prompt = f"""
+MARKET_PROMPT = prompt_registry.register("market_analyze", prefix="""
 You are a senior job market analyst with deep knowledge of current tech hiring trends (2024-2025).
 
-The candidate has these skills: {", ".join(resume_skills)}
-
-Perform a complete market analysis. Return ONLY valid JSON (no markdown):
-{{
+Perform a complete market analysis of the candidate below. Return ONLY valid JSON (no markdown):
+{
   "skill_demand": [
-    {{"skill":"python","demand_score":95,"trend":"rising","level":"high","market_comment":"one line insight"}}
+    {"skill":"python","demand_score":95,"trend":"rising","level":"high","market_comment":"one line insight"}
   ],
   "trending_skills": [
-    {{"skill":"skill name","demand_score":90,"why_trending":"brief reason"}}
+    {"skill":"skill name","demand_score":90,"why_trending":"brief reason"}
   ],
   "skill_gaps": [
-    {{"skill":"missing skill","demand_score":85,"why_needed":"brief reason"}}
+    {"skill":"missing skill","demand_score":85,"why_needed":"brief reason"}
   ],
   "job_matches": [
-    {{"title":"Job Title","match_pct":82,"required_skills":["s1","s2"],"missing_skills":["s3"],"avg_salary_usd":"120000-150000"}}
+    {"title":"Job Title","match_pct":82,"required_skills":["s1","s2"],"missing_skills":["s3"],"avg_salary_usd":"120000-150000"}
   ],
-  "salary_insights": {{
+  "salary_insights": {
     "current_estimated_range":"$X-$Y",
     "potential_range_with_upskilling":"$A-$B",
     "currency":"USD",
     "market_summary":"2-3 sentence salary analysis",
-    "by_role":[{{"role":"name","min":"$X","avg":"$Y","max":"$Z"}}]
-  }},
+    "by_role":[{"role":"name","min":"$X","avg":"$Y","max":"$Z"}]
+  },
   "learning_path": [
-    {{"skill":"skill to learn","priority":"high","estimated_time":"4 weeks","salary_impact":"+$10,000/yr","resource":"YouTube channel or course"}}
+    {"skill":"skill to learn","priority":"high","estimated_time":"4 weeks","salary_impact":"+$10,000/yr","resource":"YouTube channel or course"}
   ],
   "market_summary":"3-4 sentence overall assessment"
-}}
+}
 Rules: demand_score 0-100 | trend: rising/stable/declining | level: high/medium/low
 Top 8 job matches, top 8 trending skills, top 6 skill gaps, top 6 learning path items.
-"""
+""", suffix="""
+The candidate has these skills: {skills}
+""")
+
+
+def market_analyze(resume_skills: list[str]) -> dict:
+    """Run full market analysis for given skills via a single Gemini call."""
     try:
-        return parse_json(gemini_text(prompt, market_client))
+        with llm_call("market_analyze") as model:
+            raw = MARKET_PROMPT.generate(get_client("market"), model, skills=", ".join(resume_skills))
+        return parse_json(raw)
     except Exception as e:
         logger.warning("Market analysis parse error: %s", e)
         return {}
@@ -226,25 +607,19 @@ Upload a resume PDF to receive a **complete job market analysis** including:
 - 💰 Salary insights (current range + potential after upskilling)
 - 🎯 Prioritized learning path with resources
 
-**Form field:** `resume` — PDF file only
+**Form field:** `resume` — PDF file only, **or** `resume_id` from `POST /resumes`
 """,
 )
 async def market_analyze_route(
-    resume: UploadFile = File(..., description="Resume PDF file"),
+    resume: UploadFile | None = File(None, description="Resume PDF file"),
+    resume_id: str = Form("", description="Id of a resume registered via POST /resumes"),
 ):
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-
-    file_bytes  = await resume.read()
-    resume_text = extract_text_from_pdf(file_bytes)
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from the PDF.")
-
-    skills = market_extract_skills(resume_text)
+    profile = await resolve_resume(resume, resume_id)
+    skills  = sorted(await asyncio.to_thread(lambda: profile.skills))   # LLM call on first use
     if not skills:
         raise HTTPException(status_code=422, detail="Could not extract skills from the resume.")
 
-    data = market_analyze(skills)
+    data = await asyncio.to_thread(market_analyze, skills)
     if not data:
         raise HTTPException(status_code=500, detail="Market analysis failed. Please try again.")
 
@@ -258,122 +633,399 @@ async def market_analyze_route(
 
 # ── Core logic ────────────────────────────────────────────────────────────────
 
-def get_embedding(text: str) -> list[float]:
-    """Get a Gemini embedding vector using the ATS module client."""
-    result = ats_client.models.embed_content(model=EMBED_MODEL, contents=text)
-    return result.embeddings[0].values
+# Resume chunks embedded per analysis: the most JD-relevant ones by BM25, not the first N.
+CHUNK_BUDGET = int(os.getenv("CHUNK_BUDGET", "8"))
+
+
+EMBED_BATCH_SIZE = 100   # texts per batchEmbedContents request (API limit)
 
 
-def cosine_similarity(a: list[float], b: list[float]) -> float:
-    dot   = sum(x * y for x, y in zip(a, b))
-    mag_a = math.sqrt(sum(x * x for x in a))
-    mag_b = math.sqrt(sum(y * y for y in b))
-    return 0.0 if (mag_a == 0 or mag_b == 0) else dot / (mag_a * mag_b)
+def embed_texts(texts: list[str]) -> np.ndarray:
+    """Embed each text into one row of a float32 matrix, EMBED_BATCH_SIZE texts per request."""
+    if not texts:
+        return np.empty((0, 0), np.float32)
+    client = get_client("ats")
+    rows   = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        with deadline_guard():
+            result = client.models.embed_content(model=EMBED_MODEL, contents=texts[start:start + EMBED_BATCH_SIZE],
+                                                 config={"http_options": llm_http_options()})
+        rows.extend(e.values for e in result.embeddings)
+    return np.array(rows, np.float32).reshape(len(texts), -1)
 
 
-def ats_semantic_score(resume_text: str, jd_text: str) -> float:
+def jd_coverage(chunk_vecs: np.ndarray, jd_chunk_vecs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     """
-    Chunk resume → embed each chunk + JD → cosine similarity → 0-100 score.
-    Replaces Chroma + LangChain embeddings entirely (avoids SDK conflicts).
+    Max-sim in one matmul: (resume chunks × JD chunks) cosine matrix, then for each
+    JD chunk (requirement) its best resume chunk. Returns (best similarity, best row).
     """
-    splitter   = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=100)
-    chunks     = splitter.split_text(resume_text)
-    if not chunks:
+    dim  = min(np.shape(chunk_vecs)[-1], np.shape(jd_chunk_vecs)[-1])   # stored vectors may be truncated
+    sims = prepare(chunk_vecs, dim) @ prepare(jd_chunk_vecs, dim).T
+    return sims.max(axis=0), sims.argmax(axis=0)
+
+
+def ats_semantic_score(
+    resume_text: str, jd_text: str,
+    chunk_vecs: np.ndarray | None = None, jd_chunk_vecs: np.ndarray | None = None,
+) -> float:
+    """
+    Chunk resume and JD → embed → every JD requirement matched by its best resume
+    chunk → mean coverage as a 0-100 score. Requirements late in a long JD count
+    as much as the first ones. Only the CHUNK_BUDGET resume chunks most relevant
+    to the JD (BM25) are embedded.
+    Pass precomputed `chunk_vecs` (ResumeProfile) / `jd_chunk_vecs` (JobRecord) to skip re-embedding.
+    """
+    if chunk_vecs is None:
+        chunks     = chunk_resume(resume_text)
+        chunk_vecs = embed_texts([chunks[i] for i in select_chunks(chunks, jd_text, CHUNK_BUDGET, STOPWORDS)])
+    if jd_chunk_vecs is None:
+        jd_chunk_vecs = embed_texts(chunk_resume(jd_text[:JD_MAX_CHARS], JD_CHUNK_CHARS))
+    if not len(chunk_vecs) or not len(jd_chunk_vecs):
         return 0.0
-    jd_vec     = get_embedding(jd_text[:3000])
-    chunk_vecs = [get_embedding(c) for c in chunks[:12]]
-    sims       = sorted([cosine_similarity(cv, jd_vec) for cv in chunk_vecs], reverse=True)
-    avg        = sum(sims[:5]) / min(5, len(sims))
-    return round(avg * 100, 2)
-
-
-def ats_keyword_score(resume_text: str, jd_text: str) -> tuple[float, float]:
-    """Keyword-based ATS score + keyword density."""
-    resume_count = Counter(re.findall(r"\w+", resume_text.lower()))
-    jd_keywords  = {w for w in set(re.findall(r"\w+", jd_text.lower()))
-                    if len(w) > 2 and w not in _STOPWORDS and not w.isdigit()}
-    if not jd_keywords:
-        return 0.0, 0.0
-    matched          = sum(1 for kw in jd_keywords if resume_count[kw] > 0)
-    stuffing_penalty = sum(resume_count[kw] - 10 for kw in jd_keywords if resume_count[kw] > 10)
-    kw_density       = matched / len(jd_keywords)
-    final            = max(0.0, kw_density - stuffing_penalty * 0.001)
-    return round(final * 100, 2), round(kw_density * 100, 2)
+    best, _ = jd_coverage(chunk_vecs, jd_chunk_vecs)
+    return round(float(best.mean()) * 100, 2)
+
+
+def ats_bm25_score(resume_text: str, jd_text: str) -> float:
+    """Keyword score weighted by corpus IDF (BM25 against every registered resume and JD), 0-100."""
+    sync_keyword_index()
+    return keyword_index.score(resume_text, jd_text)
+
+
+def resolve_keyword_scorer(name: str) -> str:
+    name = name.strip().lower() or KEYWORD_SCORER
+    if name not in KEYWORD_SCORERS:
+        raise HTTPException(status_code=400, detail=f"keyword_scorer must be one of {', '.join(KEYWORD_SCORERS)}.")
+    return name
+
+
+SKILLS_PROMPT = prompt_registry.register("extract_skills", prefix=(
+    "Extract specific technical skills, tools, programming languages, frameworks, "
+    "and technologies from the following text.\n"
+    "Be specific — return 'python' not 'programming'.\n"
+    "Return ONLY valid JSON: {\"skills\": [\"python\", \"react\", \"sql\"]}\n"
+    "No broad categories, no markdown fences.\n\n"
+), suffix="Text:\n{text}")
+
+
+def _skill_list(parsed, key: str) -> set[str]:
+    skills = parsed.get(key) if isinstance(parsed, dict) else None
+    if not isinstance(skills, list):
+        raise ValueError(f"no '{key}' list in the response")
+    return {canonical_skill(s) for s in skills if isinstance(s, str) and s.strip()}
 
 
 def ats_extract_skills(text: str) -> set[str]:
-    """Extract skills from resume or JD text."""
-    prompt = (
-        "Extract specific technical skills, tools, programming languages, frameworks, "
-        "and technologies from the following text.\n"
-        "Return ONLY valid JSON: {\"skills\": [\"python\", \"react\", \"sql\"]}\n"
-        "No broad categories, no markdown fences.\n\n"
-        f"Text:\n{text}"
-    )
+    """
+    Extract skills from resume or JD text. A failed call or unparseable response
+    raises (502) rather than returning an empty set, so callers never cache or
+    persist "no skills" for a text that simply wasn't analysed; the next request retries.
+    """
     try:
-        parsed = parse_json(gemini_text(prompt, ats_client))
-        return {s.lower().strip() for s in parsed.get("skills", []) if isinstance(s, str)}
+        with llm_call("ats_extract_skills") as model:
+            raw = SKILLS_PROMPT.generate(get_client("ats"), model, text=text)
+        return _skill_list(parse_json(raw), "skills")
     except Exception as e:
         logger.warning("Skills parse error: %s", e)
-        return set()
+        raise HTTPException(status_code=502, detail="Skill extraction failed. Please try again.") from e
 
 
-def ats_debug_info(resume_text: str, jd_text: str) -> dict:
-    """Return keyword debug info (matched / not matched)."""
-    resume_count = Counter(re.findall(r"\w+", resume_text.lower()))
-    jd_keywords  = {w for w in set(re.findall(r"\w+", jd_text.lower()))
-                    if len(w) > 2 and w not in _STOPWORDS and not w.isdigit()}
-    matched      = {kw for kw in jd_keywords if resume_count[kw] > 0}
-    return {"jd_keywords": sorted(jd_keywords), "matched": sorted(matched), "not_matched": sorted(jd_keywords - matched)}
+# A resume and an ad-hoc JD that both still need skill extraction share one call
+# (one preamble, one round trip) unless together they exceed this many characters.
+SKILL_PAIR_MAX_CHARS = int(os.getenv("SKILL_PAIR_MAX_CHARS", "16000"))
 
+SKILL_PAIR_PROMPT = prompt_registry.register("extract_skill_pair", prefix=(
+    "Extract specific technical skills, tools, programming languages, frameworks, "
+    "and technologies from each of the two texts below: a resume and a job description.\n"
+    "Be specific — return 'python' not 'programming'. Use the same name for the same skill in both lists.\n"
+    "Return ONLY valid JSON: {\"resume_skills\": [\"python\", \"sql\"], \"jd_skills\": [\"python\", \"react\"]}\n"
+    "No broad categories, no markdown fences.\n\n"
+), suffix="Resume:\n{resume}\n\nJob description:\n{jd}")
+
+
+def ats_extract_skill_pair(resume_text: str, jd_text: str) -> tuple[set[str], set[str]] | None:
+    """Resume and JD skills (canonicalized) from one call; None if the texts are too long or the call fails."""
+    if len(resume_text) + len(jd_text) > SKILL_PAIR_MAX_CHARS:
+        return None
+    try:
+        with llm_call("ats_extract_skill_pair") as model:
+            raw = SKILL_PAIR_PROMPT.generate(get_client("ats"), model, resume=resume_text, jd=jd_text)
+        parsed = parse_json(raw)
+        return _skill_list(parsed, "resume_skills"), _skill_list(parsed, "jd_skills")
+    except Exception as e:
+        logger.warning("Skill pair parse error, extracting separately: %s", e)
+        return None
 
-def ats_learning_roadmap(missing_skills: list[str], existing_skills: list[str]) -> dict:
-    """Generate a day-by-day learning roadmap for missing skills."""
-    if not missing_skills:
-        return {}
-    prompt = f"""
-You are a senior career coach. The candidate knows: {", ".join(existing_skills[:15])}
-They are missing: {", ".join(missing_skills[:8])}
-Assume 2 hours/day of study.
+
+# Offline bulk scoring (bulk_score.py) extracts the skills of several resumes per call.
+SKILL_BATCH_PROMPT = prompt_registry.register("extract_skills_batch", prefix=(
+    "Extract specific technical skills, tools, programming languages, frameworks, "
+    "and technologies from each of the numbered texts below.\n"
+    "Be specific — return 'python' not 'programming'. Use the same name for the same skill in every list.\n"
+    "Return ONLY valid JSON with one list per text, in order: {\"skills\": [[\"python\", \"sql\"], [\"react\"]]}\n"
+    "No broad categories, no markdown fences.\n\n"
+), suffix="{texts}")
+
+
+def ats_extract_skills_batch(texts: list[str]) -> list[set[str]]:
+    """
+    Skills of each text (canonicalized) from one call. If the response doesn't hold
+    one list per text, the texts are extracted separately (ats_extract_skills).
+    """
+    if len(texts) < 2:
+        return [ats_extract_skills(text) for text in texts]
+    numbered = "\n\n".join(f"Text {i}:\n{text}" for i, text in enumerate(texts, 1))
+    try:
+        with llm_call("ats_extract_skills_batch") as model:
+            raw = SKILL_BATCH_PROMPT.generate(get_client("ats"), model, texts=numbered)
+        parsed = parse_json(raw)
+        lists  = parsed.get("skills") if isinstance(parsed, dict) else None
+        if not isinstance(lists, list) or len(lists) != len(texts):
+            raise ValueError(f"expected {len(texts)} skill lists")
+        return [_skill_list({"skills": skills}, "skills") for skills in lists]
+    except Exception as e:
+        logger.warning("Skill batch parse error, extracting separately: %s", e)
+        return [ats_extract_skills(text) for text in texts]
+
+
+def ats_debug_info(resume_text: str, jd_text: str, matcher: PhraseMatcher | None = None) -> dict:
+    """Return keyword debug info (matched / not matched, and how often each matched term occurs)."""
+    matcher      = keyword_matcher(extract_keywords(jd_text)) if matcher is None else matcher
+    resume_count = matcher.count(resume_text)
+    return {
+        "jd_keywords": matcher.terms,
+        "matched":     sorted(resume_count),
+        "not_matched": [term for term in matcher.terms if term not in resume_count],
+        "counts":      dict(sorted(resume_count.items())),
+    }
+
+
+# Roadmaps are assembled from per-skill fragments. A fragment depends only on
+# (canonical skill, background bucket): the families of skills the candidate
+# already covers, not their exact list, so common gaps are shared by every
+# candidate with a similar background and served from the fragment store.
+# /ats/candidate returns a compact summary (priority, difficulty, days per skill,
+# one call for all uncached skills); the full block with phases, tips and courses
+# is generated when GET /ats/roadmap/{skill} first asks for it.
+ROADMAP_VERSION     = "1"   # bump when the fragment prompt or shape changes
+ROADMAP_MAX_SKILLS  = 8
+ROADMAP_HOURS       = 2
+_SKILL_FAMILIES = {
+    "backend":  {"python", "java", "go", "node.js", "c#", "c++", "rust", "ruby", "php", "django", "flask",
+                 "fastapi", "spring", "rest api", "graphql", "postgresql", "mysql", "mongodb", "redis", "kafka"},
+    "frontend": {"javascript", "typescript", "react", "next.js", "vue", "angular", "html", "css", "tailwind"},
+    "data":     {"sql", "pandas", "numpy", "spark", "airflow", "machine learning", "deep learning",
+                 "scikit-learn", "tensorflow", "pytorch", "statistics", "tableau"},
+    "cloud":    {"aws", "gcp", "azure", "docker", "kubernetes", "terraform", "ci/cd", "linux", "ansible"},
+    "mobile":   {"android", "ios", "kotlin", "swift", "flutter", "react native"},
+}
+_PRIORITY_RANK   = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+_DIFFICULTY_RANK = {"easy": 0, "moderate": 1, "hard": 2, "very hard": 3}
+
+_roadmap_store = JsonStore("roadmap_fragments")
+_roadmap_pool  = ThreadPoolExecutor(max_workers=int(os.getenv("ROADMAP_WORKERS", "8")), thread_name_prefix="roadmap")
+
+
+def background_bucket(existing_skills: Iterable[str]) -> str:
+    """Coarse background of a candidate: the skill families they already cover ('none' if no match)."""
+    known = {canonical_skill(s) for s in existing_skills}
+    return ",".join(family for family, members in _SKILL_FAMILIES.items() if known & members) or "none"
+
+
+def _roadmap_key(kind: str, skill: str, bucket: str) -> str:
+    return hashlib.sha256(f"{ROADMAP_VERSION}|{MODEL_TABLE}|{kind}|{skill}|{bucket}".encode()).hexdigest()[:32]
+
+
+def _background(bucket: str) -> str:
+    return "; ".join(f"{family} ({', '.join(sorted(_SKILL_FAMILIES[family])[:6])})"
+                     for family in bucket.split(",") if family in _SKILL_FAMILIES) or "no listed technical skills"
+
+
+def summary_entry(entry: dict) -> dict:
+    """The compact form of a roadmap entry: what the main response shows per skill."""
+    days = entry.get("days")
+    if days is None:
+        days = (entry.get("time_estimate") or {}).get("total_days")
+    try:
+        days = int(days or 0)
+    except (TypeError, ValueError):
+        days = 0
+    return {
+        "skill":         entry["skill"],
+        "why_important": str(entry.get("why_important", "")),
+        "priority":      str(entry.get("priority", "medium")).lower(),
+        "difficulty":    str(entry.get("difficulty", "moderate")).lower(),
+        "days":          days,
+    }
+
+
+ROADMAP_SUMMARY_PROMPT = prompt_registry.register("roadmap_summary", prefix=f"""
+You are a senior career coach. Summarise a learning plan for each skill listed at the end,
+for a candidate with the background given there. Assume {ROADMAP_HOURS} hours/day of study.
+
+Return ONLY a valid JSON array (no markdown), one object per skill:
+[{{"skill":"skill_name","why_important":"1 sentence","priority":"critical","difficulty":"moderate","days":45}}]
+Rules: priority: critical|high|medium|low | difficulty: easy|moderate|hard|very hard
+""", suffix="""
+Candidate background: {background}
+Skills to summarise: {skills}
+""")
+
+
+def roadmap_summaries(skills: list[str], bucket: str) -> list[dict]:
+    """Summary entries for `skills`, from stored summaries or details; the rest in one short LLM call."""
+    found = {}
+    for skill in skills:
+        doc = _roadmap_store.get(_roadmap_key("summary", skill, bucket)) or _roadmap_store.get(_roadmap_key("detail", skill, bucket))
+        if doc is not None:
+            found[skill] = summary_entry(doc["fragment"])
+    todo = [skill for skill in skills if skill not in found]
+    if todo:
+        try:
+            with llm_call("ats_learning_roadmap") as model:
+                raw = ROADMAP_SUMMARY_PROMPT.generate(
+                    get_client("ats"), model, background=_background(bucket), skills=", ".join(todo))
+            rows = parse_json(raw)
+        except Exception as e:
+            logger.warning("Roadmap summary error: %s", e)
+            rows = []
+        by_skill = {canonical_skill(str(row.get("skill", ""))): row for row in rows if isinstance(row, dict)}
+        for skill in todo:
+            if skill in by_skill:
+                found[skill] = summary_entry({**by_skill[skill], "skill": skill})
+                _roadmap_store.put(_roadmap_key("summary", skill, bucket),
+                                   {"skill": skill, "bucket": bucket, "fragment": found[skill]})
+    return [found[skill] for skill in skills if skill in found]
+
+
+ROADMAP_FRAGMENT_PROMPT = prompt_registry.register("roadmap_fragment", prefix=f"""
+You are a senior career coach. Write the learning plan for the skill named at the end,
+for a candidate with the background given there. Assume {ROADMAP_HOURS} hours/day of study.
 
 Return ONLY valid JSON (no markdown):
 {{
-  "overall": {{
-    "total_days":75,"total_weeks":11,"hours_per_day":2,"difficulty":"Moderate",
-    "summary":"One motivating sentence","recommended_order":["skill1","skill2"],"quick_wins":["skills under 2 weeks"]
-  }},
-  "skills": [
-    {{
-      "skill":"skill_name","why_important":"1 sentence","priority":"critical","difficulty":"moderate",
-      "time_estimate":{{"beginner_days":10,"intermediate_days":15,"expert_days":20,"total_days":45,"time_note":"2 hrs/day"}},
-      "approach":[
-        {{"step":1,"action":"Docs + beginner tutorial","duration":"Days 1-10"}},
-        {{"step":2,"action":"Build 2-3 small projects","duration":"Days 11-25"}},
-        {{"step":3,"action":"Production patterns + interview prep","duration":"Days 26-45"}}
-      ],
-      "phases":[
-        {{"phase":"beginner","days":"Days 1-10","daily_focus":"Core syntax","daily_goal":"Follow tutorial","phase_outcome":"Write basic programs"}},
-        {{"phase":"intermediate","days":"Days 11-25","daily_focus":"Real projects","daily_goal":"Build weekly project","phase_outcome":"Working project"}},
-        {{"phase":"expert","days":"Days 26-45","daily_focus":"Advanced patterns","daily_goal":"Production codebases","phase_outcome":"Job-ready"}}
-      ],
-      "milestones":["Write without syntax lookup","Deploy a project","Explain architecture","Debug real usage"],
-      "tips":{{"do":["Code along tutorials","Build meaningful projects"],"dont":["Read without coding","Skip beginner phase"]}},
-      "courses":{{
-        "beginner":[{{"title":"Title","channel":"freeCodeCamp","search_query":"YouTube query","duration":"4 hours","what_you_learn":"Brief description"}}],
-        "intermediate":[{{"title":"Title","channel":"Traversy Media","search_query":"YouTube query","duration":"6 hours","what_you_learn":"Brief description"}}],
-        "expert":[{{"title":"Title","channel":"Fireship","search_query":"YouTube query","duration":"8 hours","what_you_learn":"Brief description"}}]
-      }}
-    }}
-  ]
+  "skill":"skill_name","why_important":"1 sentence","priority":"critical","difficulty":"moderate",
+  "time_estimate":{{"beginner_days":10,"intermediate_days":15,"expert_days":20,"total_days":45,"time_note":"2 hrs/day"}},
+  "approach":[
+    {{"step":1,"action":"Docs + beginner tutorial","duration":"Days 1-10"}},
+    {{"step":2,"action":"Build 2-3 small projects","duration":"Days 11-25"}},
+    {{"step":3,"action":"Production patterns + interview prep","duration":"Days 26-45"}}
+  ],
+  "phases":[
+    {{"phase":"beginner","days":"Days 1-10","daily_focus":"Core syntax","daily_goal":"Follow tutorial","phase_outcome":"Write basic programs"}},
+    {{"phase":"intermediate","days":"Days 11-25","daily_focus":"Real projects","daily_goal":"Build weekly project","phase_outcome":"Working project"}},
+    {{"phase":"expert","days":"Days 26-45","daily_focus":"Advanced patterns","daily_goal":"Production codebases","phase_outcome":"Job-ready"}}
+  ],
+  "milestones":["Write without syntax lookup","Deploy a project","Explain architecture","Debug real usage"],
+  "tips":{{"do":["Code along tutorials","Build meaningful projects"],"dont":["Read without coding","Skip beginner phase"]}},
+  "courses":{{
+    "beginner":[{{"title":"Title","channel":"freeCodeCamp","search_query":"YouTube query","duration":"4 hours","what_you_learn":"Brief description"}}],
+    "intermediate":[{{"title":"Title","channel":"Traversy Media","search_query":"YouTube query","duration":"6 hours","what_you_learn":"Brief description"}}],
+    "expert":[{{"title":"Title","channel":"Fireship","search_query":"YouTube query","duration":"8 hours","what_you_learn":"Brief description"}}]
+  }}
 }}
 Rules: priority: critical|high|medium|low | difficulty: easy|moderate|hard|very hard
-Use real YouTube channels. 1-2 courses per stage.
-"""
+Build on what the background already covers. Use real YouTube channels. 1-2 courses per stage.
+""", suffix="""
+Candidate background: {background}
+Skill to plan: {skill}
+""")
+
+
+_KNOWN_SKILLS = set().union(*_SKILL_FAMILIES.values(), SKILL_ALIASES.values())
+
+
+def roadmap_skill_known(skill: str, bucket: str) -> bool:
+    """A canonical skill, or one a roadmap for this background has already listed (its summary or detail is stored)."""
+    return (skill in _KNOWN_SKILLS
+            or _roadmap_store.get(_roadmap_key("summary", skill, bucket)) is not None
+            or _roadmap_store.get(_roadmap_key("detail", skill, bucket)) is not None)
+
+
+def roadmap_fragment(skill: str, bucket: str) -> dict | None:
+    """One skill's full roadmap block for a background bucket, generated once and then served from the store."""
+    key = _roadmap_key("detail", skill, bucket)
+    doc = _roadmap_store.get(key)
+    if doc is not None:
+        return doc["fragment"]
     try:
-        return parse_json(gemini_text(prompt, ats_client))
+        with llm_call("ats_roadmap_skill") as model:
+            raw = ROADMAP_FRAGMENT_PROMPT.generate(get_client("ats"), model, background=_background(bucket), skill=skill)
+        fragment = parse_json(raw)
     except Exception as e:
-        logger.warning("Roadmap parse error: %s", e)
+        logger.warning("Roadmap fragment error (%s): %s", skill, e)
+        return None
+    if not isinstance(fragment, dict):
+        return None
+    fragment["skill"] = skill
+    _roadmap_store.put(key, {"skill": skill, "bucket": bucket, "fragment": fragment})
+    return fragment
+
+
+def roadmap_overall(skills: list[dict]) -> dict:
+    """The roadmap's `overall` block, assembled from its skill entries (studied one after another)."""
+    skills     = [summary_entry(e) for e in skills]
+    order      = sorted(skills, key=lambda e: (_PRIORITY_RANK.get(e["priority"], 2), e["days"]))
+    total_days = sum(e["days"] for e in skills)
+    hardest    = max((e["difficulty"] for e in skills), key=lambda d: _DIFFICULTY_RANK.get(d, 1), default="moderate")
+    quick_wins = [e["skill"] for e in order if 0 < e["days"] <= 14]
+    first      = quick_wins[0] if quick_wins else order[0]["skill"]
+    return {
+        "total_days":        total_days,
+        "total_weeks":       -(-total_days // 7),
+        "hours_per_day":     ROADMAP_HOURS,
+        "difficulty":        hardest.title(),
+        "summary":           f"{len(skills)} skill{'s' if len(skills) != 1 else ''} in about {-(-total_days // 7)} weeks "
+                             f"at {ROADMAP_HOURS} hours a day — start with {first}.",
+        "recommended_order": [e["skill"] for e in order],
+        "quick_wins":        quick_wins,
+    }
+
+
+def ats_learning_roadmap(missing_skills: list[str], existing_skills: list[str], detail: bool = False) -> dict:
+    """
+    Learning roadmap for missing skills, `overall` assembled locally. By default each
+    skill is a summary entry (details via GET /ats/roadmap/{skill}?background=...);
+    with `detail`, every skill's full block is generated in parallel.
+    """
+    if not missing_skills:
+        return {}
+    bucket = background_bucket(existing_skills)
+    skills = list(dict.fromkeys(canonical_skill(s) for s in missing_skills))[:ROADMAP_MAX_SKILLS]
+    if detail:
+        entries = [f for f in _roadmap_pool.map(bind_deadline(lambda skill: roadmap_fragment(skill, bucket)), skills) if f]
+    else:
+        entries = roadmap_summaries(skills, bucket)
+    if not entries:
         return {}
+    return {"overall": roadmap_overall(entries), "background": bucket, "detail": detail, "skills": entries}
+
+
+RECRUITER_PROMPT = prompt_registry.register("recruiter_analysis", prefix="""
+You are a senior technical recruiter. Evaluate the candidate described at the end against the JD there.
+
+Return ONLY valid JSON (no markdown):
+{
+  "verdict":"Strong Hire | Good Candidate | Maybe | Needs Improvement | Reject",
+  "verdict_reason":"1-2 sentence justification",
+  "overall_score":82,
+  "scores":{"skill_match":85,"experience_relevance":78,"communication_clarity":80,"technical_depth":75,"culture_fit_indicators":70},
+  "candidate_summary":"3-4 sentence summary",
+  "strengths":["s1","s2","s3"],
+  "red_flags":["f1","f2"],
+  "skill_match_breakdown":{"matched":["s1"],"missing_critical":["s2"],"missing_nice_to_have":["s3"],"bonus_skills":["s4"]},
+  "interview_questions":[{"question":"...","reason":"why"}],
+  "hiring_recommendation":"2-3 sentence recommendation",
+  "salary_band_fit":"entry | mid | senior | lead"
+}
+""", suffix="""
+Resume skills: {resume_skills} | JD required: {jd_skills}
+Matched: {matched} | Missing: {missing}
+Skill match: {match_pct}% | Semantic: {sem_score}/100 | ATS: {ats_final}/100
+Flags: {rule_flags}
+Resume: {resume}
+JD: {jd}
+""")
 
 
 def ats_recruiter_analysis(
@@ -392,32 +1044,16 @@ def ats_recruiter_analysis(
     if ats_final < 40:         rule_flags.append("Low ATS score — may not pass automated screening")
     if sem_score < 40:         rule_flags.append("Low semantic match — content doesn't align with JD")
 
-    prompt = f"""
-You are a senior technical recruiter.
-Resume skills: {sorted(resume_skills)} | JD required: {sorted(jd_skills)}
-Matched: {sorted(matched)} | Missing: {sorted(missing)}
-Skill match: {match_pct}% | Semantic: {sem_score}/100 | ATS: {ats_final}/100
-Flags: {rule_flags}
-Resume: {resume_text[:3000]}
-JD: {jd_text[:2000]}
-
-Return ONLY valid JSON (no markdown):
-{{
-  "verdict":"Strong Hire | Good Candidate | Maybe | Needs Improvement | Reject",
-  "verdict_reason":"1-2 sentence justification",
-  "overall_score":82,
-  "scores":{{"skill_match":85,"experience_relevance":78,"communication_clarity":80,"technical_depth":75,"culture_fit_indicators":70}},
-  "candidate_summary":"3-4 sentence summary",
-  "strengths":["s1","s2","s3"],
-  "red_flags":["f1","f2"],
-  "skill_match_breakdown":{{"matched":["s1"],"missing_critical":["s2"],"missing_nice_to_have":["s3"],"bonus_skills":["s4"]}},
-  "interview_questions":[{{"question":"...","reason":"why"}}],
-  "hiring_recommendation":"2-3 sentence recommendation",
-  "salary_band_fit":"entry | mid | senior | lead"
-}}
-"""
     try:
-        result = parse_json(gemini_text(prompt, ats_client))
+        with llm_call("ats_recruiter_analysis") as model:
+            raw = RECRUITER_PROMPT.generate(
+                get_client("ats"), model,
+                resume_skills=sorted(resume_skills), jd_skills=sorted(jd_skills),
+                matched=sorted(matched), missing=sorted(missing),
+                match_pct=match_pct, sem_score=sem_score, ats_final=ats_final, rule_flags=rule_flags,
+                resume=resume_text[:3000], jd=jd_text[:2000],
+            )
+        result = parse_json(raw)
         result["_meta"] = {"sem_score": sem_score, "ats_score": ats_final, "match_pct": match_pct, "rule_flags": rule_flags}
         return result
     except Exception as e:
@@ -425,30 +1061,367 @@ Return ONLY valid JSON (no markdown):
         return {}
 
 
-async def ats_shared_pipeline(file_bytes: bytes, jd_text: str) -> dict:
-    """Shared pipeline: extract text → scores → skills."""
-    resume_text = extract_text_from_pdf(file_bytes)
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
+# ── Job description registry ──────────────────────────────────────────────────
+
+JD_MAX_CHARS   = 10000
+JD_CHUNK_CHARS = 500    # ~one requirement block per chunk, so coverage is reported per requirement
+
+
+@dataclass
+class JobRecord:
+    """A job description with everything the ATS pipeline derives from it, computed once."""
+    jd_id:            str
+    title:            str
+    text:             str
+    keywords:         list[str]
+    skills:           list[str] | None   # None: ad-hoc JD built for a request that needed none of its skills
+    embedding:        np.ndarray | None
+    chunks:           list[str]
+    chunk_embeddings: np.ndarray | None   # None: ad-hoc JD built for a request that skipped semantic scoring
+
+    def ensure_vectors(self) -> "JobRecord":
+        """Embed the chunks of a record built without vectors."""
+        if self.chunk_embeddings is None:
+            chunk_vecs            = embed_texts(self.chunks)
+            self.embedding        = job_embedding(chunk_vecs)
+            self.chunk_embeddings = chunk_vecs
+        return self
+
+    def ensure_skills(self) -> "JobRecord":
+        """Extract the skills of a record built without them."""
+        if self.skills is None:
+            self.skills = sorted(ats_extract_skills(self.text))
+        return self
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        """Keywords + skill phrases compiled once per JD (jd_id is a content hash, so the cache never goes stale)."""
+        matcher = _matchers.get(self.jd_id)
+        if matcher is None:
+            matcher = keyword_matcher(self.keywords, self.ensure_skills().skills)
+            _matchers.set(self.jd_id, matcher)
+        return matcher
+
+    def to_doc(self) -> dict:
+        """JSON part of the record; the vectors are stored in the embedding store."""
+        return {"jd_id": self.jd_id, "title": self.title, "text": self.text,
+                "keywords": self.keywords, "skills": self.skills, "chunks": self.chunks}
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Whole-JD embedding followed by the chunk embeddings, as stored."""
+        return np.vstack([self.embedding, self.chunk_embeddings.reshape(-1, len(self.embedding))])
+
+    @classmethod
+    def from_doc(cls, doc: dict, vectors: np.ndarray | None) -> "JobRecord":
+        if vectors is None:   # registered before the embedding store
+            vectors = np.asarray([doc["embedding"], *(doc.get("chunk_embeddings") or [])], np.float32)
+        text_fields = {k: doc[k] for k in ("jd_id", "title", "text", "keywords", "skills", "chunks")}
+        # JDs stored without chunk vectors are scored as a single requirement
+        return cls(**text_fields, embedding=vectors[0], chunk_embeddings=vectors[1:] if len(vectors) > 1 else vectors[:1])
+
+
+_job_store   = JsonStore("jobs")
+_job_vectors = EmbeddingStore("job_vectors", EMBED_STORE_DTYPE, EMBED_STORE_DIM)
+_job_cache   = LRUCache(maxsize=256)
+_matchers    = LRUCache(maxsize=256)
+
+
+def jd_id_for(jd_text: str) -> str:
+    """Stable id for a JD: hash of its whitespace/case-normalized text."""
+    normalized = " ".join(jd_text.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+def job_embedding(chunk_vecs: np.ndarray) -> np.ndarray:
+    """Whole-JD vector used to shortlist search candidates: the normalised mean of the chunk vectors."""
+    return prepare(chunk_vecs, chunk_vecs.shape[1]).mean(axis=0) if len(chunk_vecs) else np.zeros(1, np.float32)
+
+
+def build_job_record(jd_text: str, title: str = "", vectors: bool = True, skills: bool = True) -> JobRecord:
+    """
+    Derive keywords, skills and one embedding per JD chunk (one extraction + one
+    batched embed call). `vectors=False` leaves the embeddings to `ensure_vectors`,
+    `skills=False` the skills to `ensure_skills`.
+    """
+    text   = jd_text.strip()[:JD_MAX_CHARS]
+    chunks = chunk_resume(text, JD_CHUNK_CHARS)
+    job    = JobRecord(
+        jd_id=jd_id_for(text), title=title.strip(), text=text,
+        keywords=sorted(extract_keywords(text)),
+        skills=sorted(ats_extract_skills(text)) if skills else None,
+        embedding=None, chunks=chunks, chunk_embeddings=None,
+    )
+    return job.ensure_vectors() if vectors else job
+
+
+def get_job(jd_id: str) -> JobRecord | None:
+    doc = _job_store.get(jd_id)
+    return JobRecord.from_doc(doc, _job_vectors.get(jd_id)) if doc else None
+
+
+def register_job(jd_text: str, title: str = "") -> JobRecord:
+    """
+    Store a JD (idempotent: the same text maps to the same jd_id). A record already
+    built for an ad-hoc request is reused; a failed skill extraction raises before
+    anything is stored.
+    """
+    key = jd_id_for(jd_text.strip()[:JD_MAX_CHARS])
+    job = get_job(key)
+    if job is None:
+        cached = _job_cache.get(key)
+        job    = replace(cached, title=title.strip()).ensure_vectors().ensure_skills() if cached else build_job_record(jd_text, title)
+        _job_vectors.put(job.jd_id, job.vectors)
+        keyword_index.add(f"job:{job.jd_id}", job.text)
+        _job_store.put(job.jd_id, job.to_doc())
+    return job
+
+
+def resolve_job(job_description: str, jd_id: str, vectors: bool = True,
+                profile: ResumeProfile | None = None, skills: bool = True) -> JobRecord:
+    """
+    Turn the `jd_id` / `job_description` form fields into a JobRecord (embedded unless
+    `vectors` is False, with skills unless `skills` is False). `profile` is a resume
+    whose skills the request needs: if neither its skills nor this JD's are known yet,
+    both are extracted in one call.
+    """
+    if jd_id:
+        job = get_job(jd_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown jd_id '{jd_id}'. Register it via POST /jobs.")
+        return job
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    key = jd_id_for(job_description.strip()[:JD_MAX_CHARS])
+    job = get_job(key) or _job_cache.get(key)
+    if job is None:
+        job = build_job_record(job_description, vectors=False, skills=False)
+        _job_cache.set(key, job)
+    if skills and job.skills is None:
+        pair = None
+        if profile is not None and not profile.has_skills:
+            pair = ats_extract_skill_pair(profile.text, job.text)
+        if pair is not None:
+            profile.set_skills(pair[0])
+            job.skills = sorted(pair[1])
+        job.ensure_skills()
+    return job.ensure_vectors() if vectors else job
+
+
+def requirement_coverage(profile: ResumeProfile, chunk_idx: list[int], chunk_vecs: np.ndarray,
+                         job: JobRecord) -> list[dict]:
+    """Per JD chunk: how well the best-matching resume chunk covers it (0-100) and which chunk that is."""
+    if not len(chunk_vecs) or not len(job.chunk_embeddings):
+        return []
+    best, rows   = jd_coverage(chunk_vecs, job.chunk_embeddings)
+    requirements = job.chunks if len(job.chunks) == len(best) else [job.text]
+    return [
+        {
+            "requirement": requirement[:160],
+            "coverage":    round(float(sim) * 100, 2),
+            "best_match":  profile.chunks[chunk_idx[row]][:160],
+        }
+        for requirement, sim, row in zip(requirements, best, rows)
+    ]
+
+
+# Whole responses of /ats/candidate and /ats/recruiter, keyed by (resume content hash,
+# normalized JD hash, endpoint, models, options). Per worker process, like the other caches.
+RESULT_CACHE_VERSION = "1"   # bump when the response shape or scoring changes
+_result_cache = ResultCache(
+    maxsize=int(os.getenv("RESULT_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", "3600")) or None,
+)
+
+
+async def ats_request_key(endpoint: str, resume: UploadFile | None, resume_id: str,
+                          job_description: str, jd_id: str, *options) -> tuple[str, tuple[str, ...]]:
+    """
+    (fingerprint, cache tags) of an ATS request, computed before any parsing or LLM work.
+    The tags name the resume and JD, so deleting either drops the cached results.
+    """
+    resume_key = resume_id
+    if not resume_key and resume is not None:
+        resume_key = hashlib.sha256(await resume.read()).hexdigest()[:16]   # == resume_id of the same PDF
+        await resume.seek(0)
+    jd_key = jd_id or jd_id_for(job_description.strip()[:JD_MAX_CHARS])
+    key    = ResultCache.fingerprint(endpoint, resume_key, jd_key, MODEL_TABLE, EMBED_MODEL, RESULT_CACHE_VERSION, *options)
+    return key, (f"resume:{resume_key}", f"job:{jd_key}")
+
+
+async def cached_ats_response(key: str, idempotency_key: str | None, if_none_match: str | None, compute,
+                              tags: tuple[str, ...] = ()) -> Response:
+    """Serve from the result cache (or join an identical in-flight request); ETag / 304 support."""
+    if not _result_cache.claim(idempotency_key, key):
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request.")
+    result, etag, status = await _result_cache.get_or_compute(key, compute, tags)
+    headers = {"ETag": etag, "X-Cache": status.upper()}
+    if idempotency_key and status != "miss":
+        headers["Idempotent-Replayed"] = "true"
+    if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(result, headers=headers)
+
+
+# Response fields of each ATS endpoint. The `fields` form field selects a subset,
+# and only the pipeline stages those fields need are run: a scores-only request
+# makes no resume skill extraction, roadmap or report call, and an ATS-score-only
+# request embeds nothing. The ATS score matches the JD's keywords and skills, so
+# for a pasted JD it still costs the JD skill extraction call (once per JD);
+# semantic_score / jd_coverage alone make no skill extraction call at all.
+ATS_FIELDS = {
+    "candidate": ("warnings", "semantic_score", "jd_coverage", "ats_score", "keyword_density",
+                  "resume_skills", "jd_skills", "missing_skills", "roadmap", "debug", "revision"),
+    "recruiter": ("warnings", "semantic_score", "jd_coverage", "ats_score", "keyword_density",
+                  "resume_skills", "jd_skills", "report"),
+}
+_STAGE_FIELDS = {   # pipeline stage → the fields that need it
+    "semantic":  {"semantic_score", "jd_coverage", "revision", "report"},
+    "keyword":   {"ats_score", "keyword_density", "revision", "report"},
+    "skills":    {"resume_skills", "missing_skills", "roadmap", "revision", "report"},
+    "jd_skills": {"ats_score", "keyword_density", "jd_skills", "missing_skills", "roadmap", "debug",
+                  "revision", "report"},   # resolved with the JD (resolve_job), never left incomplete
+}
+
+
+def resolve_fields(endpoint: str, fields: str) -> tuple[str, ...]:
+    """The comma-separated `fields` form field (empty = every field), in response order."""
+    if not fields.strip():
+        return ATS_FIELDS[endpoint]
+    wanted  = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(ATS_FIELDS[endpoint])
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                                                    f"Choose from: {', '.join(ATS_FIELDS[endpoint])}.")
+    return tuple(f for f in ATS_FIELDS[endpoint] if f in wanted)
+
+
+def ats_stages(fields: tuple[str, ...]) -> frozenset[str]:
+    return frozenset(stage for stage, needed_by in _STAGE_FIELDS.items() if needed_by.intersection(fields))
+
+
+# Overall time budget of an ATS request, in seconds (the `timeout` form field
+# overrides it). LLM stages still running when it ends are abandoned and the
+# response carries what finished, marked `partial: true`.
+ATS_TIMEOUT = float(os.getenv("ATS_TIMEOUT", "60"))
+_LLM_FIELDS = {"roadmap", "revision", "report"}   # fields that make LLM calls of their own
 
-    resume_text = resume_text[:15000]
-    jd_text     = jd_text.strip()[:10000]
+
+async def resolve_ats_inputs(resume: UploadFile | None, resume_id: str, job_description: str, jd_id: str,
+                             stages: frozenset[str], previous: ResumeProfile | None = None):
+    """(profile, job, revision changes) of an ATS request; 504 if the time budget runs out first."""
+    profile = await resolve_resume(resume, resume_id)
+    try:
+        changes = await within_deadline(profile.inherit, previous) if previous is not None else None
+        job     = await within_deadline(resolve_job, job_description, jd_id, "semantic" in stages,
+                                        profile if "skills" in stages else None, "jd_skills" in stages)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"{e} before the resume and job description were processed.")
+    return profile, job, changes
+
+
+async def ats_shared_pipeline(profile: ResumeProfile, job: JobRecord, keyword_scorer: str = "overlap",
+                              stages: frozenset[str] = frozenset(_STAGE_FIELDS)) -> dict:
+    """
+    Shared pipeline: resume profile + job record → scores → skills, running only `stages`.
+    Stages run in worker threads within the request deadline; a stage that misses
+    it is listed in `incomplete` and its values are left out.
+    """
+    resume_text = profile.text
+    jd_text     = job.text
 
     warnings = []
-    jd_kw_count = len({w for w in set(re.findall(r"\w+", jd_text.lower()))
-                        if len(w) > 2 and w not in _STOPWORDS and not w.isdigit()})
+    jd_kw_count = len(job.keywords)
     if jd_kw_count < 15:
         warnings.append(f"JD only has {jd_kw_count} keywords — scores may be unreliable.")
 
-    sem_score             = ats_semantic_score(resume_text, jd_text)
-    ats_final, kw_density = ats_keyword_score(resume_text, jd_text)
-    resume_skills         = ats_extract_skills(resume_text)
-    jd_skills             = ats_extract_skills(jd_text)
+    data = {
+        "resume_text": resume_text, "jd_text": jd_text,
+        "jd_matcher": job.matcher if "jd_skills" in stages else None,
+        "resume_skills": None, "jd_skills": set(job.skills or ()), "warnings": warnings, "incomplete": set(),
+    }
+    worker_stages = {   # keyword is local, but bm25 syncs the corpus index from disk first
+        "keyword":  lambda: ats_scores(profile, job, keyword_scorer, semantic=False),
+        "semantic": lambda: ats_scores(profile, job, keyword_scorer, keyword=False),
+        "skills":   lambda: {"resume_skills": profile.skills},
+    }
+    for stage, run in worker_stages.items():
+        if stage in stages:
+            try:
+                data.update(await within_deadline(run))
+            except DeadlineExceeded:
+                data["incomplete"].add(stage)
+    return data
+
 
+async def build_ats_fields(selected: tuple[str, ...], builders: dict, incomplete_stages: set[str]) -> dict:
+    """
+    The selected response fields. A field that needs a stage which missed the deadline,
+    or whose own LLM work misses it, is null; the response then has `partial: true`
+    and lists those fields under `incomplete`.
+    """
+    missed = {name for stage in incomplete_stages for name in _STAGE_FIELDS[stage]}
+    result = {}
+    for name in selected:
+        if name in missed:
+            result[name] = None
+        elif name in _LLM_FIELDS:
+            try:
+                result[name] = await within_deadline(builders[name])
+            except DeadlineExceeded:
+                missed.add(name)
+                result[name] = None
+        else:
+            result[name] = builders[name]()
+    incomplete = [name for name in selected if name in missed]
+    if incomplete:
+        result.update(partial=True, incomplete=incomplete)
+    return result
+
+
+def ats_scores(profile: ResumeProfile, job: JobRecord, keyword_scorer: str = "overlap",
+               semantic: bool = True, keyword: bool = True) -> dict:
+    """Semantic (+ per-requirement) and keyword scores of one resume against one JD."""
+    scores = {}
+    if semantic:
+        chunk_idx  = select_chunks(profile.chunks, job.text, CHUNK_BUDGET, STOPWORDS)
+        chunk_vecs = profile.vectors_for(chunk_idx)
+        job.ensure_vectors()
+        scores["sem_score"]   = ats_semantic_score(profile.text, job.text, chunk_vecs, job.chunk_embeddings)
+        scores["jd_coverage"] = requirement_coverage(profile, chunk_idx, chunk_vecs, job)
+    if keyword:
+        scores["ats_final"], scores["kw_density"] = ats_keyword_score(profile.text, job.text, job.matcher)
+        if keyword_scorer == "bm25":
+            scores["ats_final"] = ats_bm25_score(profile.text, job.text)
+    return scores
+
+
+def revision_report(previous: ResumeProfile, job: JobRecord, keyword_scorer: str, data: dict, changes: dict) -> dict:
+    """
+    Compare a revised resume with the version it replaces, against the same JD.
+    The earlier version shares every unchanged chunk vector, so scoring it again
+    only embeds chunks that were removed or rewritten (none if it was registered).
+    """
+    before    = ats_scores(previous, job, keyword_scorer)
+    deltas    = {
+        "semantic_score":  round(data["sem_score"] - before["sem_score"], 2),
+        "ats_score":       round(data["ats_final"] - before["ats_final"], 2),
+        "keyword_density": round(data["kw_density"] - before["kw_density"], 2),
+    }
+    skills    = data["resume_skills"]
+    was_gap   = data["jd_skills"] - previous.skills
+    is_gap    = data["jd_skills"] - skills
     return {
-        "resume_text": resume_text, "jd_text": jd_text,
-        "sem_score": sem_score, "ats_final": ats_final, "kw_density": kw_density,
-        "resume_skills": resume_skills, "jd_skills": jd_skills, "warnings": warnings,
+        "previous_resume_id": previous.resume_id,
+        "previous":           {"semantic_score": before["sem_score"], "ats_score": before["ats_final"],
+                               "keyword_density": before["kw_density"]},
+        "deltas":             deltas,
+        "summary":            f"{round(deltas['semantic_score'], 1):+g} semantic, {round(deltas['ats_score'], 1):+g} ATS",
+        "skills_added":       sorted(skills - previous.skills),
+        "skills_removed":     sorted(previous.skills - skills),
+        "gaps_closed":        sorted(was_gap - is_gap),
+        "gaps_opened":        sorted(is_gap - was_gap),
+        **changes,
     }
 
 
@@ -456,6 +1429,108 @@ async def ats_shared_pipeline(file_bytes: bytes, jd_text: str) -> dict:
 
 ats_tag = ["🚀 ATS Resume Analyzer"]
 
+@app.post(
+    "/resumes",
+    tags=ats_tag,
+    summary="Register a resume PDF",
+    description="""
+Upload a resume once. Its text, sections, chunks, skills and chunk embeddings are stored
+under a `resume_id` that `/market/analyze`, `/ats/candidate` and `/ats/recruiter` accept
+in place of the PDF, and it becomes searchable via `/ats/search`. Uploading the same file
+again returns the same id (and replaces its metadata if given). Pass `previous_resume_id`
+when uploading a revision: only its changed chunks and sections are re-processed.
+`searchable=false` registers it for reuse by id only, kept out of `/ats/search`.
+""",
+)
+async def create_resume(
+    resume:   UploadFile = File(..., description="Resume PDF"),
+    metadata: str        = Form("", description='Optional JSON object used by /ats/search filters, e.g. {"pool": "campus-2025"}'),
+    previous_resume_id: str = Form("", description="Id of the version this upload revises; unchanged parts are reused"),
+    searchable: bool = Form(True, description="false: only reusable by id, never returned by /ats/search"),
+):
+    if resume.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+    meta = None
+    if metadata.strip():
+        try:
+            meta = json.loads(metadata)
+        except json.JSONDecodeError:
+            meta = None
+        if not isinstance(meta, dict):
+            raise HTTPException(status_code=400, detail="metadata must be a JSON object.")
+    previous = await asyncio.to_thread(resolve_previous, previous_resume_id)
+    profile  = await asyncio.to_thread(register_resume, await resume.read(), meta, previous, searchable)
+    return {
+        "resume_id": profile.resume_id,
+        "chars":     len(profile.text),
+        "sections":  sorted(profile.sections),
+        "chunks":    len(profile.chunks),
+        "skills":    sorted(profile.skills),
+    }
+
+
+@app.delete("/resumes/{resume_id}", tags=ats_tag, summary="Delete a registered resume")
+async def delete_resume(resume_id: str):
+    _profiles.pop(resume_id)
+    resume_index.delete(resume_id)
+    keyword_index.delete(f"resume:{resume_id}")
+    _resume_vectors.delete(resume_id)
+    _unlisted.delete(resume_id)
+    _result_cache.invalidate(f"resume:{resume_id}")
+    if not _resume_store.delete(resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found.")
+    return {"deleted": resume_id}
+
+
+class JobCreateRequest(BaseModel):
+    job_description: str = Field(..., description="Full job description text")
+    title:           str = Field("",  description="Optional display title", examples=["Senior Backend Engineer"])
+
+
+def job_summary(job: JobRecord) -> dict:
+    return {
+        "jd_id":       job.jd_id,
+        "title":       job.title,
+        "keywords":    len(job.keywords),
+        "skills":      job.skills,
+        "chunks":      len(job.chunks),
+    }
+
+
+@app.post(
+    "/jobs",
+    tags=ats_tag,
+    summary="Register a job description",
+    description="""
+Register a JD once and reuse it by id. Keywords, skills and embeddings are computed
+at registration, so `/ats/candidate` and `/ats/recruiter` with `jd_id` skip all JD-side work.
+Registering the same text again returns the same `jd_id`.
+""",
+)
+async def create_job(req: JobCreateRequest):
+    if not req.job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    return job_summary(await asyncio.to_thread(register_job, req.job_description, req.title))
+
+
+@app.get("/jobs/{jd_id}", tags=ats_tag, summary="Get a registered job description")
+async def read_job(jd_id: str):
+    job = get_job(jd_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {**job_summary(job), "text": job.text}
+
+
+@app.delete("/jobs/{jd_id}", tags=ats_tag, summary="Delete a registered job description")
+async def delete_job(jd_id: str):
+    _job_vectors.delete(jd_id)
+    keyword_index.delete(f"job:{jd_id}")
+    _result_cache.invalidate(f"job:{jd_id}")
+    if not _job_store.delete(jd_id):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {"deleted": jd_id}
+
+
 @app.post(
     "/ats/candidate",
     tags=ats_tag,
@@ -469,42 +1544,102 @@ Upload your resume PDF and paste the job description to receive:
 - ✅ **Resume skills** — all skills detected in your resume
 - 🎯 **JD skills** — all skills required by the job description
 - ❌ **Missing skills** — skills in the JD that you don't have
-- 🗓️ **Learning roadmap** — day-by-day plan with YouTube courses for every missing skill
+- 🗓️ **Learning roadmap** — priority, difficulty and days per missing skill; the day-by-day plan with
+  YouTube courses for a skill comes from `GET /ats/roadmap/{skill}?background=...`
 - 🐛 **Debug info** — exact keywords matched/not matched
 
 **Form fields:**
-- `resume` — PDF file
-- `job_description` — full job description text
+- `resume` — PDF file, **or** `resume_id` from `POST /resumes`
+- `job_description` — full job description text, **or**
+- `jd_id` — id returned by `POST /jobs` (skips all JD-side processing)
+- `keyword_scorer` — `overlap` (share of JD keywords present) or `bm25` (IDF-weighted against the stored corpus)
+- `previous_resume_id` — earlier version of this resume: only changed chunks are re-embedded and only
+  changed sections re-run skill extraction; `revision` reports score deltas ("+6 semantic, +3 ATS")
+- `roadmap_detail` — `true` to inline every skill's full roadmap block (slower; generated in parallel)
+- `fields` — comma-separated subset of the response, e.g. `semantic_score,ats_score`; stages no selected
+  field needs (skill extraction, roadmap, debug, embeddings) are not run. `ats_score` and `keyword_density`
+  match the JD's skills, so a pasted JD still costs its skill extraction call; `semantic_score` alone doesn't
+- `timeout` — time budget in seconds (default `ATS_TIMEOUT`); fields whose LLM work doesn't finish in time
+  are `null`, listed under `incomplete`, and the response has `partial: true` (partial responses aren't cached)
 """,
 )
 async def ats_candidate(
-    resume: UploadFile = File(..., description="Resume PDF"),
-    job_description: str = Form(..., description="Full job description text"),
+    resume: UploadFile | None = File(None, description="Resume PDF (or pass `resume_id`)"),
+    resume_id: str = Form("", description="Id of a resume registered via POST /resumes"),
+    job_description: str = Form("", description="Full job description text (or pass `jd_id`)"),
+    jd_id: str = Form("", description="Id of a JD registered via POST /jobs"),
+    keyword_scorer: str = Form("", description="ATS keyword score: 'overlap' or 'bm25' (default: KEYWORD_SCORER)"),
+    previous_resume_id: str = Form("", description="Id of the previous version of this resume (→ incremental run + score deltas)"),
+    roadmap_detail: bool = Form(False, description="Inline every skill's full roadmap block instead of the summary"),
+    fields: str = Form("", description="Comma-separated response fields to compute (default: all)"),
+    timeout: float = Form(0, ge=0, le=300, description="Time budget in seconds (default: ATS_TIMEOUT); unfinished stages → partial"),
+    idempotency_key: str | None = Header(None, description="Replays the stored result of a request sent with the same key"),
+    if_none_match: str | None = Header(None, description="ETag of a result the client already has (→ 304)"),
 ):
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-    if not job_description.strip():
-        raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    scorer    = resolve_keyword_scorer(keyword_scorer)
+    selected  = resolve_fields("candidate", fields)
+    stages    = ats_stages(selected)
+    key, tags = await ats_request_key("candidate", resume, resume_id, job_description, jd_id, scorer,
+                                      previous_resume_id, roadmap_detail, ",".join(selected))
+    if previous_resume_id:   # the revision report is computed from it too
+        tags += (f"resume:{previous_resume_id}",)
+
+    def candidate_builders(data: dict, job: JobRecord, previous: ResumeProfile | None, changes: dict | None) -> dict:
+        missing = lambda: sorted(data["jd_skills"] - data["resume_skills"])
+        return {   # only the selected fields are built
+            "warnings":        lambda: data["warnings"],
+            "semantic_score":  lambda: data["sem_score"],
+            "jd_coverage":     lambda: data["jd_coverage"],
+            "ats_score":       lambda: data["ats_final"],
+            "keyword_density": lambda: data["kw_density"],
+            "resume_skills":   lambda: sorted(data["resume_skills"]),
+            "jd_skills":       lambda: sorted(data["jd_skills"]),
+            "missing_skills":  missing,
+            "roadmap":         lambda: ats_learning_roadmap(missing(), list(data["resume_skills"]), roadmap_detail),
+            "debug":           lambda: ats_debug_info(data["resume_text"], data["jd_text"], data["jd_matcher"]),
+            "revision":        lambda: revision_report(previous, job, scorer, data, changes) if previous is not None else None,
+        }
+
+    async def compute() -> dict:
+        with request_deadline(timeout or ATS_TIMEOUT):
+            previous              = await asyncio.to_thread(resolve_previous, previous_resume_id)
+            profile, job, changes = await resolve_ats_inputs(resume, resume_id, job_description, jd_id, stages, previous)
+            data                  = await ats_shared_pipeline(profile, job, scorer, stages)
+            return await build_ats_fields(selected, candidate_builders(data, job, previous, changes), data["incomplete"])
+
+    return await cached_ats_response(key, idempotency_key, if_none_match, compute, tags)
 
-    file_bytes    = await resume.read()
-    data          = await ats_shared_pipeline(file_bytes, job_description)
-    resume_skills = data["resume_skills"]
-    jd_skills     = data["jd_skills"]
-    missing       = sorted(jd_skills - resume_skills)
-    roadmap       = ats_learning_roadmap(missing, list(resume_skills)) if missing else {}
-    debug         = ats_debug_info(data["resume_text"], data["jd_text"])
 
-    return {
-        "warnings":        data["warnings"],
-        "semantic_score":  data["sem_score"],
-        "ats_score":       data["ats_final"],
-        "keyword_density": data["kw_density"],
-        "resume_skills":   sorted(resume_skills),
-        "jd_skills":       sorted(jd_skills),
-        "missing_skills":  missing,
-        "roadmap":         roadmap,
-        "debug":           debug,
-    }
+@app.get(
+    "/ats/roadmap/{skill:path}",   # :path so that ci/cd (sent as ci%2Fcd) still matches
+    tags=ats_tag,
+    summary="Full roadmap block for one skill",
+    description="""
+Phases, approach, milestones, tips and courses for one skill of a candidate roadmap. Pass the
+roadmap's `background` (skill families the candidate already covers). Generated on first
+request, then served from the fragment store to every candidate with that background.
+Only skills of a roadmap already returned for that background (or known skills such as
+`docker`) are accepted; anything else is 404 and generates nothing.
+""",
+)
+async def ats_roadmap_skill(
+    skill: str,
+    background: str = Query("none", description="`roadmap.background` of the /ats/candidate response, e.g. backend,cloud"),
+):
+    skill    = canonical_skill(skill)
+    families = {b.strip() for b in background.split(",") if b.strip()} - {"none"}
+    if not skill or len(skill) > 60:
+        raise HTTPException(status_code=400, detail="skill must be 1-60 characters.")
+    if not families <= _SKILL_FAMILIES.keys():
+        raise HTTPException(status_code=400, detail=f"background must be 'none' or families from: {', '.join(_SKILL_FAMILIES)}.")
+    bucket   = ",".join(f for f in _SKILL_FAMILIES if f in families) or "none"
+    if not roadmap_skill_known(skill, bucket):
+        raise HTTPException(status_code=404, detail=f"No roadmap lists '{skill}' for background '{bucket}'. "
+                                                    "Request the candidate roadmap first.")
+    fragment = await asyncio.to_thread(roadmap_fragment, skill, bucket)
+    if fragment is None:
+        raise HTTPException(status_code=502, detail="Roadmap generation failed, try again.")
+    return fragment
 
 
 @app.post(
@@ -522,37 +1657,131 @@ Upload a candidate resume PDF and job description to receive a **recruiter-grade
 - 📋 **Hiring recommendation** — Concrete next-step advice
 
 **Form fields:**
-- `resume` — PDF file
-- `job_description` — full job description text
+- `resume` — PDF file, **or** `resume_id` from `POST /resumes`
+- `job_description` — full job description text, **or**
+- `jd_id` — id returned by `POST /jobs` (skips all JD-side processing)
+- `keyword_scorer` — `overlap` (share of JD keywords present) or `bm25` (IDF-weighted against the stored corpus)
+- `fields` — comma-separated subset of the response, e.g. `semantic_score,ats_score`; without `report`
+  no recruiter analysis call is made. `ats_score` matches the JD's skills, so a pasted JD still costs its
+  skill extraction call; `semantic_score` alone doesn't
+- `timeout` — time budget in seconds (default `ATS_TIMEOUT`). If the recruiter analysis (or another LLM stage)
+  doesn't finish in time, the scores that did are returned with `report: null`, `partial: true` and `incomplete`
 """,
 )
 async def ats_recruiter(
-    resume: UploadFile = File(..., description="Candidate resume PDF"),
-    job_description: str = Form(..., description="Full job description text"),
+    resume: UploadFile | None = File(None, description="Candidate resume PDF (or pass `resume_id`)"),
+    resume_id: str = Form("", description="Id of a resume registered via POST /resumes"),
+    job_description: str = Form("", description="Full job description text (or pass `jd_id`)"),
+    jd_id: str = Form("", description="Id of a JD registered via POST /jobs"),
+    keyword_scorer: str = Form("", description="ATS keyword score: 'overlap' or 'bm25' (default: KEYWORD_SCORER)"),
+    fields: str = Form("", description="Comma-separated response fields to compute (default: all)"),
+    timeout: float = Form(0, ge=0, le=300, description="Time budget in seconds (default: ATS_TIMEOUT); unfinished stages → partial"),
+    idempotency_key: str | None = Header(None, description="Replays the stored result of a request sent with the same key"),
+    if_none_match: str | None = Header(None, description="ETag of a result the client already has (→ 304)"),
 ):
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-    if not job_description.strip():
-        raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    scorer    = resolve_keyword_scorer(keyword_scorer)
+    selected  = resolve_fields("recruiter", fields)
+    stages    = ats_stages(selected)
+    key, tags = await ats_request_key("recruiter", resume, resume_id, job_description, jd_id, scorer, ",".join(selected))
+
+    def recruiter_report(data: dict) -> dict:
+        report = ats_recruiter_analysis(
+            data["resume_text"], data["jd_text"],
+            data["resume_skills"], data["jd_skills"],
+            data["sem_score"], data["ats_final"],
+        )
+        if not report:
+            raise HTTPException(status_code=500, detail="Recruiter analysis failed. Please try again.")
+        return report
+
+    def recruiter_builders(data: dict) -> dict:
+        return {   # only the selected fields are built
+            "warnings":        lambda: data["warnings"],
+            "semantic_score":  lambda: data["sem_score"],
+            "jd_coverage":     lambda: data["jd_coverage"],
+            "ats_score":       lambda: data["ats_final"],
+            "keyword_density": lambda: data["kw_density"],
+            "resume_skills":   lambda: sorted(data["resume_skills"]),
+            "jd_skills":       lambda: sorted(data["jd_skills"]),
+            "report":          lambda: recruiter_report(data),
+        }
+
+    async def compute() -> dict:
+        with request_deadline(timeout or ATS_TIMEOUT):
+            profile, job, _ = await resolve_ats_inputs(resume, resume_id, job_description, jd_id, stages)
+            data            = await ats_shared_pipeline(profile, job, scorer, stages)
+            return await build_ats_fields(selected, recruiter_builders(data), data["incomplete"])
+
+    return await cached_ats_response(key, idempotency_key, if_none_match, compute, tags)
+
+
+class SearchRequest(BaseModel):
+    job_description: str            = Field("", description="Full job description text (or pass `jd_id`)")
+    jd_id:           str            = Field("", description="Id of a JD registered via POST /jobs")
+    k:               int            = Field(10, ge=1, le=100, description="How many candidates to return")
+    filters:         dict[str, Any] = Field(default={}, description="Metadata filters; a list value matches any of its items",
+                                            examples=[{"pool": ["campus-2025", "referrals"]}])
+    keyword_weight:  float          = Field(0.0, ge=0, le=1, description="Blend in corpus BM25 keyword score: "
+                                            "(1 - w) × semantic + w × keyword")
+
+
+def search_candidates(job: JobRecord, k: int, filters: dict, keyword_weight: float = 0.0) -> list[dict]:
+    """Rank registered resumes against a JD and attach each match's evidence chunks."""
+    sync_resume_index()
+    shortlist = min(max(4 * k, 50), 400) if keyword_weight else k
+    hits      = resume_index.search(job.chunk_embeddings, shortlist, filters, coarse_query=job.embedding)
+    if keyword_weight:
+        # Rerank the semantic shortlist; all keyword scores come from one sparse mat-vec.
+        sync_keyword_index()
+        keyword = keyword_index.score_docs(job.text, [f"resume:{hit['id']}" for hit in hits])
+        for hit, kw in zip(hits, keyword):
+            hit["keyword_score"] = kw
+            hit["score"]         = (1 - keyword_weight) * hit["score"] + keyword_weight * kw / 100
+        hits = sorted(hits, key=lambda hit: -hit["score"])[:k]
+    results = []
+    for hit in hits:
+        profile  = get_resume(hit["id"])
+        if profile is None:
+            continue
+        evidence = {}
+        for e in hit["evidence"]:
+            chunk = profile.chunks[e["chunk"]]
+            if chunk not in evidence:
+                evidence[chunk] = {"chunk": chunk, "similarity": round(e["similarity"] * 100, 2)}
+        results.append({
+            "resume_id":      hit["id"],
+            "score":          round(hit["score"] * 100, 2),
+            **({"keyword_score": hit["keyword_score"]} if "keyword_score" in hit else {}),
+            "metadata":       hit["metadata"],
+            "matched_skills": sorted(profile.skills & set(job.skills)),
+            "evidence":       list(evidence.values())[:3],
+        })
+    return results
 
-    file_bytes = await resume.read()
-    data       = await ats_shared_pipeline(file_bytes, job_description)
-    report     = ats_recruiter_analysis(
-        data["resume_text"], data["jd_text"],
-        data["resume_skills"], data["jd_skills"],
-        data["sem_score"], data["ats_final"],
-    )
-    if not report:
-        raise HTTPException(status_code=500, detail="Recruiter analysis failed. Please try again.")
 
+@app.post(
+    "/ats/search",
+    tags=ats_tag,
+    summary="Search registered resumes for a job description",
+    description="""
+Rank every resume registered via `POST /resumes` against a JD, without any LLM calls
+per candidate. Each candidate is scored by max-sim: for every JD chunk, its best-matching
+resume chunk; the scores are averaged. The best-matching resume chunks are returned as evidence.
+
+Pass `jd_id` from `POST /jobs` or `job_description`. `filters` match the metadata given at
+registration. `keyword_weight` > 0 reranks a semantic shortlist by blending in a BM25 keyword
+score whose IDF comes from every registered resume and JD.
+""",
+)
+async def ats_search(req: SearchRequest):
+    job   = await asyncio.to_thread(resolve_job, req.job_description, req.jd_id)
+    start = time.perf_counter()
+    results = await asyncio.to_thread(search_candidates, job, req.k, req.filters, req.keyword_weight)
     return {
-        "warnings":        data["warnings"],
-        "semantic_score":  data["sem_score"],
-        "ats_score":       data["ats_final"],
-        "keyword_density": data["kw_density"],
-        "resume_skills":   sorted(data["resume_skills"]),
-        "jd_skills":       sorted(data["jd_skills"]),
-        "report":          report,
+        "jd_id":    job.jd_id,
+        "searched": len(resume_index),
+        "took_ms":  round((time.perf_counter() - start) * 1000, 1),
+        "results":  results,
     }
 
 
@@ -597,7 +1826,7 @@ Return ONLY valid JSON (no markdown):
 }}
 """
     try:
-        return parse_json(gemini_text(prompt, interview_client)).get("questions", [])
+        return parse_json(gemini_text(prompt, get_client("interview"), "interview_questions")).get("questions", [])
     except Exception as e:
         logger.warning("Questions parse error: %s", e)
         return []
@@ -622,7 +1851,7 @@ Respond as a real interviewer:
 - Keep response to 2-4 sentences, professional but conversational
 - Do NOT give scores or feedback yet
 """
-    return gemini_text(prompt, interview_client)
+    return gemini_text(prompt, get_client("interview"), "interview_chat")
 
 
 def interview_generate_feedback(role: str, questions: list[dict], answers: list[str]) -> dict:
@@ -651,7 +1880,7 @@ Return ONLY valid JSON (no markdown):
 }}
 """
     try:
-        return parse_json(gemini_text(prompt, interview_client))
+        return parse_json(gemini_text(prompt, get_client("interview"), "interview_feedback"))
     except Exception as e:
         logger.warning("Feedback parse error: %s", e)
         return {}
@@ -762,13 +1991,96 @@ async def health():
         "modules": {
             "chat":      {"key_env": "CHAT_GEMINI_KEY",      "endpoints": ["POST /chat/message"]},
             "market":    {"key_env": "MARKET_GEMINI_KEY",    "endpoints": ["POST /market/analyze"]},
-            "ats":       {"key_env": "ATS_GEMINI_KEY",       "endpoints": ["POST /ats/candidate", "POST /ats/recruiter"]},
+            "ats":       {"key_env": "ATS_GEMINI_KEY",       "endpoints": ["POST /resumes", "POST /jobs", "POST /ats/candidate", "POST /ats/recruiter", "POST /ats/search"]},
             "interview": {"key_env": "INTERVIEW_GEMINI_KEY", "endpoints": ["POST /interview/questions", "POST /interview/chat", "POST /interview/feedback"]},
         },
-        "model": GEMINI_MODEL,
+        "models": {route: model_router.configured(route) for route in MODEL_ROUTES},
     }
 
 
+def require_admin(token: str | None) -> None:
+    """Hide debug endpoints unless ADMIN_TOKEN is configured and matches."""
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@app.get(
+    "/debug/profile",
+    tags=["⚙️ System"],
+    summary="Sampling profile of this worker (admin)",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def debug_profile(
+    seconds: float = Query(5, gt=0, le=60, description="How long to sample"),
+    x_admin_token: str | None = Header(None),
+):
+    require_admin(x_admin_token)
+    try:
+        return await asyncio.to_thread(sample_profile, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get(
+    "/debug/loop-lag",
+    tags=["⚙️ System"],
+    summary="Recorded event-loop stalls (admin)",
+    include_in_schema=False,
+)
+async def debug_loop_lag(x_admin_token: str | None = Header(None)):
+    require_admin(x_admin_token)
+    if not loop_lag_monitor:
+        return {"enabled": False}
+    return {"enabled": True, **loop_lag_monitor.snapshot()}
+
+
+@app.get(
+    "/debug/index",
+    tags=["⚙️ System"],
+    summary="Search index size and shard loads (admin)",
+    include_in_schema=False,
+)
+async def debug_index(x_admin_token: str | None = Header(None)):
+    require_admin(x_admin_token)
+    if isinstance(resume_index, ShardedIndex):
+        return {"sharded": True, **resume_index.stats()}
+    return {"sharded": False, "docs": len(resume_index)}
+
+
+@app.get(
+    "/debug/cache",
+    tags=["⚙️ System"],
+    summary="In-process cache sizes and hit rates (admin)",
+    include_in_schema=False,
+)
+async def debug_cache(x_admin_token: str | None = Header(None)):
+    require_admin(x_admin_token)
+    return {"results": _result_cache.stats(), "profiles": _profiles.stats(), "jobs": _job_cache.stats()}
+
+
+@app.get(
+    "/debug/prompts",
+    tags=["⚙️ System"],
+    summary="Per-template prompt calls and cached vs uncached input tokens (admin)",
+    include_in_schema=False,
+)
+async def debug_prompts(x_admin_token: str | None = Header(None)):
+    require_admin(x_admin_token)
+    return prompt_registry.stats()
+
+
+@app.get(
+    "/debug/routes",
+    tags=["⚙️ System"],
+    summary="Model routing table, current model per route and per-model latencies (admin)",
+    include_in_schema=False,
+)
+async def debug_routes(x_admin_token: str | None = Header(None)):
+    require_admin(x_admin_token)
+    return model_router.stats()
+
+
 @app.get(
     "/",
     tags=["⚙️ System"],
@@ -784,7 +2096,7 @@ async def root():
         "endpoints": {
             "chat":      ["POST /chat/message"],
             "market":    ["POST /market/analyze"],
-            "ats":       ["POST /ats/candidate", "POST /ats/recruiter"],
+            "ats":       ["POST /resumes", "POST /jobs", "GET /jobs/{jd_id}", "POST /ats/candidate", "POST /ats/recruiter", "POST /ats/search"],
             "interview": ["POST /interview/questions", "POST /interview/chat", "POST /interview/feedback"],
         },
     }
\ No newline at end of file
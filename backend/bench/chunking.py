@@ -0,0 +1,103 @@
+"""
+Chunker comparison: native `chunk_resume` vs LangChain's 600/100 recursive splitter.
+
+Reports chunk count, embedding calls per analysis, how many chunks straddle a
+section boundary, chunking throughput, and semantic-score stability — the spread
+of the score when the same resume is lightly edited (uses the fake embedder, so
+no network).
+
+    python -m bench.chunking --out bench_chunking.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from bench.corpus import generate_jd, generate_resume
+from bench.fake_gemini import fake_embedding
+from chunking import chunk_resume, is_heading
+
+PAGES = [1, 3, 10, 30]
+
+
+def recursive_splitter():
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        return None
+    return RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=100).split_text
+
+
+def semantic_score(chunks: list[str], jd: str) -> float:
+    """Same aggregation as api.ats_semantic_score (per-JD-chunk max-sim), with the offline embedder."""
+    if not chunks:
+        return 0.0
+    vecs = [fake_embedding(c) for c in chunks[:12]]
+    best = [max(sum(a * b for a, b in zip(v, jd_vec)) for v in vecs)
+            for jd_vec in map(fake_embedding, chunk_resume(jd, 500))]
+    return round(sum(best) / len(best) * 100, 2) if best else 0.0
+
+
+def perturbations(resume: str) -> list[str]:
+    """Small edits a user typically makes between two uploads."""
+    lines = resume.splitlines()
+    return [
+        resume,
+        "\n".join(lines[:2] + ["Open to relocation."] + lines[2:]),
+        "\n".join(lines[:5] + [lines[5] + " Passionate about clean, well-tested code."] + lines[6:]),
+        "\n\n".join(line + "  " for line in lines),
+        resume.replace("\n- ", "\n• "),
+    ]
+
+
+def straddling(chunks: list[str]) -> int:
+    """Chunks that contain a section heading anywhere but their first line."""
+    return sum(any(is_heading(l.strip()) for l in c.splitlines()[1:]) for c in chunks)
+
+
+def evaluate(split, resume: str, jd: str, min_time: float) -> dict:
+    chunks = split(resume)
+    runs, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        split(resume)
+        runs += 1
+    ops    = runs / (time.perf_counter() - start)
+    scores = [semantic_score(split(variant), jd) for variant in perturbations(resume)]
+    return {
+        "chunks":          len(chunks),
+        "embed_calls":     min(12, len(chunks)) + 1,
+        "mean_chunk_len":  round(sum(map(len, chunks)) / max(1, len(chunks))),
+        "straddling":      straddling(chunks),
+        "ops_per_sec":     round(ops, 1),
+        "score":           scores[0],
+        "score_stdev":     round(statistics.pstdev(scores), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare resume chunkers")
+    parser.add_argument("--pages", default=",".join(map(str, PAGES)))
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--out", default="bench_chunking.json")
+    args = parser.parse_args()
+
+    chunkers = {"native": chunk_resume}
+    if (baseline := recursive_splitter()) is not None:
+        chunkers["recursive_600_100"] = baseline
+
+    results: dict[str, dict] = {}
+    for pages in (int(p) for p in args.pages.split(",")):
+        resume, jd = generate_resume(pages, seed=pages), generate_jd(300, seed=pages)
+        for name, split in chunkers.items():
+            stats = evaluate(split, resume, jd, args.min_time)
+            results.setdefault(name, {})[f"{pages}p"] = stats
+            print(f"{name:18s} {pages:>3}p  {stats}", file=sys.stderr)
+
+    with open(args.out, "w") as f:
+        json.dump({"chunkers": results}, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
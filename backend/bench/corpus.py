@@ -0,0 +1,127 @@
+"""
+Deterministic synthetic resumes / job descriptions and a tiny PDF writer.
+
+Used by the benchmark scripts so runs are reproducible without real user data.
+"""
+import random
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "sql", "postgresql",
+    "mongodb", "redis", "react", "next.js", "node.js", "fastapi", "django", "flask",
+    "docker", "kubernetes", "terraform", "aws", "gcp", "azure", "ci/cd", "git",
+    "machine learning", "deep learning", "pytorch", "tensorflow", "pandas", "numpy",
+    "spark", "kafka", "airflow", "graphql", "rest api", "linux", "c++", "tableau",
+]
+
+VERBS = [
+    "Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Shipped",
+    "Refactored", "Scaled", "Maintained", "Deployed", "Mentored",
+]
+
+OBJECTS = [
+    "a payments service", "the data ingestion pipeline", "an internal analytics dashboard",
+    "the recommendation engine", "a customer-facing REST API", "the CI pipeline",
+    "a real-time event processor", "the search backend", "an ML feature store",
+    "the authentication layer", "a reporting warehouse", "the mobile API gateway",
+]
+
+OUTCOMES = [
+    "cutting latency by 40%", "serving 2M requests/day", "reducing cloud spend by 25%",
+    "improving model accuracy by 6 points", "with zero downtime", "for 12 enterprise clients",
+    "halving deployment time", "raising test coverage to 90%",
+]
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+TITLES    = ["Software Engineer", "Senior Software Engineer", "Data Engineer", "ML Engineer", "Backend Developer"]
+
+LINES_PER_PAGE = 48
+
+
+def _bullet(rng: random.Random, skills: list[str]) -> str:
+    return (f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)} "
+            f"and {rng.choice(skills)}, {rng.choice(OUTCOMES)}.")
+
+
+def generate_resume(pages: int = 1, seed: int = 0) -> str:
+    """Return resume text that fills roughly `pages` pages."""
+    rng    = random.Random(seed)
+    skills = rng.sample(SKILLS, 14)
+    lines  = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com | +1 555 010 {seed % 10000:04d} | linkedin.com/in/candidate{seed}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience in {', '.join(skills[:4])}.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE - 6:
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}  Jan {start} - Dec {year}")
+        lines.extend(_bullet(rng, skills) for _ in range(rng.randint(3, 6)))
+        lines.append("")
+        year = start
+    lines += ["EDUCATION", f"B.Tech in Computer Science, State University  {year - 4} - {year}"]
+    return "\n".join(lines)
+
+
+def generate_jd(words: int = 300, seed: int = 0) -> str:
+    """Return a job description of roughly `words` words."""
+    rng    = random.Random(seed + 10_000)
+    skills = rng.sample(SKILLS, 10)
+    lines  = [
+        f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+        "",
+        "Responsibilities",
+    ]
+    count = 0
+    while count < words:
+        line = _bullet(rng, skills)
+        lines.append(line)
+        count += len(line.split())
+    lines += ["", "Requirements"] + [f"- Strong experience with {s}" for s in skills]
+    return "\n".join(lines)
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str) -> bytes:
+    """Render plain text into a minimal multi-page PDF (Helvetica, 48 lines/page)."""
+    lines  = text.splitlines() or [""]
+    pages  = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    n      = len(pages)
+    # Object layout: 1 catalog, 2 pages, 3 font, then (page, content) pairs.
+    kids   = " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+    objs   = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page in enumerate(pages):
+        ops    = ["BT", "/F1 10 Tf", "12 TL", "50 770 Td"]
+        ops   += [f"({_pdf_escape(line)}) Tj T*" for line in page]
+        ops   += ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out     = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
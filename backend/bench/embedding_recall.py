@@ -0,0 +1,95 @@
+"""
+Recall vs size for the embedding storage formats in embedding_store.py.
+
+Every dtype × dim combination is written to a `.emb` file, mapped back, and
+searched brute-force; results are compared with float32 at full dimension:
+bytes per vector, recall@10 of the top-10 neighbours, mean absolute cosine error,
+and time to open the file (should be ~0: it is only mapped).
+
+    python -m bench.embedding_recall --docs 20000 --out bench_embedding_recall.json
+    python -m bench.embedding_recall --corpus fake     # offline fake_embedding vectors of resume chunks
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench.corpus import generate_resume
+from bench.fake_gemini import fake_embedding
+from chunking import chunk_resume
+from embedding_store import QuantizedMatrix, open_matrix, write_matrix
+from vector_index import prepare
+
+DTYPES = ["float32", "float16", "int8"]
+DIMS   = [3072, 1536, 768, 256, 128]
+
+
+def synthetic(docs: int, dim: int, rng) -> np.ndarray:
+    """Clustered vectors whose variance decays along the dimensions, like Matryoshka embeddings."""
+    scale   = (1 + np.arange(dim) / 64) ** -0.5
+    centers = rng.standard_normal((max(1, docs // 50), dim)) * scale
+    noise   = rng.standard_normal((docs, dim)) * scale * 0.8
+    return (centers[rng.integers(0, len(centers), docs)] + noise).astype(np.float32)
+
+
+def fake_corpus(docs: int) -> np.ndarray:
+    chunks = []
+    seed   = 0
+    while len(chunks) < docs:
+        chunks.extend(chunk_resume(generate_resume(2, seed)))
+        seed += 1
+    return np.array([fake_embedding(c) for c in chunks[:docs]], np.float32)
+
+
+def top_k(matrix: np.ndarray, queries: np.ndarray, dim: int, k: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    sims = prepare(matrix, dim) @ prepare(queries, dim).T
+    return np.argsort(-sims, axis=0)[:k].T, sims
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding storage: recall vs size")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--corpus", choices=["synthetic", "fake"], default="synthetic")
+    parser.add_argument("--out", default="bench_embedding_recall.json")
+    args = parser.parse_args()
+
+    rng     = np.random.default_rng(0)
+    vectors = synthetic(args.docs, 3072, rng) if args.corpus == "synthetic" else fake_corpus(args.docs)
+    picks   = rng.integers(0, len(vectors), args.queries)
+    queries = vectors[picks] + 0.5 * rng.standard_normal((args.queries, vectors.shape[1])).astype(np.float32) \
+        * vectors.std(axis=0)
+    truth, true_sims = top_k(vectors, queries, vectors.shape[1])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in DTYPES:
+            for dim in DIMS:
+                path = os.path.join(tmp, f"{dtype}-{dim}.emb")
+                write_matrix(path, QuantizedMatrix.from_vectors(vectors, dtype, dim))
+                start  = time.perf_counter()
+                matrix = open_matrix(path)
+                open_ms = (time.perf_counter() - start) * 1000
+                found, sims = top_k(matrix.to_float32(), queries, dim)
+                recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+                stats  = {
+                    "bytes_per_vector": round(os.path.getsize(path) / len(vectors)),
+                    "size_vs_float32":  round(os.path.getsize(path) / (len(vectors) * vectors.shape[1] * 4), 4),
+                    "recall_at_10":     round(float(recall), 4),
+                    "cosine_abs_err":   round(float(np.abs(sims - true_sims).mean()), 5),
+                    "open_ms":          round(open_ms, 3),
+                }
+                results[f"{dtype}/{dim}"] = stats
+                print(f"{dtype:8s} {dim:>5}  {stats}", file=sys.stderr)
+
+    with open(args.out, "w") as f:
+        json.dump({"corpus": args.corpus, "docs": len(vectors), "results": results}, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
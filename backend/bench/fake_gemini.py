@@ -0,0 +1,288 @@
+"""
+Offline stand-in for the Gemini REST API.
+
+Serves `:generateContent`, `:batchEmbedContents` and `cachedContents` with
+canned, schema-valid responses so backend/api.py can be load-tested without
+spending quota. Explicit context caches are honoured; implicit prefix caching is
+simulated in 1024-char blocks. Both are reported as `cachedContentTokenCount`.
+Point the API at it with GEMINI_BASE_URL=http://127.0.0.1:<port>.
+
+    python -m bench.fake_gemini --port 8765 --gen-latency lognormal:-0.7,0.5 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.corpus import SKILLS
+
+logger = logging.getLogger(__name__)
+
+EMBED_DIM = 3072
+
+
+# ── Latency / error model ─────────────────────────────────────────────────────
+
+def parse_latency(spec: str):
+    """
+    Parse a latency spec (seconds) into a zero-arg sampler:
+    `fixed:0.3` | `uniform:0.1,0.8` | `normal:0.5,0.1` | `lognormal:mu,sigma`.
+    """
+    kind, _, args = spec.partition(":")
+    nums = [float(x) for x in args.split(",") if x]
+    rng  = random.Random()
+    if kind == "fixed":
+        return lambda: nums[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(nums[0], nums[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(nums[0], nums[1]))
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(nums[0], nums[1])
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class FakeConfig:
+    def __init__(self, gen_latency: str = "fixed:0", embed_latency: str = "fixed:0",
+                 error_rate: float = 0.0, seed: int | None = None):
+        self.gen_latency   = parse_latency(gen_latency)
+        self.embed_latency = parse_latency(embed_latency)
+        self.error_rate    = error_rate
+        self.rng           = random.Random(seed)
+        self.lock          = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.cached_contents: dict[str, str] = {}   # explicit caches: name → prefix text
+        self.seen_prefixes:   set[str]       = set()
+
+    def implicit_cached_chars(self, prompt: str, block: int = 1024) -> int:
+        """Implicit prefix caching: the longest whole-block prefix of `prompt` an earlier prompt shared."""
+        hashes = [hashlib.blake2b(prompt[:end].encode(), digest_size=8).hexdigest()
+                  for end in range(block, len(prompt) + 1, block)]
+        with self.lock:
+            hit = max((i + 1 for i, h in enumerate(hashes) if h in self.seen_prefixes), default=0)
+            self.seen_prefixes.update(hashes)
+        return hit * block
+
+    def count(self, kind: str) -> None:
+        with self.lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+
+# ── Canned responses ──────────────────────────────────────────────────────────
+
+def find_skills(text: str) -> list[str]:
+    lower = text.lower()
+    return [s for s in SKILLS if re.search(rf"(?<!\w){re.escape(s)}(?!\w)", lower)]
+
+
+def fake_embedding(text: str, dim: int = EMBED_DIM) -> list[float]:
+    """Deterministic hashed bag-of-words vector, so similar texts stay similar."""
+    vec = [0.0] * dim
+    for tok in re.findall(r"\w+", text.lower()):
+        h = int.from_bytes(hashlib.blake2b(tok.encode(), digest_size=8).digest(), "little")
+        vec[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _roadmap_skill(skill: str) -> dict:
+    course = lambda ch: {"title": f"{skill} course", "channel": ch, "search_query": f"{skill} tutorial",
+                         "duration": "4 hours", "what_you_learn": f"{skill} fundamentals"}
+    return {
+        "skill": skill, "why_important": f"{skill} is required by the role.", "priority": "high",
+        "difficulty": "moderate",
+        "time_estimate": {"beginner_days": 7, "intermediate_days": 10, "expert_days": 14,
+                          "total_days": 31, "time_note": "2 hrs/day"},
+        "approach": [{"step": 1, "action": "Docs + beginner tutorial", "duration": "Days 1-7"}],
+        "phases": [{"phase": p, "days": "Days 1-7", "daily_focus": "Core", "daily_goal": "Practice",
+                    "phase_outcome": "Progress"} for p in ("beginner", "intermediate", "expert")],
+        "milestones": ["Build a small project"],
+        "tips": {"do": ["Practice daily"], "dont": ["Skip fundamentals"]},
+        "courses": {"beginner": [course("freeCodeCamp")], "intermediate": [course("Traversy Media")],
+                    "expert": [course("Fireship")]},
+    }
+
+
+def respond(prompt: str) -> tuple[str, str]:
+    """Return (prompt_kind, response_text) for a prompt sent by backend/api.py."""
+    if "senior job market analyst" in prompt:
+        skills = find_skills(prompt) or ["python"]
+        return "market_analyze", json.dumps({
+            "skill_demand": [{"skill": s, "demand_score": 80, "trend": "rising", "level": "high",
+                              "market_comment": "In demand"} for s in skills],
+            "trending_skills": [{"skill": "kubernetes", "demand_score": 90, "why_trending": "Cloud native"}],
+            "skill_gaps": [{"skill": "terraform", "demand_score": 85, "why_needed": "IaC"}],
+            "job_matches": [{"title": "Backend Engineer", "match_pct": 80, "required_skills": skills[:2],
+                             "missing_skills": ["terraform"], "avg_salary_usd": "120000-150000"}],
+            "salary_insights": {"current_estimated_range": "$90k-$120k",
+                                "potential_range_with_upskilling": "$120k-$150k", "currency": "USD",
+                                "market_summary": "Healthy demand.",
+                                "by_role": [{"role": "Backend Engineer", "min": "$90k", "avg": "$120k", "max": "$150k"}]},
+            "learning_path": [{"skill": "terraform", "priority": "high", "estimated_time": "4 weeks",
+                               "salary_impact": "+$10,000/yr", "resource": "HashiCorp Learn"}],
+            "market_summary": "Strong profile for backend roles.",
+        })
+    if "senior career coach" in prompt and "Skills to summarise:" in prompt:
+        skills = [s.strip() for s in re.search(r"Skills to summarise: (.*)", prompt).group(1).split(",")]
+        return "roadmap_summary", json.dumps([
+            {"skill": s, "why_important": f"{s} is required by the role.", "priority": "high",
+             "difficulty": "moderate", "days": 10 if s == "docker" else 31} for s in skills])
+    if "senior career coach" in prompt and "Skill to plan:" in prompt:
+        skill = re.search(r"Skill to plan: (.*)", prompt).group(1).strip()
+        return "roadmap_skill", json.dumps(_roadmap_skill(skill))
+    if "senior career coach" in prompt:
+        missing = re.search(r"They are missing: (.*)", prompt)
+        skills  = [s.strip() for s in missing.group(1).split(",")] if missing else ["docker"]
+        return "roadmap", json.dumps({
+            "overall": {"total_days": 31 * len(skills), "total_weeks": math.ceil(31 * len(skills) / 7),
+                        "hours_per_day": 2, "difficulty": "Moderate", "summary": "You can do this.",
+                        "recommended_order": skills, "quick_wins": skills[:1]},
+            "skills": [_roadmap_skill(s) for s in skills],
+        })
+    if "senior technical recruiter" in prompt:
+        return "recruiter", json.dumps({
+            "verdict": "Good Candidate", "verdict_reason": "Solid overlap with the JD.", "overall_score": 74,
+            "scores": {"skill_match": 75, "experience_relevance": 72, "communication_clarity": 80,
+                       "technical_depth": 70, "culture_fit_indicators": 70},
+            "candidate_summary": "Experienced engineer.", "strengths": ["Backend", "Delivery", "Ownership"],
+            "red_flags": ["Limited cloud exposure"],
+            "skill_match_breakdown": {"matched": [], "missing_critical": [], "missing_nice_to_have": [],
+                                      "bonus_skills": []},
+            "interview_questions": [{"question": "Describe a system you scaled.", "reason": "Depth"}],
+            "hiring_recommendation": "Proceed to technical interview.", "salary_band_fit": "mid",
+        })
+    if "expert technical interviewer" in prompt:
+        kinds = ["behavioral", "behavioral", "technical", "technical", "technical", "system design", "situational"]
+        return "interview_questions", json.dumps({"questions": [
+            {"id": i + 1, "type": k, "question": f"Question {i + 1}?", "hint": "Look for specifics",
+             "difficulty": "medium"} for i, k in enumerate(kinds)
+        ]})
+    if "post-interview feedback" in prompt:
+        return "interview_feedback", json.dumps({
+            "overall_score": 72, "communication_score": 75, "technical_score": 70, "confidence_score": 72,
+            "verdict": "Good Candidate", "summary": "Reasonable answers.", "strengths": ["Clear"],
+            "weaknesses": ["Depth"], "suggestions": ["Practice system design"],
+            "per_question": [{"question_id": 1, "score": 70, "comment": "OK", "ideal_answer_hint": "Examples"}],
+            "next_steps": ["Mock interviews"],
+        })
+    if "conducting a mock interview" in prompt:
+        return "interview_chat", "Thanks for that. Can you walk me through a concrete example?"
+    if '{"resume_skills"' in prompt:
+        resume, jd = prompt.split("\n\nResume:\n", 1)[-1].split("\n\nJob description:\n", 1)
+        return "extract_skill_pair", json.dumps({"resume_skills": find_skills(resume), "jd_skills": find_skills(jd)})
+    if '{"skills": [[' in prompt:
+        texts = re.split(r"\n\nText \d+:\n", prompt)[1:]
+        return "extract_skills_batch", json.dumps({"skills": [find_skills(t) for t in texts]})
+    if '{"skills"' in prompt:
+        return "extract_skills", json.dumps({"skills": find_skills(prompt.split("\n\n", 1)[-1])})
+    return "chat", "This is a canned reply from the offline Gemini stand-in."
+
+
+# ── HTTP server ───────────────────────────────────────────────────────────────
+
+class Handler(BaseHTTPRequestHandler):
+    config: FakeConfig
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.debug(fmt, *args)
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):   # the client gave up (request timeout / deadline)
+            pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = self.path.split("?", 1)[0]
+        cfg  = self.config
+
+        if path.endswith("/cachedContents"):
+            text = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+            name = "cachedContents/" + hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+            with cfg.lock:
+                cfg.cached_contents[name] = text
+            cfg.count("cache_create")
+            return self._send(200, {"name": name, "model": body.get("model", ""), "displayName": body.get("displayName", ""),
+                                    "usageMetadata": {"totalTokenCount": len(text) // 4}})
+        if path.endswith(":generateContent"):
+            time.sleep(cfg.gen_latency())
+        elif path.endswith((":batchEmbedContents", ":embedContent")):
+            time.sleep(cfg.embed_latency())
+        else:
+            return self._send(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+
+        if cfg.should_fail():
+            cfg.count("error")
+            code = cfg.rng.choice([429, 500, 503])
+            return self._send(code, {"error": {"code": code, "message": "Injected failure", "status": "UNAVAILABLE"}})
+
+        if path.endswith(":generateContent"):
+            prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+            if body.get("cachedContent"):
+                prefix = cfg.cached_contents.get(body["cachedContent"])
+                if prefix is None:
+                    return self._send(404, {"error": {"code": 404, "message": "CachedContent not found", "status": "NOT_FOUND"}})
+                prompt, cached = prefix + prompt, len(prefix)
+            else:
+                cached = cfg.implicit_cached_chars(prompt)
+            kind, text = respond(prompt)
+            cfg.count(kind)
+            return self._send(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "cachedContentTokenCount": cached // 4,
+                                  "candidatesTokenCount": len(text) // 4, "totalTokenCount": (len(prompt) + len(text)) // 4},
+            })
+
+        requests = body.get("requests") or [body]
+        cfg.count("embed")
+        return self._send(200, {"embeddings": [
+            {"values": fake_embedding("".join(p.get("text", "") for p in r.get("content", {}).get("parts", [])))}
+            for r in requests
+        ]})
+
+
+def make_server(port: int = 0, config: FakeConfig | None = None) -> ThreadingHTTPServer:
+    """Build (but don't start) a fake server; port 0 picks a free port."""
+    handler = type("BoundHandler", (Handler,), {"config": config or FakeConfig()})
+    server  = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Gemini stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--gen-latency", default="fixed:0", help="generateContent latency spec (seconds)")
+    parser.add_argument("--embed-latency", default="fixed:0", help="embed latency spec (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 429/5xx")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(args.port, FakeConfig(args.gen_latency, args.embed_latency, args.error_rate, args.seed))
+    logger.info("Fake Gemini listening on http://127.0.0.1:%d", server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Corpus BM25 benchmark: score a pool of stored resumes against one JD.
+
+Compares one sparse mat-vec over every stored resume (`KeywordIndex.scores`)
+with looping the per-pair scorers (`KeywordIndex.score`, and the overlap
+`ats_keyword_score` the API used before), and reports insert throughput and
+the size of the saved statistics.
+
+    python -m bench.keyword_scoring --docs 20000 --out bench_keyword_scoring.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.corpus import generate_jd, generate_resume
+from keyword_index import KeywordIndex
+from store import current_snapshot
+
+# api.py checks its Gemini keys at import time; offline keys are enough here.
+for _key in ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY"):
+    os.environ.setdefault(_key, "offline")
+
+import api  # noqa: E402
+
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of `fn` in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark corpus BM25 keyword scoring")
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="bench_keyword_scoring.json")
+    args = parser.parse_args()
+
+    texts = [generate_resume(1, seed) for seed in range(min(args.docs, 500))]
+    jd    = generate_jd(300, seed=1)
+    index = KeywordIndex(api.STOPWORDS)
+    start = time.perf_counter()
+    for i in range(args.docs):
+        index.add(f"resume:{i}", texts[i % len(texts)])
+    inserts_per_sec = args.docs / (time.perf_counter() - start)
+    index.scores(jd)   # first query folds the pending rows into the CSR arrays
+
+    sample   = texts[:100]
+    matcher  = api.keyword_matcher(api.extract_keywords(jd))
+    results = {
+        "docs":             len(index),
+        "inserts_per_sec":  round(inserts_per_sec),
+        "matvec_all_ms":    timed(lambda: index.scores(jd), args.repeat),
+        "loop_bm25_ms":     round(timed(lambda: [index.score(t, jd) for t in sample], args.repeat) * args.docs / len(sample), 1),
+        "loop_overlap_ms":  round(timed(lambda: [api.ats_keyword_score(t, jd, matcher) for t in sample], args.repeat)
+                                  * args.docs / len(sample), 1),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keyword_index")
+        results["save_ms"]  = timed(lambda: index.save(path), 1)
+        results["load_ms"]  = timed(lambda: KeywordIndex.load(path, api.STOPWORDS), 1)
+        snapshot = current_snapshot(path)
+        results["disk_kib"] = round(sum(entry.stat().st_size for entry in os.scandir(snapshot)) / 1024, 1)
+
+    for name, value in results.items():
+        print(f"{name:16s} {value}", file=sys.stderr)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end load benchmark for backend/api.py.
+
+Drives every endpoint at a fixed concurrency and reports throughput and
+p50/p95/p99 latency to a JSON file that can be diffed between releases.
+
+    # Self-contained: starts the fake Gemini server and a uvicorn worker
+    python -m bench.load --spawn --concurrency 16 --requests 200 --out bench_load.json
+
+    # Against an already running API (that points at a fake or real Gemini)
+    python -m bench.load --api-url http://127.0.0.1:8000
+
+Every request gets its own resume / JD (seeded by a running request number), so
+the result caches don't turn the run into a cache-hit benchmark; `--repeat-inputs`
+sends the same inputs every time to measure the cached path instead. The
+registration endpoints run before `ats_search`, which searches what they stored.
+`--spawn` gives the API worker a temporary DATA_DIR, removed afterwards.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from bench.corpus import SKILLS, generate_jd, generate_resume, make_pdf
+from bench.fake_gemini import FakeConfig, make_server
+
+
+def percentile(sorted_vals: list[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def build_requests(pages: int, repeat: bool = False) -> dict[str, dict]:
+    """
+    One request template per endpoint, as httpx.request kwargs. Callable values are
+    called with the request's sequence number, which seeds its resume / JD unless `repeat`.
+    """
+    seed = (lambda n: 1) if repeat else (lambda n: n)
+    pdf  = lambda n: make_pdf(generate_resume(pages, seed=seed(n)))
+    jd   = lambda n: generate_jd(400, seed=seed(n))
+    questions = [{"id": i, "type": "technical", "question": f"Q{i}?", "difficulty": "medium"} for i in range(1, 8)]
+    upload = lambda n: {"resume": ("resume.pdf", pdf(n), "application/pdf")}
+    return {
+        "chat_message":        {"method": "POST", "url": "/chat/message",
+                                "json": {"message": "How do I prepare for a system design round?", "history": []}},
+        "market_analyze":      {"method": "POST", "url": "/market/analyze", "files": upload},
+        "ats_candidate":       {"method": "POST", "url": "/ats/candidate", "files": upload,
+                                "data": lambda n: {"job_description": jd(n)}},
+        "ats_recruiter":       {"method": "POST", "url": "/ats/recruiter", "files": upload,
+                                "data": lambda n: {"job_description": jd(n)}},
+        "resumes":             {"method": "POST", "url": "/resumes", "files": upload,
+                                "data": {"metadata": json.dumps({"pool": "bench"})}},
+        "jobs":                {"method": "POST", "url": "/jobs",
+                                "json": lambda n: {"job_description": jd(n), "title": "Backend Engineer"}},
+        "ats_search":          {"method": "POST", "url": "/ats/search",
+                                "json": lambda n: {"job_description": jd(n), "k": 10, "filters": {"pool": "bench"}}},
+        # fragments are shared per (skill, background), so only the first len(SKILLS) requests generate
+        "ats_roadmap":         {"method": "GET", "url": lambda n: f"/ats/roadmap/{SKILLS[seed(n) % len(SKILLS)]}",
+                                "params": {"background": "none"}},
+        "interview_questions": {"method": "POST", "url": "/interview/questions",
+                                "json": {"role": "Backend Engineer", "experience": "Mid Level", "focus": []}},
+        "interview_chat":      {"method": "POST", "url": "/interview/chat",
+                                "json": {"role": "Backend Engineer", "question": "Q1?", "answer": "An answer.",
+                                         "history": []}},
+        "interview_feedback":  {"method": "POST", "url": "/interview/feedback",
+                                "json": {"role": "Backend Engineer", "questions": questions,
+                                         "answers": ["An answer."] * 7}},
+        "health":              {"method": "GET", "url": "/health"},
+    }
+
+
+_sequence = itertools.count(1)   # request numbers, unique across warmup, endpoints and runs
+
+
+async def run_endpoint(client: httpx.AsyncClient, spec: dict, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors    = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            n      = next(_sequence)
+            kwargs = {k: (v(n) if callable(v) else v) for k, v in spec.items()}
+            start  = time.perf_counter()
+            try:
+                resp = await client.request(**kwargs)
+                ok   = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall  = time.perf_counter() - start
+    lat   = sorted(latencies)
+    return {
+        "requests":       len(lat),
+        "errors":         errors,
+        "throughput_rps": round(len(lat) / wall, 2),
+        "mean_ms":        round(sum(lat) / len(lat), 1),
+        "p50_ms":         round(percentile(lat, 50), 1),
+        "p95_ms":         round(percentile(lat, 95), 1),
+        "p99_ms":         round(percentile(lat, 99), 1),
+    }
+
+
+async def run(args) -> dict:
+    specs   = build_requests(args.pages, args.repeat_inputs)
+    targets = args.endpoints.split(",") if args.endpoints else list(specs)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout) as client:
+        for name in targets:
+            await run_endpoint(client, specs[name], min(args.warmup, args.requests), 1)
+            results[name] = await run_endpoint(client, specs[name], args.requests, args.concurrency)
+            print(f"{name:22s} {results[name]}", file=sys.stderr)
+    return results
+
+
+def spawn(args):
+    """Start the fake Gemini server in-process and an API worker subprocess on a temporary DATA_DIR."""
+    fake = make_server(0, FakeConfig(args.gen_latency, args.embed_latency, args.error_rate, seed=0))
+    threading.Thread(target=fake.serve_forever, daemon=True).start()
+    data_dir = tempfile.mkdtemp(prefix="bench_load_")
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{fake.server_port}",
+        "DATA_DIR":        data_dir,
+        **{k: os.environ.get(k, "offline") for k in
+           ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY")},
+    }
+    port = args.api_port
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+    )
+    args.api_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{args.api_url}/health").status_code == 200:
+                break
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    else:
+        proc.terminate()
+        shutil.rmtree(data_dir, ignore_errors=True)
+        raise SystemExit("API worker did not become healthy.")
+    return fake, proc, data_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API load benchmark")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start fake Gemini + API worker locally")
+    parser.add_argument("--api-port", type=int, default=8011, help="port for the spawned API worker")
+    parser.add_argument("--endpoints", default="", help="comma-separated subset (default: all)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=2, help="resume length in pages")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="send the same resume / JD every time (measures the result caches)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--gen-latency", default="lognormal:-1.2,0.4", help="fake generateContent latency")
+    parser.add_argument("--embed-latency", default="uniform:0.02,0.08", help="fake embed latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--out", default="bench_load.json")
+    args = parser.parse_args()
+
+    fake = proc = data_dir = None
+    if args.spawn:
+        fake, proc, data_dir = spawn(args)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        if fake:
+            fake.shutdown()
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp":   datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":      platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests":    args.requests,
+            "pages":       args.pages,
+            "inputs":      "repeated" if args.repeat_inputs else "unique",
+            "fake_gemini": {"gen_latency": args.gen_latency, "embed_latency": args.embed_latency,
+                            "error_rate": args.error_rate} if args.spawn else None,
+        },
+        "endpoints": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
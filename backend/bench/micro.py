@@ -0,0 +1,152 @@
+"""
+Micro-benchmarks for the CPU-bound helpers in api.py (no network involved).
+
+Each case runs over generated resumes / JDs of 1-30 pages and reports ops/sec
+plus peak allocation per call (tracemalloc). Compare against a previous run to
+catch regressions:
+
+    python -m bench.micro --out bench_micro.json
+    python -m bench.micro --baseline bench_micro.json --tolerance 0.15
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from bench.corpus import generate_jd, generate_resume, make_pdf
+from bench.fake_gemini import fake_embedding, respond
+
+# api.py checks its Gemini keys at import time; offline keys are enough here.
+for _key in ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY"):
+    os.environ.setdefault(_key, "offline")
+
+import api  # noqa: E402
+
+PAGES = [1, 5, 10, 30]
+
+
+def measure(fn, min_time: float) -> dict:
+    """Time `fn` for at least `min_time` seconds, then trace one call's allocations."""
+    fn()
+    gc.collect()
+    gc.disable()
+    try:
+        runs, start = 0, time.perf_counter()
+        while True:
+            fn()
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks  = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del result
+    return {
+        "ops_per_sec":    round(runs / elapsed, 2),
+        "us_per_op":      round(elapsed / runs * 1e6, 1),
+        "peak_alloc_kib": round(peak / 1024, 1),
+        "live_blocks":    blocks,
+    }
+
+
+def build_cases(pages: int) -> dict:
+    resume = generate_resume(pages, seed=pages)
+    jd     = generate_jd(150 + 50 * pages, seed=pages)
+    pdf    = make_pdf(resume)
+    matcher = api.keyword_matcher(api.extract_keywords(jd))
+    chunk_vecs = [fake_embedding(c) for c in api.chunk_resume(resume)[:12]]
+    jd_vecs    = np.array([fake_embedding(c) for c in api.chunk_resume(jd, api.JD_CHUNK_CHARS)], np.float32)
+    _, roadmap_raw = respond("senior career coach\nThey are missing: docker, kubernetes, terraform, aws\n")
+    raw    = f"```json\n{roadmap_raw}\n```"
+    history = [api.ChatMessage(role="user" if i % 2 == 0 else "assistant", text=line)
+               for i, line in enumerate(resume.splitlines()[: 10 * pages])]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=100)
+    return {
+        "extract_text_from_pdf":   lambda: api.extract_text_from_pdf(pdf),
+        "ats_keyword_score":       lambda: api.ats_keyword_score(resume, jd),
+        "keyword_matcher_scan":    lambda: api.ats_keyword_score(resume, jd, matcher),
+        "ats_debug_info":          lambda: api.ats_debug_info(resume, jd),
+        "ats_semantic_score":      lambda: api.ats_semantic_score(resume, jd, chunk_vecs, jd_vecs),
+        "recursive_splitter":      lambda: splitter.split_text(resume),
+        "chunk_resume":            lambda: api.chunk_resume(resume),
+        "parse_json":              lambda: api.parse_json(raw),
+        "build_chat_conversation": lambda: api.build_chat_conversation("Next question?", history),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return human-readable regressions where ops/sec dropped by more than `tolerance`."""
+    regressions = []
+    for case, by_size in current.items():
+        for size, stats in by_size.items():
+            old = baseline.get(case, {}).get(size)
+            if not old:
+                continue
+            drop = 1 - stats["ops_per_sec"] / old["ops_per_sec"]
+            if drop > tolerance:
+                regressions.append(f"{case}[{size}]: {old['ops_per_sec']} -> {stats['ops_per_sec']} ops/s (-{drop:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for CPU-bound helpers")
+    parser.add_argument("--pages", default=",".join(map(str, PAGES)), help="comma-separated resume sizes")
+    parser.add_argument("--cases", default="", help="comma-separated subset of cases (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds per measurement")
+    parser.add_argument("--out", default="bench_micro.json")
+    parser.add_argument("--baseline", default="", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed ops/sec drop vs baseline")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+
+    wanted  = set(args.cases.split(",")) if args.cases else None
+    results: dict[str, dict] = {}
+    for pages in (int(p) for p in args.pages.split(",")):
+        for name, fn in build_cases(pages).items():
+            if wanted and name not in wanted:
+                continue
+            stats = measure(fn, args.min_time)
+            results.setdefault(name, {})[f"{pages}p"] = stats
+            print(f"{name:24s} {pages:>3}p  {stats['ops_per_sec']:>12,.1f} ops/s  "
+                  f"{stats['peak_alloc_kib']:>9,.1f} KiB peak", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "machine":   platform.machine(),
+            "min_time":  args.min_time,
+        },
+        "cases": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Chunk selection benchmark: which resume chunks to embed for a given JD.
+
+Compares the old behaviour (first 12 chunks) with first-N and BM25 top-N for
+several budgets. The reference is the score with every chunk embedded; each
+strategy reports embedding calls, mean |score - reference|, how many of the
+reference top-5 chunks it kept, and selection time. Uses the offline embedder.
+
+    python -m bench.prefilter --out bench_prefilter.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from bench.corpus import generate_jd, generate_resume
+from bench.fake_gemini import fake_embedding
+from chunking import chunk_resume
+from lexical import select_chunks
+
+PAGES   = [2, 5, 10, 30]
+BUDGETS = [4, 6, 8, 12]
+SEEDS   = 10
+MAX_CHARS = 15000   # api.RESUME_MAX_CHARS
+
+
+def top5(sims: np.ndarray) -> float:
+    return float(np.sort(sims)[::-1][:5].mean()) * 100
+
+
+def strategies() -> dict:
+    named = {"first_12": lambda chunks, jd: list(range(min(12, len(chunks))))}
+    for n in BUDGETS:
+        named[f"first_{n}"] = lambda chunks, jd, n=n: list(range(min(n, len(chunks))))
+        named[f"bm25_{n}"]  = lambda chunks, jd, n=n: select_chunks(chunks, jd, n)
+    return named
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare chunk prefilters for the semantic score")
+    parser.add_argument("--pages", default=",".join(map(str, PAGES)))
+    parser.add_argument("--seeds", type=int, default=SEEDS)
+    parser.add_argument("--out", default="bench_prefilter.json")
+    args = parser.parse_args()
+
+    results: dict[str, dict] = {}
+    for pages in (int(p) for p in args.pages.split(",")):
+        per_strategy: dict[str, dict[str, list]] = {}
+        for seed in range(args.seeds):
+            chunks = chunk_resume(generate_resume(pages, seed)[:MAX_CHARS])
+            jd     = generate_jd(300, seed=1000 + seed)
+            jd_vec = np.array(fake_embedding(jd[:3000]))
+            sims   = np.array([fake_embedding(c) for c in chunks]) @ jd_vec
+            ref    = top5(sims)
+            best   = set(np.argsort(-sims)[:5].tolist())
+            for name, select in strategies().items():
+                start  = time.perf_counter()
+                chosen = select(chunks, jd)
+                took   = (time.perf_counter() - start) * 1e6
+                stats  = per_strategy.setdefault(name, {"calls": [], "err": [], "kept": [], "us": []})
+                stats["calls"].append(len(chosen) + 1)
+                stats["err"].append(abs(top5(sims[chosen]) - ref))
+                stats["kept"].append(len(best & set(chosen)) / len(best))
+                stats["us"].append(took)
+        for name, stats in per_strategy.items():
+            summary = {
+                "embed_calls":      round(statistics.mean(stats["calls"]), 1),
+                "score_abs_err":    round(statistics.mean(stats["err"]), 3),
+                "top5_kept":        round(statistics.mean(stats["kept"]), 3),
+                "select_us":        round(statistics.mean(stats["us"]), 1),
+            }
+            results.setdefault(name, {})[f"{pages}p"] = summary
+            print(f"{name:9s} {pages:>3}p  {summary}", file=sys.stderr)
+
+    with open(args.out, "w") as f:
+        json.dump({"strategies": results}, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
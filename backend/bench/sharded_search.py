@@ -0,0 +1,98 @@
+"""
+Sharded search demo/benchmark on one box: spawns shard worker processes, fills
+them, and checks scatter-gather results against a single in-process index.
+
+Then grows the pool by one worker, rebalances, and checks again — results must
+not change while partitions move. Reports query latency for both layouts.
+
+    python -m bench.sharded_search --workers 4 --docs 50000
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench.vector_search import jd_vectors, random_vectors
+from sharding import ShardClient, ShardedIndex
+from vector_index import VectorIndex
+
+
+def latency(index, queries: list[np.ndarray]) -> dict:
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q, k=10, coarse_query=q.mean(axis=0))
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"p50_ms": round(statistics.median(times), 2), "p95_ms": round(times[int(0.95 * (len(times) - 1))], 2)}
+
+
+def agreement(a, b, queries: list[np.ndarray]) -> float:
+    """Mean overlap of exact top-10 ids between two indexes."""
+    overlap = []
+    for q in queries:
+        ids_a = {h["id"] for h in a.search(q, k=10, candidates=None)}
+        ids_b = {h["id"] for h in b.search(q, k=10, candidates=None)}
+        overlap.append(len(ids_a & ids_b) / 10)
+    return round(statistics.mean(overlap), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded vector search on local processes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--out", default="bench_sharded_search.json")
+    args = parser.parse_args()
+
+    rng     = np.random.default_rng(0)
+    single  = VectorIndex(args.dim)
+    queries = [jd_vectors(rng, 4, args.dim) for _ in range(args.queries)]
+    results = {"workers": args.workers, "docs": args.docs}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sharded = ShardedIndex.open(str(args.workers), tmp, args.dim)
+        start   = time.perf_counter()
+        batch   = []
+        for i in range(args.docs):
+            doc = (f"r{i}", random_vectors(rng, int(rng.integers(4, 13)), args.dim), {"pool": f"pool-{i % 10}"})
+            single.add(*doc)
+            batch.append(doc)
+        for doc in batch:
+            sharded.add(*doc)
+        results["sharded_inserts_per_sec"] = round(args.docs / (time.perf_counter() - start))
+        results["loads_before"]            = sharded.loads()
+        results["single_process"]          = latency(single, queries)
+        results["sharded"]                 = latency(sharded, queries)
+        results["exact_agreement"]         = agreement(single, sharded, queries[:5])
+
+        start = time.perf_counter()
+        moves = sharded.add_worker(ShardClient.spawn(f"{tmp}/shard-{args.workers}", args.dim))
+        results["rebalance"] = {
+            "moves":       len(moves),
+            "seconds":     round(time.perf_counter() - start, 2),
+            "loads_after": sharded.loads(),
+        }
+        results["sharded_after_rebalance"]         = latency(sharded, queries)
+        results["exact_agreement_after_rebalance"] = agreement(single, sharded, queries[:5])
+
+        sharded.save()
+        sharded.close()
+        reopened = ShardedIndex.open(str(args.workers), tmp, args.dim)   # the added worker comes back from the layout
+        results["docs_after_reopen"] = len(reopened)
+        reopened.close()
+
+    for name, value in results.items():
+        print(f"{name:34s} {value}", file=sys.stderr)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark: how long `import api` takes in a fresh interpreter.
+
+Runs `python -X importtime -c "import api"` several times, reports the median
+cumulative import time and the heaviest modules, and fails when the budget is
+exceeded or when a module that should be lazy gets imported at startup.
+
+    python -m bench.startup --budget-ms 800
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# These are loaded on first use; importing any of them at startup is a regression.
+LAZY_MODULES = ["google.genai", "pypdf", "langchain_text_splitters"]
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map module -> (self_us, cumulative_us) from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cum_us))
+    return modules
+
+
+def run_once(backend_dir: str) -> tuple[float, dict]:
+    env = {**os.environ}
+    for key in ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY"):
+        env.setdefault(key, "offline")
+    start = time.perf_counter()
+    proc  = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api"],
+        cwd=backend_dir, env=env, capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    return wall, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time / cold-start benchmark for api.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800, help="max median cumulative import time of api")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", default="", help="optional JSON report path")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    walls, imports, last = [], [], {}
+    for _ in range(args.runs):
+        wall, last = run_once(backend_dir)
+        walls.append(wall)
+        imports.append(last["api"][1] / 1000)
+
+    median_ms = statistics.median(imports)
+    heaviest  = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[: args.top]
+    eager     = [m for m in LAZY_MODULES if m in last]
+    report = {
+        "import_api_ms_median":   round(median_ms, 1),
+        "process_wall_ms_median": round(statistics.median(walls), 1),
+        "budget_ms":              args.budget_ms,
+        "eager_lazy_modules":     eager,
+        "heaviest_self_us":       {name: self_us for name, (self_us, _) in heaviest},
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import api took {median_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Vector index benchmark: query latency over a synthetic resume pool.
+
+Fills a `VectorIndex` with random vectors (chunk counts drawn like real resumes;
+variance decays along the dimensions the way it does in Matryoshka embeddings),
+then times searches for a single whole-JD vector and for a multi-chunk JD, with
+and without a metadata filter, reports recall@10 of the two-stage search against
+an exact scan, and insert/delete throughput.
+
+    python -m bench.vector_search --docs 100000 --dim 256 --out bench_vector_search.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from vector_index import VectorIndex
+
+
+def random_vectors(rng, n: int, dim: int) -> np.ndarray:
+    scale = (1 + np.arange(dim) / 16) ** -0.5
+    return (rng.standard_normal((n, dim)) * scale).astype(np.float32)
+
+
+def build(docs: int, dim: int, seed: int) -> tuple[VectorIndex, float]:
+    rng    = np.random.default_rng(seed)
+    index  = VectorIndex(dim)
+    start  = time.perf_counter()
+    for i in range(docs):
+        index.add(f"r{i}", random_vectors(rng, int(rng.integers(4, 13)), dim), {"pool": f"pool-{i % 10}"})
+    return index, docs / (time.perf_counter() - start)
+
+
+def jd_vectors(rng, chunks: int, dim: int) -> np.ndarray:
+    """JD chunks share the posting's topic: a common direction plus per-chunk noise."""
+    if chunks == 1:
+        return random_vectors(rng, 1, dim)
+    return random_vectors(rng, 1, dim) + 0.7 * random_vectors(rng, chunks, dim)
+
+
+def recall(index: VectorIndex, queries: int, rng, chunks: int = 1) -> float:
+    hits = 0
+    for _ in range(queries):
+        q      = jd_vectors(rng, chunks, index.dim)
+        exact  = {r["id"] for r in index.search(q, k=10, candidates=None)}
+        hits  += len(exact & {r["id"] for r in index.search(q, k=10)})
+    return round(hits / (10 * queries), 3)
+
+
+def time_queries(index: VectorIndex, queries: int, rng, chunks: int = 1, filters: dict | None = None,
+                 candidates: int | None = 1000) -> dict:
+    latencies = []
+    for _ in range(queries):
+        q     = jd_vectors(rng, chunks, index.dim)
+        start = time.perf_counter()
+        index.search(q, k=10, filters=filters, candidates=candidates)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume vector index")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--budget-ms", type=float, default=50, help="p95 target for a single-vector query")
+    parser.add_argument("--out", default="bench_vector_search.json")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    index, inserts_per_sec = build(args.docs, args.dim, seed=0)
+    print(f"built {len(index)} docs / {index._rows} chunks ({inserts_per_sec:.0f} inserts/s)", file=sys.stderr)
+
+    results = {
+        "docs":            len(index),
+        "chunks":          index._rows,
+        "dim":             args.dim,
+        "inserts_per_sec": round(inserts_per_sec),
+        "single_vector":   time_queries(index, args.queries, rng),
+        "jd_8_chunks":     time_queries(index, args.queries, rng, chunks=8),
+        "filtered":        time_queries(index, args.queries, rng, filters={"pool": ["pool-1", "pool-2"]}),
+        "exact_scan":      time_queries(index, 5, rng, candidates=None),
+        "recall_at_10":    recall(index, 20, rng),
+        "recall_at_10_jd": recall(index, 20, rng, chunks=8),
+    }
+
+    start = time.perf_counter()
+    for i in range(0, args.docs, 10):
+        index.delete(f"r{i}")
+    results["deletes_per_sec"] = round(len(range(0, args.docs, 10)) / (time.perf_counter() - start))
+    results["after_deletes"]   = time_queries(index, args.queries, rng)
+
+    for name, value in results.items():
+        print(f"{name:16s} {value}", file=sys.stderr)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+    if results["single_vector"]["p95_ms"] > args.budget_ms:
+        print(f"FAIL: p95 {results['single_vector']['p95_ms']} ms > {args.budget_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Offline bulk scoring: a directory of resume PDFs against a handful of JDs.
+
+    python bulk_score.py resumes/ --jd backend.txt --jd data.txt --out scores.jsonl
+    python bulk_score.py resumes/ --jd backend.txt --out scores.jsonl --skip-llm      # keyword scores only, no API keys
+    python bulk_score.py resumes/ --jd backend.txt --out scores.jsonl --parquet scores.parquet
+
+CPU stages (PDF text extraction, chunking, keyword scoring, BM25 chunk selection)
+run in a process pool; each worker imports only `scoring` and `chunking`, not the
+API app, and compiles every JD's keyword matcher once. LLM stages (JD setup, chunk
+embeddings, skill extraction) run in the parent under a requests-per-minute limit:
+the chunks of a whole batch of resumes are embedded together, EMBED_BATCH_SIZE
+texts per request, and skills are extracted for several resumes per request
+(up to `--skill-batch-chars` of resume text).
+
+The output file is the checkpoint: one JSON line per (resume, JD), appended and
+flushed as each batch finishes. Re-running the same command skips pairs already
+in the file, so an interrupted run resumes where it stopped. A batch whose LLM
+calls fail (skill extraction raises rather than returning no skills) is left out
+of the file and retried by the next run. `--parquet` converts the finished JSONL
+at the end (needs pyarrow).
+
+With `--skip-llm` the JD skills are unknown, so `keyword_score` matches the JD's
+keywords only. The API's `ats_score` also matches the JD's skill phrases, so the
+two differ for the same pair; compare `--skip-llm` scores only with each other.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import scoring
+from chunking import chunk_resume
+from lexical import select_chunks
+
+logger = logging.getLogger("bulk_score")
+
+
+class RateLimiter:
+    """Blocking requests-per-minute limit shared by threads; requests are spaced evenly."""
+
+    def __init__(self, rpm: float):
+        self.interval = 60 / rpm if rpm > 0 else 0.0
+        self._next    = 0.0
+        self._lock    = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now        = time.monotonic()
+            at         = max(now, self._next)
+            self._next = at + self.interval
+        time.sleep(at - now)
+
+
+# ── Worker side (CPU stages) ──────────────────────────────────────────────────
+
+_worker: dict = {}
+
+
+def _init_worker(jds: list[dict], chunk_budget: int) -> None:
+    _worker["budget"] = chunk_budget
+    _worker["jds"]    = [(jd["name"], jd["text"], scoring.keyword_matcher(jd["keywords"], jd["skills"])) for jd in jds]
+
+
+def _prepare(path: str) -> dict:
+    """Text, chunks, per-JD keyword scores and the chunk indices worth embedding for one PDF."""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        raw = scoring.extract_text_from_pdf(data)
+    except Exception as e:
+        return {"path": path, "error": f"unreadable PDF: {e}"}
+    if not raw:
+        return {"path": path, "error": "no extractable text"}
+    text   = scoring.strip_contact_info(raw)[:scoring.RESUME_MAX_CHARS]
+    chunks = chunk_resume(text)
+    scores = {}
+    for name, jd_text, matcher in _worker["jds"]:
+        keyword_score, density = scoring.ats_keyword_score(text, jd_text, matcher)
+        scores[name] = {
+            "keyword_score":   keyword_score,
+            "keyword_density": density,
+            "chunks":          select_chunks(chunks, jd_text, _worker["budget"], scoring.STOPWORDS),
+        }
+    return {"path": path, "sha256": hashlib.sha256(data).hexdigest(), "text": text, "chunks": chunks, "jds": scores}
+
+
+# ── Parent side (LLM stages, output) ──────────────────────────────────────────
+
+def load_jds(paths: list[str], use_llm: bool, limiter: RateLimiter) -> list[dict]:
+    """Name (file stem), text, keywords, skills and chunk vectors of each JD, computed once."""
+    import api
+    jds = []
+    for path in paths:
+        with open(path) as f:
+            text = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        if use_llm:
+            limiter.wait()   # chunk embeddings
+            limiter.wait()   # skill extraction
+            job = api.build_job_record(text, name)
+            jds.append({"name": name, "text": job.text, "keywords": job.keywords, "skills": job.skills,
+                        "vectors": job.chunk_embeddings})
+        else:
+            text = text.strip()[:api.JD_MAX_CHARS]
+            jds.append({"name": name, "text": text, "keywords": sorted(scoring.extract_keywords(text)), "skills": []})
+    return jds
+
+
+def read_checkpoint(out: str) -> set[tuple[str, str]]:
+    """(file, jd) pairs already in the output; a half-written last line is dropped."""
+    try:
+        with open(out, "rb+") as f:
+            data = f.read()
+            end  = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+    except FileNotFoundError:
+        return set()
+    return {(r["file"], r["jd"]) for r in map(json.loads, filter(bytes.strip, data[:end].splitlines()))}
+
+
+def embed_batched(texts: list[str], limiter: RateLimiter) -> np.ndarray:
+    import api
+    parts = []
+    for start in range(0, len(texts), api.EMBED_BATCH_SIZE):
+        limiter.wait()
+        parts.append(api.embed_texts(texts[start:start + api.EMBED_BATCH_SIZE]))
+    return np.vstack(parts) if parts else np.empty((0, 0), np.float32)
+
+
+def skill_groups(texts: list[str], max_chars: int) -> list[list[int]]:
+    """Consecutive indices of `texts`, grouped so each group's text fits in `max_chars` (at least one per group)."""
+    groups, size = [], 0
+    for i, text in enumerate(texts):
+        if not groups or size + len(text) > max_chars:
+            groups.append([])
+            size = 0
+        groups[-1].append(i)
+        size += len(text)
+    return groups
+
+
+def score_batch(batch: list[dict], jds: list[dict], root: str, use_llm: bool,
+                limiter: RateLimiter, llm: ThreadPoolExecutor, skill_batch_chars: int) -> list[dict]:
+    """Output records for a batch of prepared resumes; LLM stages pooled across the batch."""
+    import api
+    ready   = [p for p in batch if "error" not in p]
+    vectors = {}
+    skills  = [None] * len(ready)
+    if use_llm and ready:
+        keys = [(i, c) for i, p in enumerate(ready) for c in sorted({c for s in p["jds"].values() for c in s["chunks"]})]
+        rows = embed_batched([ready[i]["chunks"][c] for i, c in keys], limiter)
+        vectors = dict(zip(keys, rows))
+
+        def extract(group: list[int]) -> list[set[str]]:
+            limiter.wait()
+            return api.ats_extract_skills_batch([ready[i]["text"] for i in group])
+        groups = skill_groups([p["text"] for p in ready], skill_batch_chars)
+        for group, found in zip(groups, llm.map(extract, groups)):
+            for i, resume_skills in zip(group, found):
+                skills[i] = resume_skills
+
+    records = []
+    for p in batch:
+        file = os.path.relpath(p["path"], root)
+        if "error" in p:
+            records.extend({"file": file, "jd": jd["name"], "error": p["error"]} for jd in jds)
+    for i, p in enumerate(ready):
+        file = os.path.relpath(p["path"], root)
+        for jd in jds:
+            s      = p["jds"][jd["name"]]
+            record = {"file": file, "sha256": p["sha256"], "jd": jd["name"],
+                      "keyword_score": s["keyword_score"], "keyword_density": s["keyword_density"]}
+            if use_llm:
+                chunk_vecs = np.stack([vectors[(i, c)] for c in s["chunks"]]) if s["chunks"] else np.empty((0, 0))
+                jd_skills  = set(jd["skills"])
+                record.update({
+                    "semantic_score": api.ats_semantic_score(p["text"], jd["text"], chunk_vecs, jd["vectors"]),
+                    "resume_skills":  sorted(skills[i]),
+                    "matched_skills": sorted(skills[i] & jd_skills),
+                    "missing_skills": sorted(jd_skills - skills[i]),
+                })
+            records.append(record)
+    return records
+
+
+def write_parquet(jsonl: str, path: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    with open(jsonl) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory of resume PDFs against job descriptions")
+    parser.add_argument("resumes", help="Directory of resume PDFs (searched recursively)")
+    parser.add_argument("--jd", action="append", required=True, help="Job description text file (repeatable)")
+    parser.add_argument("--out", default="scores.jsonl", help="JSONL output; also the resume checkpoint")
+    parser.add_argument("--parquet", help="Also write the results as Parquet (needs pyarrow)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="CPU worker processes")
+    parser.add_argument("--batch-size", type=int, default=32, help="Resumes per LLM batch / output flush")
+    parser.add_argument("--skip-llm", action="store_true",
+                        help="Keyword scores only: no embeddings or skill extraction. keyword_score then matches JD "
+                             "keywords without JD skill phrases, so it is not comparable with the API's ats_score")
+    parser.add_argument("--rpm", type=float, default=60, help="Gemini requests per minute (0 = unlimited)")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Concurrent skill-extraction requests")
+    parser.add_argument("--skill-batch-chars", type=int, default=60000,
+                        help="Resume text per skill-extraction request; several resumes share one call")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many new resumes")
+    args = parser.parse_args()
+
+    if args.parquet:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            parser.error("--parquet needs pyarrow (pip install pyarrow)")
+    if args.skip_llm:
+        # api.py checks its Gemini keys at import time; none are used without LLM stages.
+        for key in ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY"):
+            os.environ.setdefault(key, "unused")
+    import api   # the parent runs the LLM stages; worker processes never import it
+    logging.basicConfig(level=logging.INFO)
+    for noisy in ("httpx", "google_genai", "pypdf"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    limiter = RateLimiter(args.rpm)
+    try:
+        jds = load_jds(args.jd, not args.skip_llm, limiter)
+    except Exception as e:   # nothing is written; the next run starts over
+        parser.error(f"could not prepare the JDs: {e}")
+    done    = read_checkpoint(args.out)
+    root    = os.path.abspath(args.resumes)
+    paths   = sorted(
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(root) for name in names if name.lower().endswith(".pdf")
+    )
+    paths   = [p for p in paths if any((os.path.relpath(p, root), jd["name"]) not in done for jd in jds)]
+    if args.limit:
+        paths = paths[:args.limit]
+    logger.info("%d resumes to score against %d JDs (%d pairs already in %s)", len(paths), len(jds), len(done), args.out)
+
+    worker_jds = [{k: jd[k] for k in ("name", "text", "keywords", "skills")} for jd in jds]
+    init_args  = (worker_jds, api.CHUNK_BUDGET)
+    start, scored, failed = time.perf_counter(), 0, 0
+    with (
+        ProcessPoolExecutor(args.workers, multiprocessing.get_context("spawn"), _init_worker, init_args) as pool,
+        ThreadPoolExecutor(args.llm_workers) as llm,
+        open(args.out, "a") as sink,
+    ):
+        batch = []
+        for i, prepared in enumerate(pool.map(_prepare, paths, chunksize=4), 1):
+            batch.append(prepared)
+            if len(batch) < args.batch_size and i < len(paths):
+                continue
+            try:
+                records = score_batch(batch, jds, root, not args.skip_llm, limiter, llm, args.skill_batch_chars)
+            except Exception as e:   # leave the batch out of the checkpoint; the next run retries it
+                logger.warning("Batch of %d resumes failed, retry later: %s", len(batch), e)
+                failed += len(batch)
+                batch   = []
+                continue
+            for record in records:
+                if (record["file"], record["jd"]) not in done:
+                    sink.write(json.dumps(record) + "\n")
+            sink.flush()
+            scored += len(batch)
+            batch   = []
+            logger.info("%d/%d resumes (%.1f/s)", scored, len(paths), scored / (time.perf_counter() - start))
+
+    if failed:
+        logger.warning("%d resumes failed; re-run the same command to retry them", failed)
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+        logger.info("Wrote %s", args.parquet)
+
+
+if __name__ == "__main__":
+    main()
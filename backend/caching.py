@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+_MISSING = object()
+
+
+class _Abandoned(Exception):
+    """Handed to coalesced waiters when the request computing their result was cancelled."""
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with an optional TTL (seconds)."""
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self.hits    = 0
+        self.misses  = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock  = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires = item
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[0]
+
+    def discard_if(self, predicate) -> int:
+        """Remove every entry whose value matches `predicate`; returns how many were removed."""
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class ResultCache:
+    """
+    Response-level cache for expensive endpoints, keyed by a request fingerprint.
+    Concurrent duplicates share one computation, every result carries an ETag, and
+    an Idempotency-Key is bound to the first request fingerprint it was sent with.
+    Results are tagged with the documents they were computed from (e.g. "resume:<id>"),
+    so `invalidate` can drop them when one is deleted.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float | None = None):
+        self.coalesced    = 0
+        self._results     = LRUCache(maxsize, ttl)
+        self._idempotency = LRUCache(max(maxsize, 1), ttl)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._computing: dict[str, frozenset] = {}   # in-flight key → its tags
+        self._stale: set[str] = set()                 # in-flight keys invalidated meanwhile: not cached
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def etag(result) -> str:
+        body = json.dumps(result, sort_keys=True, default=str).encode()
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def claim(self, idempotency_key: str | None, fingerprint: str) -> bool:
+        """Bind an Idempotency-Key to a request; False if it was already used for a different one."""
+        if not idempotency_key:
+            return True
+        bound = self._idempotency.get(idempotency_key)
+        if bound is None:
+            self._idempotency.set(idempotency_key, fingerprint)
+            return True
+        return bound == fingerprint
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable],
+                             tags: tuple[str, ...] = ()) -> tuple[object, str, str]:
+        """
+        (result, etag, "hit" | "coalesced" | "miss"). Failures and partial results
+        (`partial: true`) are not cached. If the request computing a result is cancelled,
+        the requests waiting on it don't inherit the cancellation: one of them computes it.
+        """
+        while True:
+            cached = self._results.get(key)
+            if cached is not None:
+                return (*cached[0], "hit")
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                entry = await asyncio.shield(pending)
+            except _Abandoned:
+                continue
+            self.coalesced += 1
+            return (*entry, "coalesced")
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        self._computing[key] = frozenset(tags)
+        try:
+            result = await compute()
+            entry  = (result, self.etag(result))
+        except BaseException as e:
+            self._inflight.pop(key, None)
+            self._computing.pop(key, None)
+            self._stale.discard(key)
+            future.set_exception(e if isinstance(e, Exception) else _Abandoned())   # cancelled or out of time
+            future.exception()   # retrieved: no "never retrieved" warning when nobody was waiting
+            raise
+        self._computing.pop(key, None)
+        if not (isinstance(result, dict) and result.get("partial")) and key not in self._stale:
+            self._results.set(key, (entry, frozenset(tags)))
+        self._stale.discard(key)
+        self._inflight.pop(key, None)
+        future.set_result(entry)
+        return (*entry, "miss")
+
+    def invalidate(self, tag: str) -> int:
+        """Drop every cached result tagged `tag` (and don't cache those still being computed)."""
+        self._stale.update(key for key, tags in self._computing.items() if tag in tags)
+        return self._results.discard_if(lambda value: tag in value[1])
+
+    def stats(self) -> dict:
+        return {**self._results.stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
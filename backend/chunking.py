@@ -0,0 +1,157 @@
+"""
+Resume-aware text chunker (dependency-free).
+
+Splits resume text along its own structure — section headings, dated entries
+(jobs, degrees) and their bullet lists — instead of fixed character windows, so
+chunks don't straddle sections. One linear pass over the lines, no regexes.
+"""
+
+SECTION_NAMES = {
+    "summary", "profile", "professional summary", "objective", "about", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "academic background", "skills", "technical skills", "core competencies",
+    "projects", "personal projects", "certifications", "certificates", "licenses",
+    "awards", "achievements", "honors", "publications", "languages", "interests",
+    "volunteering", "volunteer experience", "leadership", "activities", "courses", "training",
+}
+
+BULLET_CHARS = set("-•*▪●◦‣–—·►✓")
+RANGE_WORDS  = ("present", "current", "now", "till date", "ongoing")
+
+_DATE_SEPARATORS = str.maketrans("-–—/|", "     ")
+
+
+def is_heading(line: str) -> bool:
+    """Short line that is a known section name, ALL CAPS, or ends with ':'."""
+    if not line or len(line) > 40 or line[-1] in ".,;":
+        return False
+    name = line.rstrip(":").strip().lower()
+    if name in SECTION_NAMES:
+        return True
+    return line.isupper() and len(line.split()) <= 4 and sum(c.isalpha() for c in line) >= 3
+
+
+def is_bullet(line: str) -> bool:
+    if line[0] in BULLET_CHARS:
+        return True
+    # "1." / "2)" style numbering
+    i = 0
+    while i < len(line) and i < 3 and line[i].isdigit():
+        i += 1
+    return 0 < i < len(line) and line[i] in ".)" and i + 1 < len(line) and line[i + 1] == " "
+
+
+def count_years(line: str) -> int:
+    """Count standalone 19xx / 20xx tokens."""
+    if "19" not in line and "20" not in line:
+        return 0
+    count = 0
+    for tok in line.translate(_DATE_SEPARATORS).split():
+        tok = tok.strip("()[],.;:'")
+        if len(tok) == 4 and tok.isdigit() and tok[:2] in ("19", "20"):
+            count += 1
+    return count
+
+
+def has_date_range(line: str) -> bool:
+    years = count_years(line)
+    if years >= 2:
+        return True
+    lower = line.lower()
+    return years == 1 and any(w in lower for w in RANGE_WORDS)
+
+
+def split_sections(text: str) -> dict[str, str]:
+    """
+    Map lower-cased section heading -> section body. Text before the first
+    heading goes under "header"; repeated headings are concatenated.
+    """
+    sections: dict[str, list[str]] = {}
+    current = sections.setdefault("header", [])
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if is_heading(line):
+            current = sections.setdefault(line.rstrip(":").strip().lower(), [])
+            continue
+        current.append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+
+def _split_long(line: str, max_chars: int) -> list[str]:
+    """Hard-wrap a single oversize line at whitespace."""
+    parts, start = [], 0
+    while len(line) - start > max_chars:
+        cut = line.rfind(" ", start, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        parts.append(line[start:cut].strip())
+        start = cut
+    parts.append(line[start:].strip())
+    return [p for p in parts if p]
+
+
+def chunk_resume(text: str, max_chars: int = 1000) -> list[str]:
+    """
+    Group lines into blocks (a dated entry with its bullets, or a run of plain
+    lines), then pack whole blocks into chunks of at most `max_chars`. A new
+    section always starts a new chunk, and every chunk of a section is prefixed
+    with its heading for context; only very short neighbouring sections (contact
+    line, one-line summary) are merged so they don't each cost an embedding.
+    """
+    chunks: list[str] = []
+    heading = ""
+    current: list[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            body = "\n".join(current)
+            chunks.append(f"{heading}\n{body}" if heading else body)
+        current, size = [], 0
+
+    block: list[str] = []
+    block_size = 0
+
+    def emit_block():
+        nonlocal block, block_size, size
+        if not block:
+            return
+        budget = max_chars - len(heading) - 1
+        if size and size + block_size > budget:
+            flush()
+        for line in block:
+            for piece in _split_long(line, budget) if len(line) > budget else [line]:
+                if size and size + len(piece) + 1 > budget:
+                    flush()
+                current.append(piece)
+                size += len(piece) + 1
+        block, block_size = [], 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if is_heading(line):
+            emit_block()
+            flush()
+            heading = line.rstrip(":").strip()
+            continue
+        if not is_bullet(line) and has_date_range(line):
+            emit_block()
+        block.append(line)
+        block_size += len(line) + 1
+
+    emit_block()
+    flush()
+
+    small  = max_chars // 3
+    merged: list[str] = []
+    for chunk in chunks:
+        if merged and len(chunk) < small and len(merged[-1]) < small:
+            merged[-1] += "\n" + chunk
+        else:
+            merged.append(chunk)
+    return merged
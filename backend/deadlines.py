@@ -0,0 +1,99 @@
+"""
+Per-request time budgets for LLM work.
+
+`request_deadline(seconds)` sets a deadline for everything run in the current
+context. The deadline is kept in a context variable, so it follows the request
+into asyncio.to_thread workers, which copy the context. Pool tasks get it through
+`bind_deadline`. Each LLM request is capped at the time left (`llm_http_options`,
+used as the SDK's `http_options`), and `within_deadline` awaits blocking work in a
+thread for no longer than that. Once the deadline has passed, no new LLM call starts.
+
+When the budget runs out, DeadlineExceeded is raised. Like asyncio.CancelledError,
+it derives from BaseException. That way the `except Exception` fallbacks of the
+LLM helpers (an empty result on a bad response) don't catch it and turn it into a
+cached empty result. The endpoint catches it and returns the stages that finished.
+"""
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+_deadline: contextvars.ContextVar["Deadline | None"] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(BaseException):
+    """The request's time budget ran out."""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.at      = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+    def check(self) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Time budget of {self.seconds:g}s ran out")
+
+
+@contextmanager
+def request_deadline(seconds: float | None):
+    """Deadline for the rest of this context; None or <= 0 means no budget."""
+    token = _deadline.set(Deadline(seconds) if seconds and seconds > 0 else None)
+    try:
+        yield _deadline.get()
+    finally:
+        _deadline.reset(token)
+
+
+def llm_http_options() -> dict | None:
+    """SDK `http_options` that cap one request at the time left (None without a deadline)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    deadline.check()
+    return {"timeout": max(int(deadline.remaining() * 1000), 1)}
+
+
+@contextmanager
+def deadline_guard():
+    """Around one LLM call: no start after the deadline, and its timeout is reported as DeadlineExceeded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        yield
+        return
+    deadline.check()
+    try:
+        yield
+    except Exception as e:
+        import httpx   # the SDK's transport; only needed once a call has failed
+        if deadline.remaining() <= 0 or isinstance(e, httpx.TimeoutException):
+            raise DeadlineExceeded(f"Time budget of {deadline.seconds:g}s ran out") from e
+        raise
+
+
+async def within_deadline(fn, *args):
+    """`fn(*args)` in a worker thread, abandoned with DeadlineExceeded when the budget runs out."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return await asyncio.to_thread(fn, *args)
+    deadline.check()
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(fn, *args), deadline.remaining())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Time budget of {deadline.seconds:g}s ran out") from None
+
+
+def bind_deadline(fn):
+    """`fn` carrying the current deadline into executor threads (ThreadPoolExecutor doesn't copy context)."""
+    deadline = _deadline.get()
+
+    def run(*args):
+        token = _deadline.set(deadline)
+        try:
+            return fn(*args)
+        finally:
+            _deadline.reset(token)
+    return run
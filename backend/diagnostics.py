@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import logging
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def collapse_stack(frame) -> str:
+    """Render a frame chain root-first as a `;`-separated collapsed stack."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+# ── Event-loop lag monitor ────────────────────────────────────────────────────
+
+class LoopLagMonitor:
+    """
+    Detect event-loop stalls and record the stack of the blocking frame.
+
+    A heartbeat coroutine ticks every `interval_ms`; a watchdog thread checks the
+    heartbeat and, once it is overdue by `threshold_ms`, snapshots the loop
+    thread's stack while it is still blocked. The stall is recorded when the
+    heartbeat wakes up again and measures its real lag.
+    """
+
+    def __init__(self, threshold_ms: float = 100, interval_ms: float = 50, max_events: int = 200):
+        self.threshold = threshold_ms / 1000
+        self.interval  = interval_ms / 1000
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self.total_stalls = 0
+        self.max_lag_ms   = 0.0
+        self._beat        = time.perf_counter()
+        self._stack: str | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watchdog, name="loop-lag-watchdog", daemon=True).start()
+        logger.info("Loop lag monitor started (threshold=%.0fms)", self.threshold * 1000)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat  = time.perf_counter()
+            self._stack = None
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - self._beat - self.interval
+            if lag >= self.threshold:
+                self._record(lag)
+
+    def _watchdog(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            overdue = time.perf_counter() - self._beat - self.interval
+            if overdue >= self.threshold and self._stack is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                self._stack = collapse_stack(frame) if frame is not None else ""
+
+    def _record(self, lag: float) -> None:
+        lag_ms = round(lag * 1000, 1)
+        self.total_stalls += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.events.append({"at": time.time(), "lag_ms": lag_ms, "stack": self._stack or ""})
+        logger.warning("Event loop stalled for %.1fms", lag_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "total_stalls": self.total_stalls,
+            "max_lag_ms":   self.max_lag_ms,
+            "events":       list(self.events),
+        }
+
+
+# ── Sampling profiler ─────────────────────────────────────────────────────────
+
+_profile_lock = threading.Lock()
+
+
+def sample_profile(seconds: float, interval_ms: float = 5) -> str:
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    (`frame;frame;frame count` per line), ready for flamegraph.pl / speedscope.
+    Raises RuntimeError if another profile is already running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already being captured.")
+    try:
+        own      = threading.get_ident()
+        names    = {t.ident: t.name for t in threading.enumerate()}
+        counts   = Counter()
+        interval = interval_ms / 1000
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                counts[f"{names.get(tid, tid)};{collapse_stack(frame)}"] += 1
+            time.sleep(interval)
+        return "\n".join(f"{stack} {n}" for stack, n in counts.most_common())
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,157 @@
+"""
+Compact, memory-mapped embedding storage.
+
+A `.emb` file is a 32-byte header, one float32 scale per row, then the row codes
+(float32, float16 or int8). `open_matrix` maps the file read-only, so every worker
+shares the same page-cache pages and nothing is parsed at startup.
+
+int8 uses symmetric per-row scaling (code = round(x / scale), scale = max|x| / 127);
+float16/float32 rows carry a scale of 1. `dim` keeps only the leading components,
+which is how Matryoshka-trained models like gemini-embedding-001 are truncated.
+"""
+import os
+import struct
+
+import numpy as np
+
+from caching import LRUCache
+from store import DATA_DIR, atomic_write, doc_path
+
+DTYPES  = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+_CODES  = {name: i for i, name in enumerate(DTYPES)}
+_MAGIC  = b"EMB1"
+_HEADER = struct.Struct("<4sB3xQI12x")   # magic, dtype code, rows, dim -> 32 bytes
+
+
+def quantize(vectors, dtype: str = "int8", dim: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Return (codes, scales) for a (rows, dim) float matrix."""
+    arr = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if dim:
+        arr = arr[:, :dim]
+    if dtype == "int8":
+        scales = np.abs(arr).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        codes  = np.rint(arr / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return arr.astype(DTYPES[dtype]), np.ones(len(arr), np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    out = codes.astype(np.float32)
+    if codes.dtype == np.int8:
+        out *= scales[:, None]
+    return out
+
+
+class QuantizedMatrix:
+    """codes + per-row scales, held in memory or mapped from a `.emb` file."""
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes  = codes
+        self.scales = scales
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype: str = "int8", dim: int | None = None) -> "QuantizedMatrix":
+        return cls(*quantize(vectors, dtype, dim))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def rows(self, idx) -> np.ndarray:
+        """Dequantized float32 copy of the selected rows."""
+        return dequantize(self.codes[idx], self.scales[idx])
+
+    def to_float32(self) -> np.ndarray:
+        if self.codes.dtype == np.float32:
+            return np.asarray(self.codes)
+        return dequantize(self.codes, self.scales)
+
+    def matmul(self, q: np.ndarray, block: int = 65536) -> np.ndarray:
+        """(rows, dim) @ (dim, m) without dequantizing the whole matrix at once."""
+        if self.codes.dtype == np.float32:
+            return self.codes @ q
+        out = np.empty((len(self), q.shape[1]), np.float32)
+        for start in range(0, len(self), block):
+            out[start:start + block] = self.rows(slice(start, start + block)) @ q
+        return out
+
+
+def write_matrix(path: str, matrix: QuantizedMatrix) -> None:
+    """Atomically write a `.emb` file."""
+    codes = np.ascontiguousarray(matrix.codes)
+    with atomic_write(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _CODES[codes.dtype.name], len(codes), codes.shape[1]))
+        f.write(np.ascontiguousarray(matrix.scales, np.float32).tobytes())
+        f.write(codes.tobytes())
+
+
+def open_matrix(path: str) -> QuantizedMatrix | None:
+    """Map a `.emb` file read-only; None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            magic, code, rows, dim = _HEADER.unpack(f.read(_HEADER.size))
+    except FileNotFoundError:
+        return None
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not an embedding file")
+    dtype = list(DTYPES.values())[code]
+    if rows == 0:
+        return QuantizedMatrix(np.empty((0, dim), dtype), np.empty(0, np.float32))
+    scales = np.memmap(path, np.float32, "r", offset=_HEADER.size, shape=(rows,))
+    codes  = np.memmap(path, dtype, "r", offset=_HEADER.size + 4 * rows, shape=(rows, dim))
+    return QuantizedMatrix(codes, scales)
+
+
+class EmbeddingStore:
+    """One `.emb` file per document id (e.g. a resume's chunk vectors), next to a JsonStore."""
+
+    def __init__(self, name: str, dtype: str = "float16", dim: int | None = None, cache_size: int = 512):
+        self.path   = os.path.join(DATA_DIR, name)
+        self.dtype  = dtype
+        self.dim    = dim
+        self._cache = LRUCache(maxsize=cache_size)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, doc_id: str) -> str:
+        return doc_path(self.path, doc_id, ".emb")
+
+    def get(self, doc_id: str) -> np.ndarray | None:
+        """
+        A document's vectors. float16/float32 stores return the mapped rows as stored
+        (callers convert at the matmul, see vector_index.prepare); int8 is dequantized.
+        """
+        vecs = self._cache.get(doc_id)
+        if vecs is None:
+            try:
+                matrix = open_matrix(self._file(doc_id))
+            except KeyError:
+                return None
+            if matrix is None:
+                return None
+            if matrix.codes.dtype == np.int8:
+                return matrix.to_float32()
+            vecs = matrix.codes
+            self._cache.set(doc_id, vecs)
+        return vecs
+
+    def put(self, doc_id: str, vectors) -> np.ndarray:
+        matrix = QuantizedMatrix.from_vectors(vectors, self.dtype, self.dim)
+        write_matrix(self._file(doc_id), matrix)
+        self._cache.pop(doc_id)
+        return matrix.to_float32()
+
+    def delete(self, doc_id: str) -> bool:
+        self._cache.pop(doc_id)
+        try:
+            os.remove(self._file(doc_id))
+            return True
+        except (KeyError, FileNotFoundError):
+            return False
@@ -0,0 +1,249 @@
+"""
+Corpus-level BM25 keyword scoring over every registered resume and JD.
+
+Each document is a sparse row of term counts (CSR: `indptr` / term ids / counts)
+over a shared vocabulary, and document frequencies are kept in step as rows are
+added and removed, so IDF reflects the whole stored corpus rather than one
+resume/JD pair. Scoring every stored document against a JD is one sparse
+matrix-vector product (a gather over the non-zeros plus `np.bincount`).
+
+Scores are normalised to 0-100: a document that contains every JD term once, at
+average length, scores 100. Rare terms (high IDF) weigh more than common ones.
+"""
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+from lexical import tokenize
+from store import atomic_write, current_snapshot, new_snapshot
+
+
+class KeywordIndex:
+    """Sparse term-count rows keyed by document id, with incremental IDF statistics."""
+
+    def __init__(self, stopwords: set[str] = frozenset(), k1: float = 1.5, b: float = 0.75):
+        self.stopwords = stopwords
+        self.k1        = k1
+        self.b         = b
+        self._vocab: dict[str, int] = {}
+        self._terms: list[str]      = []
+        self._df        = np.zeros(0, np.int64)
+        self._indptr    = np.zeros(1, np.int64)
+        self._indices   = np.empty(0, np.int32)
+        self._counts    = np.empty(0, np.float32)
+        self._row_of    = np.empty(0, np.int32)          # row number of each non-zero
+        self._lengths: list[float]           = []
+        self._pending: list[tuple[np.ndarray, np.ndarray]] = []
+        self._ids:   list[str | None]        = []
+        self._slots: dict[str, int]          = {}
+        self._total_len = 0.0
+        self._dead      = 0
+        self._lock      = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    def ids(self) -> set[str]:
+        return set(self._slots)
+
+    @property
+    def avg_len(self) -> float:
+        return self._total_len / len(self._slots) if self._slots else 0.0
+
+    # ── Mutation ──────────────────────────────────────────────────────────────
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document's terms (replacing it if present) and update IDF."""
+        with self._lock:
+            self.delete(doc_id)
+            counts = Counter(tokenize(text, self.stopwords))
+            for term in counts:
+                if term not in self._vocab:
+                    self._vocab[term] = len(self._terms)
+                    self._terms.append(term)
+            if len(self._terms) > len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(max(len(self._terms) - len(self._df), 1024), np.int64)])
+            indices = np.fromiter((self._vocab[t] for t in counts), np.int32, len(counts))
+            tf      = np.fromiter(counts.values(), np.float32, len(counts))
+            self._df[indices] += 1
+            self._pending.append((indices, tf))
+            self._slots[doc_id] = len(self._ids)
+            self._ids.append(doc_id)
+            self._lengths.append(float(tf.sum()))
+            self._total_len += self._lengths[-1]
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._slots.pop(doc_id, None)
+            if row is None:
+                return False
+            indices, _ = self._row(row)
+            self._df[indices] -= 1
+            self._total_len -= self._lengths[row]
+            self._ids[row] = None
+            self._dead += 1
+            if self._dead > 256 and self._dead > len(self._ids) // 4:
+                self.compact()
+            return True
+
+    def compact(self) -> None:
+        """Drop deleted rows."""
+        with self._lock:
+            self._flush()
+            keep    = [r for r, doc_id in enumerate(self._ids) if doc_id is not None]
+            rows    = [self._row(r) for r in keep]
+            ids     = [self._ids[r] for r in keep]
+            lengths = [self._lengths[r] for r in keep]
+            self._set_rows(rows)
+            self._ids, self._lengths = ids, lengths
+            self._slots = {doc_id: r for r, doc_id in enumerate(ids)}
+            self._dead  = 0
+
+    def _row(self, row: int) -> tuple[np.ndarray, np.ndarray]:
+        flushed = len(self._indptr) - 1
+        if row >= flushed:
+            return self._pending[row - flushed]
+        start, end = self._indptr[row], self._indptr[row + 1]
+        return self._indices[start:end], self._counts[start:end]
+
+    def _set_rows(self, rows: list[tuple[np.ndarray, np.ndarray]]) -> None:
+        sizes         = np.array([len(ix) for ix, _ in rows], np.int64)
+        self._indptr  = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self._indices = np.concatenate([ix for ix, _ in rows]) if rows else np.empty(0, np.int32)
+        self._counts  = np.concatenate([tf for _, tf in rows]) if rows else np.empty(0, np.float32)
+        self._row_of  = np.repeat(np.arange(len(rows), dtype=np.int32), sizes)
+        self._pending = []
+
+    def _flush(self) -> None:
+        """Fold rows added since the last query into the CSR arrays (one concatenate)."""
+        if not self._pending:
+            return
+        sizes         = np.array([len(ix) for ix, _ in self._pending], np.int64)
+        flushed       = len(self._indptr) - 1
+        self._indptr  = np.concatenate([self._indptr, self._indptr[-1] + np.cumsum(sizes)])
+        self._indices = np.concatenate([self._indices, *(ix for ix, _ in self._pending)])
+        self._counts  = np.concatenate([self._counts, *(tf for _, tf in self._pending)])
+        self._row_of  = np.concatenate([self._row_of, np.repeat(np.arange(flushed, flushed + len(sizes), dtype=np.int32), sizes)])
+        self._pending = []
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+
+    def _idf(self, df: np.ndarray) -> np.ndarray:
+        n = len(self._slots)
+        return np.log1p((n - df + 0.5) / (df + 0.5))
+
+    def _saturation(self, tf, norm):
+        """
+        BM25 term-frequency factor, capped at 1 (a single occurrence in an average-length
+        document). Uncapped it reaches k1 + 1, so repeating one term could make up for
+        missing others and push the sum past `ideal`, where the score used to be clipped.
+        """
+        return np.minimum(tf * (self.k1 + 1) / (tf + norm), 1.0)
+
+    def _query(self, query: str) -> tuple[Counter, np.ndarray, float]:
+        """(query term counts, BM25 weights idf × qtf, the weight sum a perfect match reaches).
+        Terms no stored document contains get df 0, so they still count towards a perfect match."""
+        counts  = Counter(tokenize(query, self.stopwords))
+        df      = np.fromiter((self._df[self._vocab[t]] if t in self._vocab else 0 for t in counts), np.float64, len(counts))
+        weights = self._idf(df) * np.fromiter(counts.values(), np.float64, len(counts))
+        return counts, weights, float(weights.sum())
+
+    def _score_rows(self, query: str) -> np.ndarray:
+        """One sparse mat-vec: BM25 of every row (deleted rows included) against `query`, 0-100."""
+        self._flush()
+        counts, weights, ideal = self._query(query)
+        known = [(self._vocab[t], w) for t, w in zip(counts, weights) if t in self._vocab]
+        if not ideal or not known:
+            return np.zeros(len(self._ids))
+        q       = np.zeros(len(self._terms))
+        terms, term_weights = zip(*known)
+        q[list(terms)] = term_weights
+        qw      = q[self._indices]
+        nz      = np.flatnonzero(qw)
+        rows    = self._row_of[nz]
+        tf      = self._counts[nz]
+        lengths = np.asarray(self._lengths)
+        norm    = self.k1 * (1 - self.b + self.b * lengths[rows] / (self.avg_len or 1.0))
+        out     = np.bincount(rows, qw[nz] * self._saturation(tf, norm), minlength=len(self._ids)) / ideal
+        return out * 100
+
+    def scores(self, query: str) -> tuple[list[str | None], np.ndarray]:
+        """0-100 score of every stored document (None ids are deleted rows, scored 0)."""
+        with self._lock:
+            out = self._score_rows(query)
+            ids = list(self._ids)
+        if self._dead:
+            out[[r for r, doc_id in enumerate(ids) if doc_id is None]] = 0.0
+        return ids, out
+
+    def score_docs(self, query: str, doc_ids: list[str]) -> list[float]:
+        """0-100 scores for the given stored documents (0 for unknown ids)."""
+        with self._lock:
+            out  = self._score_rows(query)
+            rows = [self._slots.get(doc_id) for doc_id in doc_ids]
+        return [round(float(out[r]), 2) if r is not None else 0.0 for r in rows]
+
+    def score(self, text: str, query: str) -> float:
+        """0-100 score of an arbitrary (possibly unstored) text, against corpus IDF."""
+        with self._lock:
+            q, weights, ideal = self._query(query)
+            avg_len = self.avg_len
+        if not ideal:
+            return 0.0
+        counts = Counter(tokenize(text, self.stopwords))
+        length = sum(counts.values())
+        norm   = self.k1 * (1 - self.b + self.b * length / (avg_len or length or 1.0))
+        total  = sum(w * self._saturation(counts[t], norm) for t, w in zip(q, weights) if counts[t])
+        return round(float(total / ideal) * 100, 2)
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        """
+        Write `rows.npz` (CSR arrays and the row ids) and `index.json` (vocabulary and
+        ids) as a new snapshot version of `path`, compacting first.
+        """
+        with self._lock:
+            self.compact()
+            with new_snapshot(path) as directory:
+                with atomic_write(os.path.join(directory, "rows.npz"), "wb") as f:
+                    np.savez(f, indptr=self._indptr, indices=self._indices, counts=self._counts,
+                             ids=np.array(self._ids, dtype=str))
+                with atomic_write(os.path.join(directory, "index.json")) as f:
+                    json.dump({"terms": self._terms, "ids": self._ids}, f)
+
+    @classmethod
+    def load(cls, path: str, stopwords: set[str] = frozenset()) -> "KeywordIndex":
+        """
+        Load the current snapshot of a saved index (document frequencies and lengths are
+        recomputed), or return an empty one if there is none or its rows and ids disagree.
+        """
+        index     = cls(stopwords)
+        directory = current_snapshot(path)
+        if directory is None:
+            return index
+        try:
+            with open(os.path.join(directory, "index.json")) as f:
+                meta = json.load(f)
+            with np.load(os.path.join(directory, "rows.npz"), allow_pickle=False) as arrays:
+                indptr, indices, counts, ids = arrays["indptr"], arrays["indices"], arrays["counts"], arrays["ids"]
+        except (FileNotFoundError, KeyError):
+            return index
+        if len(indptr) != len(meta["ids"]) + 1 or ids.tolist() != meta["ids"]:
+            return index
+        index._terms   = meta["terms"]
+        index._vocab   = {t: i for i, t in enumerate(index._terms)}
+        index._ids     = meta["ids"]
+        index._slots   = {doc_id: r for r, doc_id in enumerate(index._ids)}
+        index._indptr, index._indices, index._counts = indptr, indices, counts
+        index._row_of  = np.repeat(np.arange(len(index._ids), dtype=np.int32), np.diff(indptr))
+        index._df      = np.bincount(indices, minlength=len(index._terms)).astype(np.int64)
+        index._lengths = np.bincount(index._row_of, counts, minlength=len(index._ids)).tolist()
+        index._total_len = float(sum(index._lengths))
+        return index
@@ -0,0 +1,49 @@
+"""
+BM25 ranking of a resume's chunks against a job description (dependency-free).
+
+Used as a cheap prefilter: only the most JD-relevant chunks are sent to the
+embedder, instead of whichever chunks happen to come first.
+"""
+import math
+import re
+from collections import Counter
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text: str, stopwords: set[str] = frozenset()) -> list[str]:
+    """Lower-cased word tokens; keeps c++, c#, node.js style terms intact."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [t for t in tokens if t not in stopwords] if stopwords else tokens
+
+
+def bm25_scores(docs: list[str], query: str, stopwords: set[str] = frozenset(),
+                k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """Okapi BM25 score of each doc for `query`, with IDF taken over `docs` themselves."""
+    doc_tokens = [Counter(tokenize(d, stopwords)) for d in docs]
+    lengths    = [sum(c.values()) for c in doc_tokens]
+    avg_len    = sum(lengths) / len(lengths) if lengths else 0.0
+    df         = Counter(t for c in doc_tokens for t in c)
+    query_tf   = Counter(tokenize(query, stopwords))
+    n          = len(docs)
+
+    idf    = {t: math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5)) for t in query_tf if df[t]}
+    scores = []
+    for tokens, length in zip(doc_tokens, lengths):
+        norm  = k1 * (1 - b + b * length / avg_len) if avg_len else k1
+        score = 0.0
+        for term, weight in idf.items():
+            tf = tokens.get(term)
+            if tf:
+                score += weight * query_tf[term] * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def select_chunks(chunks: list[str], query: str, budget: int, stopwords: set[str] = frozenset()) -> list[int]:
+    """Indices of the `budget` chunks that best match `query`, in document order."""
+    if len(chunks) <= budget:
+        return list(range(len(chunks)))
+    scores = bm25_scores(chunks, query, stopwords)
+    ranked = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+    return sorted(ranked[:budget])
@@ -0,0 +1,98 @@
+"""
+Multi-pattern keyword/phrase matching for a JD's keywords and skill phrases.
+
+Text is tokenized once with `lexical.tokenize` (so node.js, c++ stay whole and
+"CI/CD" becomes ci, cd). Single-token patterns are then counted from one C-level
+`Counter` over the tokens; multi-token phrases ("machine learning", "ci/cd") are
+compiled into an Aho-Corasick automaton whose alphabet is tokens, which is only
+stepped from positions where some phrase can start. Every occurrence of every
+pattern is counted, overlapping ones included ("machine learning" also counts
+"learning" if that is a keyword too).
+
+Each term can have several surface forms (k8s → kubernetes, "ci cd" → ci/cd);
+matches are reported under the term.
+"""
+from collections import Counter, deque
+from typing import Iterable
+
+from lexical import tokenize
+
+
+class PhraseMatcher:
+    """Compiled term → variants matcher; `count(text)` returns per-term occurrence counts."""
+
+    def __init__(self, terms: dict[str, Iterable[str]] | Iterable[str]):
+        if not isinstance(terms, dict):
+            terms = {term: () for term in terms}
+        self.terms = sorted(terms)
+        self._unigrams: dict[str, list[int]] = {}
+        self._goto: list[dict[str, int]]     = [{}]
+        self._out:  list[set[int]]           = [set()]
+        for i, term in enumerate(self.terms):
+            for variant in {term, *terms[term]}:
+                tokens = tokenize(variant)
+                if len(tokens) == 1:
+                    self._unigrams.setdefault(tokens[0], []).append(i)
+                elif tokens:
+                    self._insert(tokens, i)
+        self._fail = self._link()
+        self._emit = [tuple(out) for out in self._out]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _insert(self, tokens: list[str], term: int) -> None:
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._out.append(set())
+            state = nxt
+        self._out[state].add(term)
+
+    def _link(self) -> list[int]:
+        """Breadth-first failure links; each state also emits its failure state's matches."""
+        fail  = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(token, 0)
+                self._out[nxt] |= self._out[fail[nxt]]
+        return fail
+
+    def count(self, text: str) -> Counter:
+        """Occurrences of each term in `text` (terms that never occur are absent)."""
+        tokens = tokenize(text)
+        hits   = Counter()
+        seen   = Counter(tokens)
+        for token, terms in self._unigrams.items():
+            n = seen.get(token)
+            if n:
+                for term in terms:
+                    hits[term] += n
+
+        goto, fail, emit, root = self._goto, self._fail, self._emit, self._goto[0]
+        end = 0
+        for start in [i for i, token in enumerate(tokens) if token in root] if root else ():
+            if start < end:
+                continue
+            state, end = 0, start
+            while end < len(tokens):   # the automaton is at the root again once a run of matches ends
+                token = tokens[end]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+                end  += 1
+                for term in emit[state]:
+                    hits[term] += 1
+                if not state:
+                    break
+        return Counter({self.terms[i]: n for i, n in hits.items()})
@@ -0,0 +1,137 @@
+"""
+Prompt templates split into a static prefix and a dynamic suffix.
+
+Every prompt whose bulk never changes (role, output schema, rules) is registered
+once. The prefix is always sent first and byte-for-byte identical, so Gemini's
+implicit prefix caching can serve it from cache. When a prefix is long enough to
+be cached explicitly (PROMPT_CACHE_MIN_TOKENS), it is uploaded once per client
+and model with `client.caches.create`, and later calls send only the suffix
+along with the cache name. If a cache is rejected (expired or deleted), it is
+dropped and the whole prompt is sent inline.
+
+Every request is capped at the time left in the request deadline, if there is one.
+
+For each template the registry counts calls and input tokens, split into tokens
+served from cache (`cached_content_token_count`) and tokens billed in full.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from deadlines import llm_http_options
+
+logger = logging.getLogger(__name__)
+
+
+class PromptTemplate:
+    """A registered prompt: `prefix` is sent verbatim, `suffix` is a str.format template."""
+
+    def __init__(self, registry: "PromptRegistry", name: str, prefix: str, suffix: str):
+        self.registry = registry
+        self.name     = name
+        self.prefix   = prefix
+        self.suffix   = suffix
+
+    def render(self, **fields) -> str:
+        return self.prefix + self.suffix.format(**fields)
+
+    def generate(self, client, model: str, **fields) -> str:
+        """Text response for this template filled with `fields`."""
+        return self.registry.generate(self, client, model, self.suffix.format(**fields))
+
+
+class PromptRegistry:
+    """Named templates, their explicit context caches and per-template token accounting."""
+
+    def __init__(self, mode: str = "auto", min_tokens: int = 1024, ttl: int = 3600):
+        self.mode       = mode          # "auto": explicit caches for long prefixes | "off": implicit only
+        self.min_tokens = min_tokens
+        self.ttl        = ttl
+        self._templates: dict[str, PromptTemplate] = {}
+        self._caches:    dict[tuple, tuple[str, float]] = {}   # (client id, template, model) → (cache name, expiry)
+        self._retry_at:  dict[tuple, float] = {}               # don't retry a failed cache creation before this
+        self._stats:     dict[str, Counter] = {}
+        self._lock       = threading.Lock()
+
+    def register(self, name: str, prefix: str, suffix: str) -> PromptTemplate:
+        template = self._templates[name] = PromptTemplate(self, name, prefix, suffix)
+        self._stats[name] = Counter()
+        return template
+
+    def __getitem__(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def _cached_content(self, template: PromptTemplate, client, model: str) -> str | None:
+        """Name of a live explicit cache holding the template's prefix, creating it if worthwhile."""
+        if self.mode == "off" or len(template.prefix) // 4 < self.min_tokens:
+            return None
+        key = (id(client), template.name, model)
+        now = time.time()
+        with self._lock:
+            name, expires = self._caches.get(key, (None, 0.0))
+            if name and expires > now:
+                return name
+            if self._retry_at.get(key, 0.0) > now:
+                return None
+        try:
+            cache = client.caches.create(model=model, config={
+                "contents": [template.prefix], "ttl": f"{self.ttl}s", "display_name": f"prompt-{template.name}",
+                "http_options": llm_http_options(),
+            })
+        except Exception as e:   # prefix under the model's minimum, quota, no caching support...
+            logger.info("No context cache for prompt %s: %s", template.name, e)
+            with self._lock:
+                self._retry_at[key] = now + self.ttl
+            return None
+        with self._lock:
+            self._caches[key] = (cache.name, now + self.ttl - 60)
+            self._stats[template.name]["caches_created"] += 1
+        return cache.name
+
+    def _forget(self, template: PromptTemplate, client, model: str) -> None:
+        with self._lock:
+            self._caches.pop((id(client), template.name, model), None)
+
+    def generate(self, template: PromptTemplate, client, model: str, suffix: str) -> str:
+        cache    = self._cached_content(template, client, model)
+        response = None
+        if cache:
+            try:
+                response = client.models.generate_content(model=model, contents=suffix, config={
+                    "cached_content": cache, "http_options": llm_http_options(),
+                })
+            except Exception as e:
+                if getattr(e, "code", None) not in (400, 403, 404):
+                    raise
+                logger.info("Context cache for prompt %s rejected, sending it inline: %s", template.name, e)
+                self._forget(template, client, model)
+                cache = None
+        if response is None:
+            response = client.models.generate_content(model=model, contents=template.prefix + suffix,
+                                                      config={"http_options": llm_http_options()})
+        self._record(template.name, response.usage_metadata, explicit=bool(cache))
+        return response.text.strip()
+
+    def _record(self, name: str, usage, explicit: bool) -> None:
+        prompt = getattr(usage, "prompt_token_count", None) or 0
+        cached = getattr(usage, "cached_content_token_count", None) or 0
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"]           += 1
+            stats["explicit_calls"]  += explicit
+            stats["input_tokens"]    += prompt
+            stats["cached_tokens"]   += cached
+            stats["uncached_tokens"] += prompt - cached
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    **{k: stats[k] for k in ("calls", "explicit_calls", "caches_created",
+                                             "input_tokens", "cached_tokens", "uncached_tokens")},
+                    "prefix_tokens_est": len(self._templates[name].prefix) // 4,
+                    "cached_ratio":      round(stats["cached_tokens"] / stats["input_tokens"], 3) if stats["input_tokens"] else 0.0,
+                }
+                for name, stats in self._stats.items()
+            }
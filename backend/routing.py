@@ -0,0 +1,123 @@
+"""
+Task-based model routing: each LLM call site (route) has a model tier and a
+latency SLO.
+
+Tiers are ordered from most capable to fastest. A route normally uses its own
+tier. When the p90 of its recent calls misses the SLO, it steps down to the next
+faster tier, and it keeps stepping down while the SLO is still missed there.
+After `cooldown` seconds it goes back to its own tier and measures again.
+
+A failed or timed-out call counts as an SLO miss, entered in the window at twice
+the SLO. Stalls and timeouts are exactly what should push a route to a faster
+tier. A call cut short by the request's own time budget (DeadlineExceeded) says
+nothing about the model, so it is only counted as a cutoff: a client sending a
+tiny `timeout` must not degrade the route for everyone. Every other call's latency
+is recorded per (route, model). `stats()` reports counts, p50/p90, errors, SLO
+misses and cutoffs, which is the data for tuning the table.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from deadlines import DeadlineExceeded
+
+
+class ModelRouter:
+    """Route → (tier, SLO) table with automatic degradation to faster tiers."""
+
+    def __init__(self, tiers: dict[str, str], routes: dict[str, tuple[str, float]],
+                 window: int = 20, min_samples: int = 5, cooldown: float = 300.0):
+        self.tiers       = tiers                      # tier → model, most capable first
+        self.order       = list(tiers)
+        self.routes      = routes                     # route → (tier, slo seconds)
+        self.window      = window
+        self.min_samples = min_samples
+        self.cooldown    = cooldown
+        self._recent:   dict[str, deque]          = {}   # route → latencies at its current tier
+        self._degraded: dict[str, tuple[int, float]] = {}   # route → (tiers stepped down, since)
+        self._history:  dict[tuple[str, str], deque] = {}
+        self._counts:   dict[tuple[str, str], dict]  = {}
+        self._lock      = threading.Lock()
+
+    def _tier_index(self, route: str) -> int:
+        tier, _ = self.routes[route]
+        steps, since = self._degraded.get(route, (0, 0.0))
+        if steps and time.monotonic() - since > self.cooldown:   # probe the configured tier again
+            del self._degraded[route]
+            self._recent.pop(route, None)
+            steps = 0
+        return min(self.order.index(tier) + steps, len(self.order) - 1)
+
+    def configured(self, route: str) -> str:
+        """The route's own model, ignoring any degradation."""
+        return self.tiers[self.routes[route][0]]
+
+    def model(self, route: str) -> str:
+        with self._lock:
+            return self.tiers[self.order[self._tier_index(route)]]
+
+    def record(self, route: str, model: str, seconds: float, ok: bool = True) -> None:
+        _, slo = self.routes[route]
+        with self._lock:
+            key    = (route, model)
+            counts = self._counts.setdefault(key, {"calls": 0, "errors": 0, "slo_misses": 0, "cutoffs": 0})
+            counts["calls"]      += 1
+            counts["errors"]     += not ok
+            counts["slo_misses"] += not ok or seconds > slo
+            self._history.setdefault(key, deque(maxlen=500)).append(seconds)
+            if model != self.tiers[self.order[self._tier_index(route)]]:
+                return
+            recent = self._recent.setdefault(route, deque(maxlen=self.window))
+            recent.append(seconds if ok else max(seconds, 2 * slo))
+            index = self._tier_index(route)
+            if (len(recent) >= self.min_samples and np.percentile(recent, 90) > slo
+                    and index < len(self.order) - 1):
+                steps, _ = self._degraded.get(route, (0, 0.0))
+                self._degraded[route] = (steps + 1, time.monotonic())
+                recent.clear()
+
+    def record_cutoff(self, route: str, model: str) -> None:
+        """A call abandoned because the request's time budget ran out; not a latency sample."""
+        with self._lock:
+            counts = self._counts.setdefault((route, model), {"calls": 0, "errors": 0, "slo_misses": 0, "cutoffs": 0})
+            counts["cutoffs"] += 1
+
+    @contextmanager
+    def route(self, route: str):
+        """`with router.route("name") as model:` — picks the model and records the call's latency."""
+        model = self.model(route)
+        start = time.perf_counter()
+        try:
+            yield model
+        except DeadlineExceeded:
+            self.record_cutoff(route, model)
+            raise
+        except BaseException:
+            self.record(route, model, time.perf_counter() - start, ok=False)
+            raise
+        self.record(route, model, time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for route, (tier, slo) in self.routes.items():
+                models = {}
+                for (r, model), counts in self._counts.items():
+                    if r == route:
+                        samples = self._history.get((r, model)) or [0.0]   # cutoffs only: no latency yet
+                        models[model] = {
+                            **counts,
+                            "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 1),
+                            "p90_ms": round(float(np.percentile(samples, 90)) * 1000, 1),
+                        }
+                out[route] = {
+                    "tier":     tier,
+                    "slo_ms":   round(slo * 1000),
+                    "current":  self.tiers[self.order[self._tier_index(route)]],
+                    "degraded": self._degraded.get(route, (0, 0.0))[0],
+                    "models":   models,
+                }
+            return out
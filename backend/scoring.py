@@ -0,0 +1,102 @@
+"""
+Resume text cleanup and keyword scoring: no LLM calls, API keys or app state.
+
+api.py builds its profiles and scores from these; bulk_score's worker processes
+import this module alone instead of the whole app.
+"""
+import io
+import re
+from typing import Iterable
+
+from lexical import tokenize
+from phrase_matcher import PhraseMatcher
+
+STOPWORDS = {
+    "a","an","the","and","or","but","in","on","at","to","for","of","with",
+    "is","are","was","were","be","been","have","has","had","do","does","did",
+    "will","would","could","should","may","might","must","shall","can","need",
+    "that","this","these","those","it","its","we","you","your","our","their",
+    "from","by","as","if","so","not","no","nor","yet","both","either","about",
+    "above","after","before","between","into","through","during","including",
+    "without","within","along","following","across","behind","beyond","plus",
+    "except","up","out","around","down","off","over","under","again","further",
+    "then","once","more","also","just","than","other","such","any","all","each",
+    "how","what","when","where","who","which","while","per","etc","ie","eg",
+}
+
+
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    """Extract all text from a PDF file."""
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(file_bytes))
+    return "".join(page.extract_text() or "" for page in reader.pages).strip()
+
+
+RESUME_MAX_CHARS = 15000
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_URL_RE   = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S*", re.I)
+# Digit groups joined by single separators ("+1 (555) 123-4567", "98765 43210"); a
+# spaced dash ("2018 - 2020") never joins groups, so date ranges aren't one match.
+_PHONE_RE = re.compile(r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,5}\)[\s.-]?)?\d+(?:[\s.-]\d+)*")
+_YEAR_RE  = re.compile(r"(?:19|20)\d\d")
+
+SKILL_ALIASES = {
+    "js": "javascript", "ts": "typescript", "py": "python", "golang": "go",
+    "k8s": "kubernetes", "postgres": "postgresql", "psql": "postgresql", "mongo": "mongodb",
+    "node": "node.js", "nodejs": "node.js", "react.js": "react", "reactjs": "react",
+    "nextjs": "next.js", "vue.js": "vue", "vuejs": "vue", "ml": "machine learning",
+    "dl": "deep learning", "amazon web services": "aws", "google cloud": "gcp",
+    "google cloud platform": "gcp", "microsoft azure": "azure", "ci cd": "ci/cd", "cicd": "ci/cd",
+    "scikit learn": "scikit-learn", "sklearn": "scikit-learn", "tf": "tensorflow",
+    "restful api": "rest api", "rest apis": "rest api", "restful apis": "rest api",
+}
+
+
+def canonical_skill(skill: str) -> str:
+    """Lower-case, collapse whitespace and map common aliases (k8s → kubernetes)."""
+    name = " ".join(skill.lower().strip().strip(".,;").split())
+    return SKILL_ALIASES.get(name, name)
+
+
+def strip_contact_info(text: str) -> str:
+    """Remove emails, URLs and phone numbers; drop lines left with only separators."""
+    def _phone(m: re.Match) -> str:
+        groups = re.findall(r"\d+", m.group())
+        if sum(map(len, groups)) < 10 or (not m.group().startswith("+") and all(_YEAR_RE.fullmatch(g) for g in groups)):
+            return m.group()   # too short for a phone, or only years ("2018 2019 2020")
+        return ""
+
+    text  = _PHONE_RE.sub(_phone, _URL_RE.sub("", _EMAIL_RE.sub("", text)))
+    lines = [line for line in text.splitlines() if line.strip(" |•·,;-\t")]
+    return "\n".join(lines)
+
+
+def extract_keywords(text: str) -> set[str]:
+    """Distinct lower-cased words worth matching: >2 chars, not stopwords, not numbers (node.js, c++ stay whole)."""
+    return {w for w in set(tokenize(text, STOPWORDS)) if len(w) > 2 and not w.isdigit()}
+
+
+# canonical skill → the aliases that also count as it in a resume (kubernetes ← k8s)
+_SKILL_VARIANTS = {
+    skill: [alias for alias, target in SKILL_ALIASES.items() if target == skill]
+    for skill in set(SKILL_ALIASES.values())
+}
+
+
+def keyword_matcher(keywords: Iterable[str], skills: Iterable[str] = ()) -> PhraseMatcher:
+    """Compile a JD's keywords and skill phrases (with their aliases) into one matcher."""
+    terms = {*keywords, *skills}
+    return PhraseMatcher({term: _SKILL_VARIANTS.get(term, ()) for term in terms})
+
+
+def ats_keyword_score(resume_text: str, jd_text: str, matcher: PhraseMatcher | None = None) -> tuple[float, float]:
+    """Keyword-based ATS score + keyword density. Pass the JD's compiled `matcher` to skip recompiling."""
+    matcher = keyword_matcher(extract_keywords(jd_text)) if matcher is None else matcher
+    if not len(matcher):
+        return 0.0, 0.0
+    resume_count     = matcher.count(resume_text)
+    stuffing_penalty = sum(n - 10 for n in resume_count.values() if n > 10)
+    kw_density       = len(resume_count) / len(matcher)
+    final            = max(0.0, kw_density - stuffing_penalty * 0.001)
+    return round(final * 100, 2), round(kw_density * 100, 2)
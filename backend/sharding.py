@@ -0,0 +1,397 @@
+"""
+Partitioned vector search across worker processes.
+
+Document ids hash into a fixed number of partitions; each partition is owned by
+one shard worker, a process holding a `VectorIndex` for the partitions it owns.
+Workers are either spawned locally (one per core) or run as servers on other
+nodes and reached over `multiprocessing.connection`:
+
+    python -m sharding --listen 0.0.0.0:7401 --path /data/shard-a    # on each node
+    INDEX_SHARDS=10.0.0.5:7401,10.0.0.6:7401 uvicorn api:app          # coordinator
+    INDEX_SHARDS=4 uvicorn api:app                                    # 4 local shard processes
+
+`ShardedIndex` has the same interface as `VectorIndex`. Searches are sent to every
+worker concurrently and the per-shard top-k lists are merged. Rebalancing moves
+whole partitions (copy, switch owner, delete) from the fullest worker to the
+emptiest; in local mode a new worker is spawned once shards outgrow `max_docs`.
+The worker list and partition map are saved with the shards (`layout.json`), and
+reopening restores workers added at runtime.
+
+Local shard workers are children of the process that opened them, and their
+directory is locked for its lifetime: only one API process can own local shards.
+To serve several uvicorn workers, run shard servers and point every worker at them.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+
+try:
+    import fcntl
+except ImportError:   # Windows: no advisory locks, a single API process is assumed
+    fcntl = None
+
+from store import atomic_write
+from vector_index import VectorIndex
+
+PARTITIONS = 64
+
+
+def partition_of(doc_id: str, partitions: int = PARTITIONS) -> int:
+    return int.from_bytes(hashlib.blake2b(doc_id.encode(), digest_size=8).digest(), "big") % partitions
+
+
+def read_layout(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def lock_directory(directory: str):
+    """Exclusive lock on `directory`, held while the returned file stays open."""
+    f = open(os.path.join(directory, "lock"), "a+")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.seek(0)
+        holder = f.read().strip() or "?"
+        f.close()
+        raise RuntimeError(f"local shards in {directory} are owned by process {holder}; run a single API "
+                           "process with INDEX_SHARDS=<count>, or shard servers (python -m sharding) "
+                           "shared by every worker") from None
+    f.truncate(0)
+    f.write(str(os.getpid()))
+    f.flush()
+    return f
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+class ShardWorker:
+    """Command handlers around one VectorIndex; `path` is where it is saved."""
+
+    def __init__(self, path: str, dim: int, head_dim: int = 64):
+        self.path  = path
+        self.index = VectorIndex.load(path, dim, head_dim)
+
+    def add(self, doc_id, vectors, metadata):
+        self.index.add(doc_id, vectors, metadata)
+
+    def add_many(self, docs):
+        for doc_id, vectors, metadata in docs:
+            self.index.add(doc_id, vectors, metadata)
+
+    def delete(self, doc_id):
+        return self.index.delete(doc_id)
+
+    def delete_many(self, doc_ids):
+        for doc_id in doc_ids:
+            self.index.delete(doc_id)
+
+    def search(self, queries, k, filters, candidates, coarse_query):
+        return self.index.search(queries, k, filters, candidates, coarse_query)
+
+    def ids(self):
+        return self.index.ids()
+
+    def as_of(self, value=None):
+        if value is not None:
+            self.index.as_of = value
+        return self.index.as_of
+
+    def export(self, partitions, wanted):
+        """Every document in the `wanted` partitions as (id, vectors, metadata)."""
+        wanted = set(wanted)
+        return [(doc_id, *self.index.get(doc_id)) for doc_id in self.index.ids()
+                if partition_of(doc_id, partitions) in wanted]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.index.save(self.path)
+
+    def serve(self, conn: Connection) -> None:
+        """Answer (op, args) requests with ("ok", result) / ("error", message) until EOF."""
+        while True:
+            try:
+                op, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            if op == "close":
+                conn.send(("ok", None))
+                return
+            try:
+                conn.send(("ok", getattr(self, op)(*args)))
+            except Exception as e:   # report to the coordinator instead of killing the shard
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _run_local(conn: Connection, path: str, dim: int, head_dim: int) -> None:
+    ShardWorker(path, dim, head_dim).serve(conn)
+
+
+# ── Coordinator side ──────────────────────────────────────────────────────────
+
+class ShardClient:
+    """One connection to a shard worker; calls are serialised per connection."""
+
+    def __init__(self, conn: Connection, name: str, process=None):
+        self.name     = name
+        self._conn    = conn
+        self._process = process
+        self._lock    = threading.Lock()
+
+    @classmethod
+    def spawn(cls, path: str, dim: int, head_dim: int = 64) -> "ShardClient":
+        ctx = multiprocessing.get_context("spawn")   # never fork a process that runs threads
+        parent, child = ctx.Pipe()
+        process = ctx.Process(target=_run_local, args=(child, path, dim, head_dim), daemon=True)
+        process.start()
+        child.close()
+        return cls(parent, path, process)
+
+    @classmethod
+    def connect(cls, address: str, authkey: bytes) -> "ShardClient":
+        host, port = address.rsplit(":", 1)
+        return cls(Client((host, int(port)), authkey=authkey), address)
+
+    def call(self, op: str, *args):
+        with self._lock:
+            self._conn.send((op, args))
+            status, result = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"shard {self.name}: {result}")
+        return result
+
+    def close(self) -> None:
+        try:
+            self.call("close")
+        except (OSError, EOFError, RuntimeError):
+            pass
+        self._conn.close()
+        if self._process is not None:
+            self._process.join(timeout=5)
+
+
+class ShardedIndex:
+    """Scatter-gather over shard workers, each owning a set of hash partitions."""
+
+    def __init__(self, clients: list[ShardClient], layout_path: str, partitions: int = PARTITIONS,
+                 spawn=None, max_docs: int = 0, dir_lock=None):
+        self.clients     = clients
+        self.partitions  = partitions
+        self.layout_path = layout_path
+        self.max_docs    = max_docs
+        self._spawn      = spawn
+        self._dir_lock   = dir_lock
+        self._pool       = ThreadPoolExecutor(max_workers=max(4, 2 * len(clients)))
+        self._lock       = threading.RLock()
+        self._counts     = [0] * partitions
+        self._ids: set[str] = set()
+        self.owner       = self._load_layout()
+        self._refresh()
+
+    @classmethod
+    def open(cls, spec: str, directory: str, dim: int, head_dim: int = 64,
+             authkey: bytes = b"", max_docs: int = 0) -> "ShardedIndex":
+        """
+        `spec` is a worker count ("4", spawned locally) or comma-separated host:port servers.
+        Local workers added at runtime (see `max_docs`) are in the saved layout and are
+        spawned again, so a count below the saved one doesn't drop their partitions.
+        """
+        os.makedirs(directory, exist_ok=True)
+        layout = os.path.join(directory, "layout.json")
+        if spec.isdigit():
+            def local(i: int) -> str:
+                return os.path.join(directory, f"shard-{i}")
+
+            def spawn(i: int) -> ShardClient:
+                return ShardClient.spawn(local(i), dim, head_dim)
+
+            dir_lock = lock_directory(directory)
+            saved    = (read_layout(layout) or {}).get("workers", [])
+            count    = int(spec)
+            if saved == [local(i) for i in range(len(saved))]:
+                count = max(count, len(saved))
+            return cls([spawn(i) for i in range(count)], layout, spawn=spawn, max_docs=max_docs, dir_lock=dir_lock)
+        clients = [ShardClient.connect(address.strip(), authkey) for address in spec.split(",") if address.strip()]
+        return cls(clients, layout)
+
+    # ── Layout ────────────────────────────────────────────────────────────────
+
+    def _load_layout(self) -> list[int]:
+        """Partition -> worker. A saved layout is only reused for the same workers."""
+        saved = read_layout(self.layout_path) or {}
+        if saved.get("workers") == [c.name for c in self.clients] and saved.get("partitions") == self.partitions:
+            return saved["owner"]
+        return [p % len(self.clients) for p in range(self.partitions)]
+
+    def _save_layout(self) -> None:
+        """Only saved alongside the workers' own files (`save`), so the two always match on disk."""
+        with atomic_write(self.layout_path) as f:
+            json.dump({"workers": [c.name for c in self.clients], "partitions": self.partitions,
+                       "owner": self.owner}, f)
+
+    def _refresh(self) -> None:
+        """Rebuild id set and partition counts from the workers, dropping strays (e.g. after a layout reset)."""
+        with self._lock:
+            self._ids.clear()
+            self._counts = [0] * self.partitions
+            for w, ids in enumerate(self._scatter("ids")):
+                strays = [i for i in ids if self.owner[partition_of(i, self.partitions)] != w]
+                if strays:
+                    self.clients[w].call("delete_many", strays)
+                for doc_id in set(ids) - set(strays):
+                    self._ids.add(doc_id)
+                    self._counts[partition_of(doc_id, self.partitions)] += 1
+
+    def _scatter(self, op: str, *args) -> list:
+        return list(self._pool.map(lambda c: c.call(op, *args), self.clients))
+
+    def loads(self) -> list[int]:
+        loads = [0] * len(self.clients)
+        for p, w in enumerate(self.owner):
+            loads[w] += self._counts[p]
+        return loads
+
+    # ── VectorIndex interface ─────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._ids
+
+    def ids(self) -> set[str]:
+        return set(self._ids)
+
+    @property
+    def as_of(self) -> int:
+        """The oldest worker's `as_of`: every shard is current as of then."""
+        return min(self._scatter("as_of"), default=0)
+
+    @as_of.setter
+    def as_of(self, value: int) -> None:
+        self._scatter("as_of", value)
+
+    def add(self, doc_id: str, vectors, metadata: dict | None = None) -> None:
+        p = partition_of(doc_id, self.partitions)
+        with self._lock:
+            self.clients[self.owner[p]].call("add", doc_id, vectors, metadata)
+            if doc_id not in self._ids:
+                self._ids.add(doc_id)
+                self._counts[p] += 1
+            if self._spawn and self.max_docs and max(self.loads()) > self.max_docs:
+                self.add_worker(self._spawn(len(self.clients)))
+
+    def delete(self, doc_id: str) -> bool:
+        p = partition_of(doc_id, self.partitions)
+        with self._lock:
+            if doc_id not in self._ids:
+                return False
+            self.clients[self.owner[p]].call("delete", doc_id)
+            self._ids.discard(doc_id)
+            self._counts[p] -= 1
+            return True
+
+    def search(self, queries, k: int = 10, filters: dict | None = None,
+               candidates: int | None = 1000, coarse_query=None) -> list[dict]:
+        """Every shard returns its own top-k; merge by score (a doc mid-move may appear twice)."""
+        merged: dict[str, dict] = {}
+        for hits in self._scatter("search", queries, k, filters, candidates, coarse_query):
+            for hit in hits:
+                if hit["id"] not in merged or hit["score"] > merged[hit["id"]]["score"]:
+                    merged[hit["id"]] = hit
+        return heapq.nlargest(k, merged.values(), key=lambda h: h["score"])
+
+    def save(self, path: str | None = None) -> None:
+        """Each worker saves its own files; `path` is accepted for VectorIndex compatibility."""
+        with self._lock:
+            self._scatter("save")
+            self._save_layout()
+
+    def close(self) -> None:
+        for client in self.clients:
+            client.close()
+        self._pool.shutdown(wait=False)
+        if self._dir_lock is not None:
+            self._dir_lock.close()
+
+    # ── Rebalancing ───────────────────────────────────────────────────────────
+
+    def move_partition(self, p: int, dst: int) -> int:
+        """Copy partition `p` to worker `dst`, switch ownership, then delete it from the old owner."""
+        with self._lock:
+            src = self.owner[p]
+            if src == dst:
+                return 0
+            docs = self.clients[src].call("export", self.partitions, [p])
+            self.clients[dst].call("add_many", docs)
+            self.owner[p] = dst
+            self.clients[src].call("delete_many", [doc_id for doc_id, _, _ in docs])
+            return len(docs)
+
+    def rebalance(self, tolerance: float = 0.1) -> list[tuple[int, int, int]]:
+        """
+        Move partitions from the fullest worker to the emptiest while that narrows
+        the gap; stops once loads are within `tolerance` of each other.
+        Returns the moves as (partition, from, to).
+        """
+        moves = []
+        with self._lock:
+            while True:
+                loads    = self.loads()
+                src, dst = loads.index(max(loads)), loads.index(min(loads))
+                gap      = loads[src] - loads[dst]
+                if gap <= max(1, tolerance * loads[src]):
+                    break
+                owned = [p for p, w in enumerate(self.owner) if w == src and 0 < self._counts[p] < gap]
+                if not owned:
+                    break
+                p = max(owned, key=lambda q: self._counts[q])
+                self.move_partition(p, dst)
+                moves.append((p, src, dst))
+        return moves
+
+    def add_worker(self, client: ShardClient) -> list[tuple[int, int, int]]:
+        """Join a new (empty) worker and move partitions onto it."""
+        with self._lock:
+            client.call("as_of", self.as_of)   # it only receives documents the others already hold
+            self.clients.append(client)
+            self._pool.shutdown(wait=False)
+            self._pool = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.clients)))
+            return self.rebalance()
+
+    def stats(self) -> dict:
+        return {"workers": [c.name for c in self.clients], "docs": len(self._ids), "loads": self.loads()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a shard worker for ShardedIndex")
+    parser.add_argument("--listen", required=True, help="host:port")
+    parser.add_argument("--path", required=True, help="Where this shard saves its index")
+    parser.add_argument("--dim", type=int, default=int(os.getenv("INDEX_DIM", "256")))
+    args = parser.parse_args()
+
+    authkey = os.getenv("INDEX_SHARD_AUTHKEY", "").encode()
+    if not authkey:
+        parser.error("set INDEX_SHARD_AUTHKEY (shared with the coordinator)")
+    host, port = args.listen.rsplit(":", 1)
+    worker     = ShardWorker(args.path, args.dim)
+    with Listener((host, int(port)), authkey=authkey) as listener:
+        print(f"shard {args.path} listening on {args.listen} ({len(worker.index)} docs)", flush=True)
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=worker.serve, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+from caching import LRUCache
+
+# Registries persist here so every worker on the box sees the same ids.
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def doc_path(directory: str, doc_id: str, ext: str) -> str:
+    """File for a document id; ids are restricted so they can't escape the directory."""
+    if not _ID_RE.match(doc_id):
+        raise KeyError(doc_id)
+    return os.path.join(directory, f"{doc_id}{ext}")
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w"):
+    """Write `path` through a uniquely named temp file beside it, renamed into place on success."""
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"   # unique per writer: threads of one process may write the same path
+    try:
+        with open(tmp, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def current_snapshot(path: str) -> str | None:
+    """Directory of the current version of the snapshot at `path` (see new_snapshot), if any."""
+    try:
+        with open(f"{path}.current") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    directory = os.path.join(os.path.dirname(path), name)
+    return directory if name and os.path.isdir(directory) else None
+
+
+@contextmanager
+def new_snapshot(path: str, keep_seconds: float = 300.0):
+    """
+    Fresh directory for a new version of the multi-file snapshot at `path`. When the
+    block succeeds, `<path>.current` is atomically pointed at it, so readers see one
+    version whole even when several processes save at once (the last to finish wins).
+    Older versions other than the one just replaced are removed once they are
+    `keep_seconds` old (a younger one may still be being written by another process).
+    """
+    directory = f"{path}.v{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(directory)
+    try:
+        yield directory
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    previous = current_snapshot(path)
+    with atomic_write(f"{path}.current") as f:
+        f.write(os.path.basename(directory))
+    parent, prefix = os.path.dirname(path), f"{os.path.basename(path)}.v"
+    for name in os.listdir(parent or "."):
+        old = os.path.join(parent, name)
+        if (name.startswith(prefix) and old not in (directory, previous) and os.path.isdir(old)
+                and time.time() - os.path.getmtime(old) > keep_seconds):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+class JsonStore:
+    """A directory of JSON documents keyed by id, with an in-process LRU in front."""
+
+    def __init__(self, name: str, cache_size: int = 512):
+        self.path   = os.path.join(DATA_DIR, name)
+        self._cache = LRUCache(maxsize=cache_size)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, doc_id: str) -> str:
+        return doc_path(self.path, doc_id, ".json")
+
+    def get(self, doc_id: str, fresh: bool = False) -> dict | None:
+        """The document; `fresh` re-reads it from disk (another process may have replaced it)."""
+        doc = None if fresh else self._cache.get(doc_id)
+        if doc is not None:
+            return doc
+        try:
+            with open(self._file(doc_id)) as f:
+                doc = json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+        self._cache.set(doc_id, doc)
+        return doc
+
+    def put(self, doc_id: str, doc: dict) -> None:
+        with atomic_write(self._file(doc_id)) as f:
+            json.dump(doc, f)
+        self._cache.set(doc_id, doc)
+
+    def delete(self, doc_id: str) -> bool:
+        self._cache.pop(doc_id)
+        try:
+            os.remove(self._file(doc_id))
+            return True
+        except (KeyError, FileNotFoundError):
+            return False
+
+    def version(self) -> int:
+        """Directory mtime: changes whenever a document is added, replaced or deleted."""
+        return os.stat(self.path).st_mtime_ns
+
+    def ids(self) -> list[str]:
+        return sorted(name[:-5] for name in os.listdir(self.path) if name.endswith(".json"))
+
+    def changed_since(self, mtime_ns: int) -> list[str]:
+        """Ids of documents written (file mtime) at or after `mtime_ns`."""
+        with os.scandir(self.path) as entries:
+            return [e.name[:-5] for e in entries if e.name.endswith(".json") and e.stat().st_mtime_ns >= mtime_ns]
@@ -0,0 +1,13 @@
+"""
+Tests run from backend/ (`python -m pytest -q`). api.py checks the module API keys
+and creates its stores under DATA_DIR at import, so both point at throwaway values.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="tests_data_"))
+for _key in ("CHATBOT_API_KEY", "MARKET_API_KEY", "RESUME_API_KEY", "INTERVIEW_API_KEY"):
+    os.environ.setdefault(_key, "test")
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from caching import LRUCache, ResultCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_lru_entries_expire_after_ttl():
+    cache = LRUCache(maxsize=4, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+class Computation:
+    """A compute() that blocks until released, counting how often it ran."""
+
+    def __init__(self, result=None):
+        self.calls   = 0
+        self.result  = {"score": 1} if result is None else result
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return self.result
+
+
+def test_concurrent_duplicates_share_one_computation():
+    async def run():
+        cache, compute = ResultCache(), Computation()
+        first  = asyncio.create_task(cache.get_or_compute("k", compute))
+        await compute.started.wait()
+        second = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        compute.release.set()
+        results = await asyncio.gather(first, second)
+        third   = await cache.get_or_compute("k", compute)
+        return compute.calls, results, third
+
+    calls, (first, second), third = asyncio.run(run())
+    assert calls == 1
+    assert (first[2], second[2], third[2]) == ("miss", "coalesced", "hit")
+    assert first[:2] == second[:2] == third[:2]
+
+
+def test_waiter_recomputes_when_the_computing_request_is_cancelled():
+    async def run():
+        cache, compute = ResultCache(), Computation()
+        first  = asyncio.create_task(cache.get_or_compute("k", compute))
+        await compute.started.wait()
+        second = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        compute.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        second = await second
+        return compute.calls, second
+
+    calls, (result, _, status) = asyncio.run(run())
+    assert calls == 2
+    assert (result, status) == ({"score": 1}, "miss")
+
+
+def test_failures_and_partial_results_are_not_cached():
+    async def run():
+        cache = ResultCache()
+
+        async def fail():
+            raise ValueError("upstream")
+        with pytest.raises(ValueError):
+            await cache.get_or_compute("k", fail)
+
+        async def partial():
+            return {"partial": True}
+        statuses = [(await cache.get_or_compute("p", partial))[2] for _ in range(2)]
+        return len(cache._results), statuses
+
+    size, statuses = asyncio.run(run())
+    assert size == 0
+    assert statuses == ["miss", "miss"]
+
+
+def test_invalidate_drops_tagged_results():
+    async def run():
+        cache = ResultCache()
+
+        async def compute():
+            return {"score": 1}
+        await cache.get_or_compute("a", compute, tags=("resume:1", "job:1"))
+        await cache.get_or_compute("b", compute, tags=("resume:2", "job:1"))
+        dropped = cache.invalidate("resume:1")
+        return dropped, (await cache.get_or_compute("a", compute))[2], (await cache.get_or_compute("b", compute))[2]
+
+    assert asyncio.run(run()) == (1, "miss", "hit")
+
+
+def test_result_invalidated_while_computing_is_not_cached():
+    async def run():
+        cache, compute = ResultCache(), Computation()
+        task = asyncio.create_task(cache.get_or_compute("k", compute, tags=("resume:1",)))
+        await compute.started.wait()
+        cache.invalidate("resume:1")
+        compute.release.set()
+        first = await task
+        return first[2], (await cache.get_or_compute("k", compute))[2], compute.calls
+
+    assert asyncio.run(run()) == ("miss", "miss", 2)
+
+
+def test_idempotency_key_is_bound_to_its_first_request():
+    cache = ResultCache()
+    assert cache.claim("key-1", "fingerprint-a")
+    assert cache.claim("key-1", "fingerprint-a")
+    assert not cache.claim("key-1", "fingerprint-b")
+    assert cache.claim(None, "fingerprint-b")
@@ -0,0 +1,22 @@
+from scoring import strip_contact_info
+
+
+def test_removes_email_url_and_phone_numbers():
+    text = "Jane Doe\njane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/jane\nSUMMARY"
+    assert strip_contact_info(text) == "Jane Doe\nSUMMARY"
+
+
+def test_removes_common_phone_shapes():
+    for phone in ("555.123.4567", "(555) 123-4567", "+91-98765-43210", "+44 20 7946 0958", "9876543210"):
+        assert strip_contact_info(f"Phone: {phone}") == "Phone: "
+
+
+def test_keeps_dated_experience_lines():
+    lines = [
+        "Software Engineer (2018 - 2020) (2021 - 2023)",
+        "Acme 2015 - 2018 2019",
+        "Globex  Jan 2019 - Dec 2021",
+        "Data Engineer, Initech 2012 2014 2016",
+        "- Served 2000000 requests/day, cutting latency by 40%",
+    ]
+    assert strip_contact_info("\n".join(lines)) == "\n".join(lines)
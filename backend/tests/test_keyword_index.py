@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+
+from keyword_index import KeywordIndex
+
+WORDS = ("python", "java", "docker", "kubernetes", "sql", "react", "aws", "terraform", "spark", "kafka",
+         "go", "rust", "linux", "airflow", "pandas", "django", "flask", "redis", "graphql", "typescript")
+QUERY = "python docker kubernetes sql kafka rust"
+
+
+def random_texts(n: int, seed: int = 0) -> dict[str, str]:
+    rng = random.Random(seed)
+    return {f"doc-{i}": " ".join(rng.choices(WORDS, k=rng.randint(5, 40))) for i in range(n)}
+
+
+def build(texts: dict[str, str]) -> KeywordIndex:
+    index = KeywordIndex()
+    for doc_id, text in texts.items():
+        index.add(doc_id, text)
+    return index
+
+
+def score_map(index: KeywordIndex, query: str = QUERY) -> dict[str, float]:
+    ids, scores = index.scores(query)
+    return {doc_id: round(float(s), 4) for doc_id, s in zip(ids, scores) if doc_id is not None}
+
+
+def test_incremental_updates_match_a_fresh_build():
+    texts = random_texts(400)
+    index = build(texts)
+    rng   = random.Random(1)
+    for doc_id in rng.sample(sorted(texts), 300):   # enough deletes to trigger compaction
+        index.delete(doc_id)
+        del texts[doc_id]
+    for doc_id in rng.sample(sorted(texts), 20):     # replace some in place
+        texts[doc_id] = "python python kafka " + texts[doc_id]
+        index.add(doc_id, texts[doc_id])
+    for i in range(400, 450):
+        texts[f"doc-{i}"] = " ".join(rng.choices(WORDS, k=10))
+        index.add(f"doc-{i}", texts[f"doc-{i}"])
+    assert index.ids() == set(texts)
+    assert score_map(index) == score_map(build(texts))
+
+
+def test_delete_updates_document_frequencies():
+    index  = build({"a": "python sql", "b": "python java"})
+    before = index.score_docs("python java", ["a"])
+    assert index.delete("b")
+    assert not index.delete("b")
+    assert "b" not in index
+    after  = index.score_docs("python java", ["a"])
+    assert after != before
+    assert after == build({"a": "python sql"}).score_docs("python java", ["a"])
+
+
+def test_score_docs_matches_scores_and_ignores_unknown_ids():
+    texts = random_texts(30)
+    index = build(texts)
+    full  = score_map(index)
+    assert index.score_docs(QUERY, ["doc-3", "missing", "doc-7"]) == [
+        round(full["doc-3"], 2), 0.0, round(full["doc-7"], 2)]
+
+
+def test_rare_query_terms_weigh_more():
+    texts = {f"common-{i}": "python sql" for i in range(20)} | {"rare": "python rust"}
+    index = build(texts)
+    assert index.score("rust", "python rust") > index.score("python", "python rust")
+
+
+def test_save_and_load_round_trip(tmp_path):
+    texts = random_texts(100)
+    index = build(texts)
+    index.delete("doc-5")
+    path  = str(tmp_path / "keyword_index")
+    index.save(path)
+
+    loaded = KeywordIndex.load(path)
+    assert loaded.ids() == index.ids()
+    assert score_map(loaded) == score_map(index)
+    np.testing.assert_allclose(loaded.avg_len, index.avg_len)
+
+    loaded.add("doc-new", "kafka rust rust")
+    loaded.delete("doc-6")
+    del texts["doc-5"], texts["doc-6"]
+    texts["doc-new"] = "kafka rust rust"
+    assert score_map(loaded) == score_map(build(texts))
+
+
+def test_load_without_a_snapshot_is_empty(tmp_path):
+    assert len(KeywordIndex.load(str(tmp_path / "keyword_index"))) == 0
@@ -0,0 +1,64 @@
+import pytest
+
+from deadlines import DeadlineExceeded
+from routing import ModelRouter
+
+TIERS = {"pro": "model-pro", "standard": "model-standard", "fast": "model-fast"}
+
+
+def make_router(cooldown: float = 300.0) -> ModelRouter:
+    return ModelRouter(TIERS, {"extract": ("standard", 1.0)}, window=5, min_samples=5, cooldown=cooldown)
+
+
+def test_uses_the_configured_tier_while_within_slo():
+    router = make_router()
+    for _ in range(10):
+        router.record("extract", "model-standard", 0.2)
+    assert router.model("extract") == "model-standard"
+
+
+def test_degrades_to_the_next_faster_tier_when_p90_misses_slo():
+    router = make_router()
+    for _ in range(5):
+        router.record("extract", "model-standard", 2.0)
+    assert router.model("extract") == "model-fast"
+    assert router.stats()["extract"]["degraded"] == 1
+
+
+def test_failed_calls_count_as_slo_misses():
+    router = make_router()
+    for _ in range(5):
+        with pytest.raises(RuntimeError), router.route("extract"):
+            raise RuntimeError("upstream error")
+    assert router.model("extract") == "model-fast"
+    assert router.stats()["extract"]["models"]["model-standard"]["errors"] == 5
+
+
+def test_never_steps_below_the_fastest_tier():
+    router = make_router()
+    for _ in range(5):
+        router.record("extract", "model-standard", 2.0)
+    for _ in range(10):
+        router.record("extract", "model-fast", 2.0)
+    assert router.model("extract") == "model-fast"
+
+
+def test_returns_to_the_configured_tier_after_cooldown(monkeypatch):
+    router = make_router(cooldown=60)
+    now    = [1000.0]
+    monkeypatch.setattr("routing.time.monotonic", lambda: now[0])
+    for _ in range(5):
+        router.record("extract", "model-standard", 2.0)
+    assert router.model("extract") == "model-fast"
+    now[0] += 61
+    assert router.model("extract") == "model-standard"
+
+
+def test_deadline_cutoffs_are_counted_but_never_degrade():
+    router = make_router()
+    for _ in range(10):
+        with pytest.raises(DeadlineExceeded), router.route("extract"):
+            raise DeadlineExceeded()
+    counts = router.stats()["extract"]["models"]["model-standard"]
+    assert router.model("extract") == "model-standard"
+    assert (counts["cutoffs"], counts["calls"], counts["slo_misses"]) == (10, 0, 0)
@@ -0,0 +1,102 @@
+import numpy as np
+
+from vector_index import VectorIndex
+
+DIM = 128
+
+
+def random_docs(n: int, chunks: int = 3, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {f"doc-{i}": rng.standard_normal((chunks, DIM)).astype(np.float32) for i in range(n)}
+
+
+def build(docs: dict[str, np.ndarray]) -> VectorIndex:
+    index = VectorIndex(DIM)
+    for i, (doc_id, vectors) in enumerate(docs.items()):
+        index.add(doc_id, vectors, {"pool": "even" if i % 2 == 0 else "odd"})
+    return index
+
+
+def top_id(index: VectorIndex, query: np.ndarray) -> str | None:
+    hits = index.search(query[None], k=1)
+    return hits[0]["id"] if hits else None
+
+
+def test_search_finds_the_document_a_chunk_came_from():
+    docs  = random_docs(50)
+    index = build(docs)
+    for doc_id in ("doc-0", "doc-17", "doc-49"):
+        assert top_id(index, docs[doc_id][1]) == doc_id
+
+
+def test_metadata_filters_restrict_results():
+    docs  = random_docs(20)
+    index = build(docs)
+    hits  = index.search(docs["doc-1"][0][None], k=20, filters={"pool": "even"})
+    assert hits and all(hit["metadata"]["pool"] == "even" for hit in hits)
+    assert "doc-1" not in {hit["id"] for hit in hits}
+
+
+def test_delete_removes_a_document_from_search():
+    docs  = random_docs(20)
+    index = build(docs)
+    assert index.delete("doc-3")
+    assert not index.delete("doc-3")
+    assert "doc-3" not in index and len(index) == 19
+    assert top_id(index, docs["doc-3"][0]) != "doc-3"
+
+
+def test_add_replaces_an_existing_document():
+    docs  = random_docs(10)
+    index = build(docs)
+    index.add("doc-2", docs["doc-5"], {"pool": "moved"})
+    assert len(index) == 10
+    hits = index.search(docs["doc-5"][0][None], k=2)
+    assert {hit["id"] for hit in hits} == {"doc-2", "doc-5"}
+    assert index.get("doc-2")[1] == {"pool": "moved"}
+
+
+def test_compact_keeps_live_documents():
+    docs  = random_docs(40)
+    index = build(docs)
+    for i in range(0, 40, 2):
+        index.delete(f"doc-{i}")
+    index.compact()
+    assert index.ids() == {f"doc-{i}" for i in range(1, 40, 2)}
+    for doc_id in ("doc-1", "doc-21", "doc-39"):
+        assert top_id(index, docs[doc_id][0]) == doc_id
+
+
+def test_save_and_load_round_trip(tmp_path):
+    docs  = random_docs(30)
+    index = build(docs)
+    index.delete("doc-4")
+    index.as_of = 123
+    path = str(tmp_path / "index")
+    index.save(path)
+
+    loaded = VectorIndex.load(path, DIM)
+    assert loaded.ids() == index.ids()
+    assert loaded.as_of == 123
+    assert loaded.get("doc-7")[1] == {"pool": "odd"}
+    np.testing.assert_allclose(loaded.get("doc-7")[0], index.get("doc-7")[0], atol=1e-6)
+    assert top_id(loaded, docs["doc-7"][2]) == "doc-7"
+
+
+def test_loaded_index_accepts_inserts_and_deletes(tmp_path):
+    docs = random_docs(20)
+    path = str(tmp_path / "index")
+    build(docs).save(path)
+    loaded = VectorIndex.load(path, DIM)
+    extra  = random_docs(1, seed=99)["doc-0"]
+    loaded.add("new", extra)
+    loaded.delete("doc-8")
+    assert top_id(loaded, extra[0]) == "new"
+    assert "doc-8" not in loaded and len(loaded) == 20
+
+
+def test_load_ignores_a_missing_or_mismatched_index(tmp_path):
+    path = str(tmp_path / "index")
+    assert len(VectorIndex.load(path, DIM)) == 0
+    build(random_docs(5)).save(path)
+    assert len(VectorIndex.load(path, DIM * 2)) == 0
@@ -0,0 +1,323 @@
+"""
+Exact (NumPy) vector index over resume chunk embeddings.
+
+Rows are chunk vectors; each document (resume) owns a contiguous run of rows, so
+per-document max-sim is a single `np.maximum.reduceat`. Vectors are truncated to
+`dim` (gemini-embedding-001 is Matryoshka-trained, so a prefix is still a valid
+embedding) and L2-normalised, making a dot product a cosine similarity.
+
+A full scan is memory-bound, so search runs in two stages: the first `head_dim`
+components (stored as their own matrix) give a coarse max-sim for every document,
+and only the best `candidates` documents are re-scored on the full vector.
+Pass `candidates=None` for an exact scan.
+
+The head stays float32 (it feeds BLAS); the tail is only read for the shortlist,
+so it is stored quantized (int8 + per-row scale by default). A saved index is
+memory-mapped on load and shared by every worker; rows added afterwards live in
+an in-memory delta until the next `save`.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+from embedding_store import DTYPES, QuantizedMatrix, open_matrix, quantize, write_matrix
+from store import atomic_write, current_snapshot, new_snapshot
+
+
+def prepare(vectors, dim: int) -> np.ndarray:
+    """Truncate to `dim`, L2-normalise and return a contiguous float32 matrix."""
+    arr   = np.asarray(vectors, dtype=np.float32)
+    arr   = np.atleast_2d(arr)[:, :dim]
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(arr / norms)
+
+
+class VectorIndex:
+    """Chunk-level vectors grouped by document, with inserts, deletes and metadata filters."""
+
+    def __init__(self, dim: int = 256, head_dim: int = 64, tail_dtype: str = "int8"):
+        self.dim        = dim
+        self.head_dim   = min(head_dim, dim)
+        self.tail_dtype = tail_dtype
+        self._base: tuple[QuantizedMatrix, QuantizedMatrix] | None = None
+        self._n_base    = 0
+        self._head      = np.empty((0, self.head_dim), np.float32)
+        self._tail      = np.empty((0, dim - self.head_dim), DTYPES[tail_dtype])
+        self._scale     = np.empty(0, np.float32)
+        self._alive     = np.empty(0, bool)
+        self._rows      = 0
+        self._dead      = 0
+        self._ids:   list[str | None] = []
+        self._starts: list[int]       = []
+        self._lens:   list[int]       = []
+        self._meta:   list[dict]      = []
+        self._slots: dict[str, int]   = {}
+        self._columns: dict[str, tuple]      = {}
+        self._live: np.ndarray | None        = None
+        self._lock = threading.RLock()
+        self.as_of = 0   # time (ns) the caller last brought it up to date with its source; saved with it
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    def ids(self) -> set[str]:
+        return set(self._slots)
+
+    def get(self, doc_id: str) -> tuple[np.ndarray, dict] | None:
+        """(vectors, metadata) as stored: truncated, normalised, tail dequantized."""
+        with self._lock:
+            slot = self._slots.get(doc_id)
+            if slot is None:
+                return None
+            rows = np.arange(self._starts[slot], self._starts[slot] + self._lens[slot])
+            head, tail, scale = self._take(rows)
+            return np.hstack([head, QuantizedMatrix(tail, scale).to_float32()]), self._meta[slot]
+
+    # ── Mutation ──────────────────────────────────────────────────────────────
+
+    def add(self, doc_id: str, vectors, metadata: dict | None = None) -> None:
+        """Insert (or replace) a document's chunk vectors."""
+        vecs = prepare(vectors, self.dim)
+        with self._lock:
+            if doc_id in self._slots:
+                self.delete(doc_id)
+            need = self._rows + len(vecs)
+            if need > len(self._alive):
+                cap = max(need, 2 * len(self._alive), 1024)
+                self._alive = np.resize(self._alive, cap)
+            if need - self._n_base > len(self._head):
+                cap = max(need - self._n_base, 2 * len(self._head), 1024)
+                self._head  = np.resize(self._head, (cap, self.head_dim))
+                self._tail  = np.resize(self._tail, (cap, self.dim - self.head_dim))
+                self._scale = np.resize(self._scale, cap)
+            lo, hi = self._rows - self._n_base, need - self._n_base
+            self._head[lo:hi] = vecs[:, :self.head_dim]
+            self._tail[lo:hi], self._scale[lo:hi] = quantize(vecs[:, self.head_dim:], self.tail_dtype)
+            self._alive[self._rows:need] = True
+            self._slots[doc_id] = len(self._ids)
+            self._ids.append(doc_id)
+            self._starts.append(self._rows)
+            self._lens.append(len(vecs))
+            self._meta.append(metadata or {})
+            self._rows = need
+            self._invalidate()
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                return False
+            start, n = self._starts[slot], self._lens[slot]
+            self._alive[start:start + n] = False
+            self._ids[slot] = None
+            self._dead += n
+            self._invalidate()
+            if self._dead > 1024 and self._dead > self._rows // 4:
+                self.compact()
+            return True
+
+    def compact(self) -> None:
+        """Drop deleted rows and slots, folding the mapped base into memory."""
+        with self._lock:
+            keep = [s for s, doc_id in enumerate(self._ids) if doc_id is not None]
+            rows = np.concatenate([np.arange(self._starts[s], self._starts[s] + self._lens[s]) for s in keep]) \
+                if keep else np.empty(0, np.int64)
+            self._head, self._tail, self._scale = self._take(rows)
+            self._base   = None
+            self._n_base = 0
+            self._alive  = np.ones(len(rows), bool)
+            self._rows   = len(rows)
+            self._dead   = 0
+            ids, lens, meta = [self._ids[s] for s in keep], [self._lens[s] for s in keep], [self._meta[s] for s in keep]
+            self._ids, self._lens, self._meta = ids, lens, meta
+            self._starts = np.concatenate([[0], np.cumsum(lens)[:-1]]).astype(int).tolist() if lens else []
+            self._slots  = {doc_id: s for s, doc_id in enumerate(ids)}
+            self._invalidate()
+
+    def _take(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(head, tail codes, tail scales) for global row numbers, from base or delta."""
+        head  = np.empty((len(rows), self.head_dim), np.float32)
+        tail  = np.empty((len(rows), self.dim - self.head_dim), self._tail.dtype)
+        scale = np.empty(len(rows), np.float32)
+        in_base = rows < self._n_base
+        if self._base is not None and in_base.any():
+            base_head, base_tail = self._base
+            r = rows[in_base]
+            head[in_base], tail[in_base], scale[in_base] = base_head.codes[r], base_tail.codes[r], base_tail.scales[r]
+        r = rows[~in_base] - self._n_base
+        head[~in_base], tail[~in_base], scale[~in_base] = self._head[r], self._tail[r], self._scale[r]
+        return head, tail, scale
+
+    def _head_sims(self, q: np.ndarray) -> np.ndarray:
+        delta = self._head[:self._rows - self._n_base] @ q
+        if self._base is None:
+            return delta
+        return np.concatenate([self._base[0].codes @ q, delta])
+
+    def _invalidate(self) -> None:
+        self._columns.clear()
+        self._live = None
+
+    # ── Search ────────────────────────────────────────────────────────────────
+
+    def _column(self, key: str) -> tuple[np.ndarray, dict[str, int]]:
+        """Metadata field as integer codes per slot (built once per key, dropped on mutation)."""
+        col = self._columns.get(key)
+        if col is None:
+            vocab: dict[str, int] = {}
+            codes = np.array([vocab.setdefault(json.dumps(m.get(key), sort_keys=True), len(vocab))
+                              for m in self._meta], np.int32)
+            col = self._columns[key] = (codes, vocab)
+        return col
+
+    def _filter_mask(self, slots: np.ndarray, filters: dict) -> np.ndarray:
+        """Boolean mask over `slots`; filter values may be scalars or lists (any-of)."""
+        mask = np.ones(len(slots), bool)
+        for key, wanted in filters.items():
+            codes, vocab = self._column(key)
+            values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            dumped = (json.dumps(v, sort_keys=True) for v in values)
+            mask  &= np.isin(codes[slots], [vocab[d] for d in dumped if d in vocab])
+        return mask
+
+    def _live_slots(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(slot, start row, row count) of every non-empty live document, by start row."""
+        if self._live is None:
+            slots      = np.array([s for s, doc_id in enumerate(self._ids) if doc_id is not None and self._lens[s]], int)
+            self._live = np.stack([slots, np.asarray(self._starts, int)[slots], np.asarray(self._lens, int)[slots]]) \
+                if len(slots) else np.empty((3, 0), int)
+        return self._live[0], self._live[1], self._live[2]
+
+    def search(self, queries, k: int = 10, filters: dict | None = None,
+               candidates: int | None = 1000, coarse_query=None) -> list[dict]:
+        """
+        Score documents against one or more query vectors: for each query take the
+        document's best-matching chunk (max-sim), then average over queries.
+        The shortlist is picked with a single vector — `coarse_query` (e.g. the
+        whole-JD embedding) or the mean of `queries` — so stage 1 stays one pass.
+        Returns the top-k as {id, score, metadata, evidence:[{chunk, query, similarity}]}.
+        """
+        q = prepare(queries, self.dim)
+        qh, qt = q[:, :self.head_dim].T, q[:, self.head_dim:].T
+        if candidates is None:
+            coarse_q = qh
+        elif coarse_query is not None:
+            coarse_q = prepare(coarse_query, self.dim)[:, :self.head_dim].T
+        else:
+            coarse_q = qh.mean(axis=1, keepdims=True)
+        with self._lock:
+            slots, starts, lens = self._live_slots()
+            if not len(slots):
+                return []
+
+            # Stage 1: coarse max-sim on the head components of every chunk.
+            head_sims = self._head_sims(coarse_q)
+            if self._dead:
+                head_sims[~self._alive[:self._rows]] = -np.inf
+            coarse = np.maximum.reduceat(head_sims[starts[0]:], starts - starts[0], axis=0).mean(axis=1)
+            if filters:
+                coarse = np.where(self._filter_mask(slots, filters), coarse, -np.inf)
+            eligible = int(np.isfinite(coarse).sum())
+            if not eligible:
+                return []
+
+            # Stage 2: full-vector max-sim for the shortlist.
+            n_short = eligible if candidates is None else min(eligible, max(candidates, k))
+            short   = np.argpartition(-coarse, n_short - 1)[:n_short] if n_short < len(coarse) else np.arange(len(coarse))
+            short   = short[np.isfinite(coarse[short])]
+            s_lens  = lens[short]
+            offsets = np.concatenate([[0], np.cumsum(s_lens)[:-1]])
+            rows    = np.repeat(starts[short] - offsets, s_lens) + np.arange(s_lens.sum())
+            head, tail, scale = self._take(rows)
+            sims    = head @ qh + QuantizedMatrix(tail, scale).to_float32() @ qt
+            scores  = np.maximum.reduceat(sims, offsets, axis=0).mean(axis=1)
+
+            k   = min(k, len(short))
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                slot  = slots[short[i]]
+                block = sims[offsets[i]:offsets[i] + s_lens[i]]
+                best  = block.argmax(axis=0)
+                evidence = sorted(
+                    ({"chunk": int(c), "query": j, "similarity": round(float(block[c, j]), 4)}
+                     for j, c in enumerate(best)),
+                    key=lambda e: -e["similarity"],
+                )
+                results.append({
+                    "id": self._ids[slot], "score": round(float(scores[i]), 4),
+                    "metadata": self._meta[slot], "evidence": evidence,
+                })
+            return results
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        """
+        Write `head.emb`, `tail.emb` and `index.json` (compacting first) as a new
+        snapshot version of `path`, then serve the rows from the mapped files. Workers
+        sharing a path each write a whole version; the pointer swap picks one of them.
+        """
+        with self._lock:
+            self.compact()
+            with new_snapshot(path) as directory:
+                write_matrix(os.path.join(directory, "head.emb"),
+                             QuantizedMatrix(self._head[:self._rows], np.ones(self._rows, np.float32)))
+                write_matrix(os.path.join(directory, "tail.emb"),
+                             QuantizedMatrix(self._tail[:self._rows], self._scale[:self._rows]))
+                with atomic_write(os.path.join(directory, "index.json")) as f:
+                    json.dump({"dim": self.dim, "head_dim": self.head_dim, "rows": self._rows,
+                               "ids": self._ids, "lens": self._lens, "meta": self._meta, "as_of": self.as_of}, f)
+            self._map(directory)
+
+    def _map(self, directory: str) -> bool:
+        head = open_matrix(os.path.join(directory, "head.emb"))
+        tail = open_matrix(os.path.join(directory, "tail.emb"))
+        if head is None or tail is None or len(head) != self._rows or len(tail) != self._rows:
+            return False
+        self._base   = (head, tail)
+        self._n_base = self._rows
+        self._head   = np.empty((0, self.head_dim), np.float32)
+        self._tail   = np.empty((0, self.dim - self.head_dim), tail.codes.dtype)
+        self._scale  = np.empty(0, np.float32)
+        return True
+
+    @classmethod
+    def load(cls, path: str, dim: int, head_dim: int = 64, tail_dtype: str = "int8") -> "VectorIndex":
+        """
+        Map the current snapshot of a saved index, or return an empty one if there is
+        none, its layout changed or its ids and row counts don't agree.
+        """
+        index     = cls(dim, head_dim, tail_dtype)
+        directory = current_snapshot(path)
+        if directory is None:
+            return index
+        try:
+            with open(os.path.join(directory, "index.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return index
+        if (meta["dim"], meta["head_dim"]) != (dim, index.head_dim):
+            return index
+        ids, lens = meta["ids"], meta["lens"]
+        if len(set(ids)) != len(ids) or len(lens) != len(ids) or len(meta["meta"]) != len(ids) or sum(lens) != meta["rows"]:
+            return index
+        index._rows = meta["rows"]
+        if not index._map(directory):
+            return cls(dim, head_dim, tail_dtype)
+        index._alive  = np.ones(index._rows, bool)
+        index._ids    = meta["ids"]
+        index._lens   = meta["lens"]
+        index._meta   = meta["meta"]
+        index._starts = np.concatenate([[0], np.cumsum(index._lens)[:-1]]).astype(int).tolist() if index._lens else []
+        index._slots  = {doc_id: s for s, doc_id in enumerate(index._ids)}
+        index.as_of   = meta.get("as_of", 0)
+        return index
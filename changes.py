@@ -7,13 +7,9 @@ from collections import Counter
 
 import streamlit as st
 from dotenv import load_dotenv
-from pypdf import PdfReader
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
-import google.generativeai as genai
+# pypdf, LangChain / Chroma and google.generativeai are imported on first use
+# so the app script starts without paying for them.
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -246,7 +242,21 @@ st.markdown("---")
 
 
 
+@st.cache_resource
+def get_gemini_model():
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel("gemini-2.5-flash")
+
+
+@st.cache_resource
+def get_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model="gemini-embedding-001", google_api_key=api_key)
+
+
 def extract_text_from_pdf(file) -> str:
+    from pypdf import PdfReader
     reader = PdfReader(file)
     return "".join(page.extract_text() or "" for page in reader.pages).strip()
 
@@ -470,7 +480,9 @@ def ats_score(resume_text: str, jd_text: str) -> tuple[float, float]:
     return round(final * 100, 2), round(keyword_density * 100, 2)
 
 
-def build_chroma(text: str, embeddings) -> Chroma:
+def build_chroma(text: str, embeddings):
+    from langchain_community.vectorstores import Chroma
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
     splitter  = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
     documents = splitter.create_documents([text])
     return Chroma.from_documents(documents=documents, embedding=embeddings,
@@ -538,9 +550,8 @@ def render_recruiter_score_bar(label: str, score: int):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def run_shared_pipeline(uploaded_file, job_description):
-    genai.configure(api_key=api_key)
-    gemini_model = genai.GenerativeModel("gemini-2.5-flash")
-    embeddings   = GoogleGenerativeAIEmbeddings(model="gemini-embedding-001", google_api_key=api_key)
+    gemini_model = get_gemini_model()
+    embeddings   = get_embeddings()
 
     with st.spinner("Extracting resume text..."):
         resume_text = extract_text_from_pdf(uploaded_file)
@@ -618,8 +629,7 @@ if st.session_state.mode == "progress":
     if add_skill_btn and new_skill.strip():
         skill_key = new_skill.strip().lower()
         if skill_key not in st.session_state.progress_data:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-2.5-flash")
+            model = get_gemini_model()
             with st.spinner(f"Generating checkpoints for {new_skill}..."):
                 checkpoint_data = get_progress_checkpoints(new_skill.strip(), new_level, model)
 
@@ -795,8 +805,7 @@ if st.session_state.mode == "progress":
             if eval_btn:
                 completed = [cp["label"] for cp in checkpoints if checked.get(cp["id"], False)]
                 pending   = [cp["label"] for cp in checkpoints if not checked.get(cp["id"], False)]
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel("gemini-2.5-flash")
+                model = get_gemini_model()
                 with st.spinner(f"AI is evaluating your {display_name} progress..."):
                     verdict_data = get_ai_upgrade_recommendation(
                         display_name, current_level, completed, pending, percent, model
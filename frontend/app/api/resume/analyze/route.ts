@@ -1,8 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import { auth } from "@/auth";
 import { prisma } from "@/lib/prisma";
-
-const PYTHON_API = process.env.PYTHON_API_URL || "http://localhost:8000";
+import { PYTHON_API, registerResume } from "@/lib/python-api";
 
 export async function POST(req: NextRequest) {
   const session = await auth();
@@ -12,19 +11,30 @@ export async function POST(req: NextRequest) {
 
   try {
     const formData = await req.formData();
-    const file = formData.get("resume") as File | null;
-    const jd   = formData.get("job_description") as string | null;
+    const file     = formData.get("resume") as File | null;
+    const jd       = formData.get("job_description") as string | null;
+    const filename = (formData.get("filename") as string | null) || file?.name || "resume.pdf";
+    let resumeRef  = formData.get("resume_id") as string | null;
 
-    if (!file || !jd?.trim()) {
+    if ((!file && !resumeRef) || !jd?.trim()) {
       return NextResponse.json(
         { error: "Resume file and job description are required" },
         { status: 400 }
       );
     }
 
+    // First analysis of a file registers it; later ones only send the id
+    if (!resumeRef && file) {
+      const registered = await registerResume(file);
+      if ("error" in registered) {
+        return NextResponse.json({ error: registered.error }, { status: registered.status });
+      }
+      resumeRef = registered.resumeId;
+    }
+
     // Forward to Python /ats/candidate
     const pyForm = new FormData();
-    pyForm.append("resume", file);
+    pyForm.append("resume_id", resumeRef!);
     pyForm.append("job_description", jd);
 
     const pyRes = await fetch(`${PYTHON_API}/ats/candidate`, {
@@ -34,9 +44,10 @@ export async function POST(req: NextRequest) {
 
     if (!pyRes.ok) {
       const err = await pyRes.json().catch(() => ({}));
+      // 404 = unknown resume_id: the client retries with the file
       return NextResponse.json(
         { error: err.detail || "Python API analysis failed" },
-        { status: 500 }
+        { status: pyRes.status === 404 ? 404 : 500 }
       );
     }
 
@@ -46,7 +57,7 @@ export async function POST(req: NextRequest) {
     const resume = await prisma.resume.create({
       data: {
         userId:         session.user.id,
-        filename:       file.name,
+        filename:       filename,
         jobDescription: jd,
         semanticScore:  analysis.semantic_score  ?? null,
         atsScore:       analysis.ats_score        ?? null,
@@ -59,7 +70,7 @@ export async function POST(req: NextRequest) {
       },
     });
 
-    return NextResponse.json({ resumeId: resume.id, ...analysis });
+    return NextResponse.json({ resumeId: resume.id, resumeRef, ...analysis });
   } catch (e) {
     console.error("[/api/resume/analyze]", e);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
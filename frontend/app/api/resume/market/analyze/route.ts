@@ -1,8 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import { auth } from "@/auth";
 import { prisma } from "@/lib/prisma";
-
-const PYTHON_API = process.env.PYTHON_API_URL || "http://localhost:8000";
+import { PYTHON_API, registerResume } from "@/lib/python-api";
 
 export async function POST(req: NextRequest) {
   const session = await auth();
@@ -12,14 +11,24 @@ export async function POST(req: NextRequest) {
 
   try {
     const formData = await req.formData();
-    const file = formData.get("resume") as File | null;
+    const file     = formData.get("resume") as File | null;
+    const filename = (formData.get("filename") as string | null) || file?.name || "resume.pdf";
+    let resumeRef  = formData.get("resume_id") as string | null;
 
-    if (!file) {
+    if (!file && !resumeRef) {
       return NextResponse.json({ error: "Resume file is required" }, { status: 400 });
     }
 
+    if (!resumeRef && file) {
+      const registered = await registerResume(file);
+      if ("error" in registered) {
+        return NextResponse.json({ error: registered.error }, { status: registered.status });
+      }
+      resumeRef = registered.resumeId;
+    }
+
     const pyForm = new FormData();
-    pyForm.append("resume", file);
+    pyForm.append("resume_id", resumeRef!);
 
     const pyRes = await fetch(`${PYTHON_API}/market/analyze`, {
       method: "POST",
@@ -30,7 +39,7 @@ export async function POST(req: NextRequest) {
       const err = await pyRes.json().catch(() => ({}));
       return NextResponse.json(
         { error: err.detail || "Market analysis failed" },
-        { status: 500 }
+        { status: pyRes.status === 404 ? 404 : 500 }
       );
     }
 
@@ -40,13 +49,13 @@ export async function POST(req: NextRequest) {
     await prisma.marketAnalysis.create({
       data: {
         userId:         session.user.id,
-        resumeFilename: file.name,
+        resumeFilename: filename,
         skills:         analysis.skills ?? [],
         analysis:       analysis,
       },
     });
 
-    return NextResponse.json(analysis);
+    return NextResponse.json({ resumeRef, ...analysis });
   } catch (e) {
     console.error("[/api/market/analyze]", e);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
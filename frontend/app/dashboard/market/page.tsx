@@ -16,6 +16,7 @@ import { CardSkeleton } from "@/components/LoaderSkeleton";
 import { SkillTag } from "@/components/SkillTag";
 import { cn } from "@/lib/utils";
 import { useResume } from "@/context/ResumeContext";
+import { appendResume } from "@/lib/python-api";
 import Link from "next/link";
 
 // ── Types ─────────────────────────────────────────────────────────────────────
@@ -228,7 +229,7 @@ function JobCard({ job, index }: { job: JobMatch; index: number }) {
 // ── Main Page ─────────────────────────────────────────────────────────────────
 
 export default function MarketAnalyzer() {
-  const { resumeFile } = useResume();
+  const { resumeFile, resumeId, setResumeId } = useResume();
   const [status, setStatus]   = useState("");
   const [error, setError]     = useState("");
   const [loading, setLoading] = useState(false);
@@ -246,13 +247,21 @@ export default function MarketAnalyzer() {
     if (!resumeFile) return;
     setError(""); setData(null); setLoading(true);
     setStatus("Analysing your resume…");
-    const form = new FormData();
-    form.append("resume", resumeFile);
-    try {
+    const post = (id: string | null) => {
+      const form = new FormData();
+      appendResume(form, resumeFile, id);
       // Route through Next.js API so result is saved to MongoDB
-      const res  = await fetch("/api/resume/market/analyze", { method: "POST", body: form });
+      return fetch("/api/resume/market/analyze", { method: "POST", body: form });
+    };
+    try {
+      let res = await post(resumeId);
+      if (res.status === 404 && resumeId) {
+        setResumeId(null);
+        res = await post(null);
+      }
       const json = await res.json();
       if (!res.ok) throw new Error(json.detail || json.error || "Analysis failed.");
+      if (json.resumeRef) setResumeId(json.resumeRef);
       setStatus("");
       setData(json);
     } catch (e: unknown) {
@@ -8,6 +8,7 @@ import { Textarea } from "@/components/ui/textarea";
 import { cn } from "@/lib/utils";
 import { toast } from "sonner";
 import { useResume } from "@/context";
+import { appendResume } from "@/lib/python-api";
 import Link from "next/link";
 
 // ─── Types ────────────────────────────────────────────────────────────────────
@@ -64,7 +65,16 @@ interface Roadmap {
     recommended_order: string[];
     quick_wins: string[];
   };
-  skills: SkillRoadmap[];
+  background?: string;
+  skills: (RoadmapSummary | SkillRoadmap)[];
+}
+
+interface RoadmapSummary {
+  skill: string;
+  why_important: string;
+  priority: string;
+  difficulty: string;
+  days: number;
 }
 
 interface SkillRoadmap {
@@ -153,23 +163,73 @@ function SkillCard({ title, skills, variant }: { title: string; skills: string[]
 
 // ─── Skill Roadmap Card ───────────────────────────────────────────────────────
 
-function SkillRoadmapCard({ sk, idx }: { sk: SkillRoadmap; idx: number }) {
+const PYTHON_API = process.env.NEXT_PUBLIC_PYTHON_API_URL || "http://localhost:8000";
+
+const priorityColors: Record<string, string> = {
+  critical: "text-destructive border-destructive/30 bg-destructive/10",
+  high:     "text-warning border-warning/30 bg-warning/10",
+  medium:   "text-blue-400 border-blue-400/30 bg-blue-400/10",
+  low:      "text-muted-foreground border-border bg-secondary",
+};
+const difficultyColors: Record<string, string> = {
+  easy:        "text-success border-success/30 bg-success/10",
+  moderate:    "text-warning border-warning/30 bg-warning/10",
+  hard:        "text-destructive border-destructive/30 bg-destructive/10",
+  "very hard": "text-destructive border-destructive/30 bg-destructive/10",
+};
+
+// The analysis returns a summary per skill; the full plan is fetched when the user opens it.
+function SkillRoadmapCard({ sk, background }: { sk: RoadmapSummary | SkillRoadmap; background: string }) {
+  const [detail, setDetail] = useState<SkillRoadmap | null>("phases" in sk ? sk : null);
+  const [loadingDetail, setLoadingDetail] = useState(false);
+  const days = "days" in sk ? sk.days : sk.time_estimate?.total_days;
+
+  const loadDetail = async () => {
+    setLoadingDetail(true);
+    try {
+      const res = await fetch(`${PYTHON_API}/ats/roadmap/${encodeURIComponent(sk.skill)}?background=${encodeURIComponent(background)}`);
+      if (!res.ok) throw new Error();
+      setDetail(await res.json());
+    } catch {
+      toast.error(`Could not load the ${sk.skill} plan — try again`);
+    } finally {
+      setLoadingDetail(false);
+    }
+  };
+
+  return (
+    <div className="glass-card p-5 space-y-4">
+      <div className="flex items-start justify-between flex-wrap gap-3">
+        <div>
+          <p className="text-base font-bold text-foreground">
+            🛠️ {sk.skill.charAt(0).toUpperCase() + sk.skill.slice(1)}
+          </p>
+          <p className="text-xs text-muted-foreground mt-0.5">{sk.why_important}</p>
+        </div>
+        <div className="flex items-center gap-2 flex-wrap">
+          <span className={cn("text-xs font-mono border rounded-full px-2 py-0.5 uppercase", priorityColors[sk.priority] || priorityColors.low)}>
+            {sk.priority}
+          </span>
+          <span className={cn("text-xs font-mono border rounded-full px-2 py-0.5", difficultyColors[sk.difficulty?.toLowerCase()] || difficultyColors.moderate)}>
+            {sk.difficulty}
+          </span>
+          <span className="text-sm font-bold font-mono text-success">≈ {days || "?"} days</span>
+        </div>
+      </div>
+
+      {detail ? <SkillRoadmapDetail sk={detail} /> : (
+        <Button variant="outline" size="sm" onClick={loadDetail} disabled={loadingDetail}>
+          {loadingDetail ? <><Loader2 className="h-3 w-3 animate-spin" /> Building plan...</> : "📅 Show day-by-day plan & courses"}
+        </Button>
+      )}
+    </div>
+  );
+}
+
+function SkillRoadmapDetail({ sk }: { sk: SkillRoadmap }) {
   const [activeTab, setActiveTab] = useState<"dayplan" | "approach" | "milestones" | "beginner" | "advanced">("dayplan");
   const te = sk.time_estimate || {} as SkillRoadmap["time_estimate"];
 
-  const priorityColors: Record<string, string> = {
-    critical: "text-destructive border-destructive/30 bg-destructive/10",
-    high:     "text-warning border-warning/30 bg-warning/10",
-    medium:   "text-blue-400 border-blue-400/30 bg-blue-400/10",
-    low:      "text-muted-foreground border-border bg-secondary",
-  };
-  const difficultyColors: Record<string, string> = {
-    easy:        "text-success border-success/30 bg-success/10",
-    moderate:    "text-warning border-warning/30 bg-warning/10",
-    hard:        "text-destructive border-destructive/30 bg-destructive/10",
-    "very hard": "text-destructive border-destructive/30 bg-destructive/10",
-  };
-
   const tabs = [
     { key: "dayplan"    as const, label: "📅 Day Plan" },
     { key: "approach"   as const, label: "🧭 Approach" },
@@ -210,25 +270,7 @@ function SkillRoadmapCard({ sk, idx }: { sk: SkillRoadmap; idx: number }) {
   };
 
   return (
-    <div className="glass-card p-5 space-y-4">
-      <div className="flex items-start justify-between flex-wrap gap-3">
-        <div>
-          <p className="text-base font-bold text-foreground">
-            🛠️ {sk.skill.charAt(0).toUpperCase() + sk.skill.slice(1)}
-          </p>
-          <p className="text-xs text-muted-foreground mt-0.5">{sk.why_important}</p>
-        </div>
-        <div className="flex items-center gap-2 flex-wrap">
-          <span className={cn("text-xs font-mono border rounded-full px-2 py-0.5 uppercase", priorityColors[sk.priority] || priorityColors.low)}>
-            {sk.priority}
-          </span>
-          <span className={cn("text-xs font-mono border rounded-full px-2 py-0.5", difficultyColors[sk.difficulty?.toLowerCase()] || difficultyColors.moderate)}>
-            {sk.difficulty}
-          </span>
-          <span className="text-sm font-bold font-mono text-success">≈ {te.total_days || "?"} days</span>
-        </div>
-      </div>
-
+    <div className="space-y-4">
       <div>
         <div className="flex justify-between text-xs font-mono text-muted-foreground mb-1">
           <span>🟢 Beginner ({te.beginner_days || 0}d)</span>
@@ -356,7 +398,7 @@ function SkillRoadmapCard({ sk, idx }: { sk: SkillRoadmap; idx: number }) {
 
 export default function ResumeAnalyzerPage() {
   // ── Pull resume file + JD from context (set during /upload) ─────────────
-  const { resumeFile, jobDescription: contextJd } = useResume();
+  const { resumeFile, resumeId, setResumeId, jobDescription: contextJd } = useResume();
 
   const [mode, setMode] = useState<Mode>("candidate");
   const [jd, setJd] = useState("");
@@ -397,20 +439,29 @@ export default function ResumeAnalyzerPage() {
     setRecruiterResult(null);
     setStatus(mode === "candidate" ? "🧠 Building semantic index and extracting skills..." : "🏢 Running recruiter-grade AI analysis...");
 
-    const form = new FormData();
-    form.append("resume", resumeFile);
-    form.append("job_description", jd);
+    const post = (id: string | null) => {
+      const form = new FormData();
+      appendResume(form, resumeFile, id);
+      form.append("job_description", jd);
+      return fetch(endpoint, { method: "POST", body: form });
+    };
 
     // candidate → /api/resume/analyze (saves to DB)
     // recruiter → Python directly (no DB save needed for recruiter view)
     const endpoint = mode === "candidate"
       ? "/api/resume/analyze"
-      : `${process.env.NEXT_PUBLIC_PYTHON_API_URL || "http://localhost:8000"}/ats/recruiter`;
+      : `${PYTHON_API}/ats/recruiter`;
 
     try {
-      const res = await fetch(endpoint, { method: "POST", body: form });
+      let res = await post(resumeId);
+      if (res.status === 404 && resumeId) {
+        // Registered copy is gone (e.g. backend data reset) — fall back to uploading the file
+        setResumeId(null);
+        res = await post(null);
+      }
       const data = await res.json();
       if (!res.ok) throw new Error(data.detail || data.error || "Analysis failed");
+      if (data.resumeRef) setResumeId(data.resumeRef);
 
       if (mode === "candidate") setCandidateResult(data as CandidateResult);
       else setRecruiterResult(data as RecruiterResult);
@@ -588,8 +639,8 @@ export default function ResumeAnalyzerPage() {
                       );
                     })()}
 
-                    {candidateResult.roadmap.skills.map((sk, idx) => (
-                      <SkillRoadmapCard key={idx} sk={sk} idx={idx} />
+                    {candidateResult.roadmap.skills.map((sk) => (
+                      <SkillRoadmapCard key={sk.skill} sk={sk} background={candidateResult.roadmap.background || "none"} />
                     ))}
                   </div>
                 )}
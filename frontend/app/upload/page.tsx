@@ -20,7 +20,7 @@ const PARSING_STEPS = [
 
 export default function UploadPage() {
   const router = useRouter();
-  const { setResumeFile, setJobDescription } = useResume();
+  const { setResumeFile, setResumeId, setJobDescription } = useResume();
 
   const [isDragging,  setIsDragging]  = useState(false);
   const [file,        setFile]        = useState<File | null>(null);
@@ -80,6 +80,8 @@ export default function UploadPage() {
         const err = await res.json();
         throw new Error(err.error || "Analysis failed");
       }
+      const data = await res.json();
+      if (data.resumeRef) setResumeId(data.resumeRef);
 
       setProgress(100);
       setStage("done");
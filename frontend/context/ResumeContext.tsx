@@ -35,9 +35,11 @@ export interface InterviewResult {
 // ── Context type ──────────────────────────────────────────────────────────────
 interface ResumeContextValue {
   resumeFile:         File | null;
+  resumeId:           string | null;   // Python resume registry id — lets analyses skip re-uploading the PDF
   jobDescription:     string;
   interviewResult:    InterviewResult | null;
   setResumeFile:      (file: File | null) => void;
+  setResumeId:        (id: string | null) => void;
   setJobDescription:  (jd: string) => void;
   setInterviewResult: (result: InterviewResult | null) => void;
   clearResume:        () => void;
@@ -47,15 +49,21 @@ const ResumeContext = createContext<ResumeContextValue | null>(null);
 
 export function ResumeProvider({ children }: { children: ReactNode }) {
   const [resumeFile,      setResumeFileState]      = useState<File | null>(null);
+  const [resumeId,        setResumeIdState]        = useState<string | null>(null);
   const [jobDescription,  setJobDescriptionState]  = useState<string>("");
   const [interviewResult, setInterviewResultState] = useState<InterviewResult | null>(null);
 
-  const setResumeFile      = useCallback((file: File | null)         => setResumeFileState(file),    []);
+  const setResumeFile      = useCallback((file: File | null)         => {
+    setResumeFileState(file);
+    setResumeIdState(null);   // a new file invalidates the registered id
+  }, []);
+  const setResumeId        = useCallback((id: string | null)         => setResumeIdState(id),        []);
   const setJobDescription  = useCallback((jd: string)                => setJobDescriptionState(jd),  []);
   const setInterviewResult = useCallback((r: InterviewResult | null) => setInterviewResultState(r),  []);
 
   const clearResume = useCallback(() => {
     setResumeFileState(null);
+    setResumeIdState(null);
     setJobDescriptionState("");
     setInterviewResultState(null);
   }, []);
@@ -63,9 +71,11 @@ export function ResumeProvider({ children }: { children: ReactNode }) {
   return (
     <ResumeContext.Provider value={{
       resumeFile,
+      resumeId,
       jobDescription,
       interviewResult,
       setResumeFile,
+      setResumeId,
       setJobDescription,
       setInterviewResult,
       clearResume,
@@ -0,0 +1,39 @@
+export const PYTHON_API = process.env.PYTHON_API_URL || "http://localhost:8000";
+
+/**
+ * Register a resume PDF with the Python resume registry (POST /resumes) and
+ * return its resume_id. Later analyses pass the id instead of re-uploading
+ * the file, so the backend never re-parses or re-embeds it. Candidate uploads
+ * are registered with searchable=false, so they never show up in /ats/search.
+ *
+ * A rejected upload (4xx, e.g. not a PDF) comes back as its error and status
+ * for the route to pass through; anything else is reported as a 500.
+ */
+export async function registerResume(
+  file: File
+): Promise<{ resumeId: string } | { error: string; status: number }> {
+  const form = new FormData();
+  form.append("resume", file);
+  form.append("searchable", "false");
+
+  const res = await fetch(`${PYTHON_API}/resumes`, { method: "POST", body: form });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    return {
+      error:  err.detail || "Resume registration failed",
+      status: res.status >= 400 && res.status < 500 ? res.status : 500,
+    };
+  }
+  const data = await res.json();
+  return { resumeId: data.resume_id as string };
+}
+
+/** Attach the resume to an analysis form: the registry id when known, else the file. */
+export function appendResume(form: FormData, file: File, resumeId: string | null) {
+  if (resumeId) {
+    form.append("resume_id", resumeId);
+    form.append("filename", file.name);
+  } else {
+    form.append("resume", file);
+  }
+}